@@ -0,0 +1,89 @@
+"""
+Compare one connection per request (module-level `requests.get`) with the pooled keep-alive session
+used by the launchpy connectors.
+A local HTTP server stands in for reactor.adobe.io and counts the connections it accepts.
+Pass a certificate and a key to serve over TLS and include the TLS handshake in the measure.
+
+Usage:
+    python benchmarks/bench_connection_pool.py --requests 500
+    python benchmarks/bench_connection_pool.py --requests 500 --certfile cert.pem --keyfile key.pem
+"""
+import argparse
+import json
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+# Non standard libraries
+import requests
+import urllib3
+from launchpy import connector
+
+PAYLOAD = json.dumps({"data": [], "meta": {"pagination": {"current_page": 1, "total_pages": 1}}}).encode()
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def get_request(self):
+        conn, addr = super().get_request()
+        self.connections += 1
+        return conn, addr
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.api+json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def startServer(certfile: str = None, keyfile: str = None) -> CountingServer:
+    server = CountingServer(("127.0.0.1", 0), Handler)
+    if certfile is not None:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(server: CountingServer, url: str, nb_requests: int, get) -> dict:
+    server.connections = 0
+    start = time.perf_counter()
+    for _ in range(nb_requests):
+        get(url, verify=False).json()
+    elapsed = time.perf_counter() - start
+    return {"seconds": round(elapsed, 4), "connections": server.connections,
+            "ms_per_request": round(elapsed / nb_requests * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection pooling benchmark")
+    parser.add_argument("-n", "--requests", type=int, default=300)
+    parser.add_argument("--certfile", default=None)
+    parser.add_argument("--keyfile", default=None)
+    args = parser.parse_args()
+    urllib3.disable_warnings()
+    server = startServer(args.certfile, args.keyfile)
+    scheme = "https" if args.certfile else "http"
+    url = f"{scheme}://127.0.0.1:{server.server_address[1]}/properties/PR1/rules"
+    results = {
+        "new_connection_per_request": run(server, url, args.requests, requests.get),
+        "pooled_session": run(server, url, args.requests, connector.getSession().get),
+    }
+    print(json.dumps(results, indent=4))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Benchmarks of the hot paths of launchpy, run offline against a synthetic property (launchpy.generator)
+answered by the MockReactor, in memory (no sockets, CPU cost only) or through the local mock server over HTTP.
+For each benchmark, it reports the wall time, the number of requests sent by the connectors and the peak memory
+allocated during the run (measured with tracemalloc in a separate run, as it slows the execution down).
+The results are written in a JSON file that can be compared with the results of another version.
+
+Usage:
+    python benchmarks/bench_hotpaths.py --scale small
+    python benchmarks/bench_hotpaths.py --scale medium --transport http --output results.json
+    python benchmarks/bench_hotpaths.py --only translator.translate,extractSettings --repeat 5
+    python benchmarks/bench_hotpaths.py --scale medium --compare results-0.4.7.json
+    python benchmarks/bench_hotpaths.py --compare results-0.4.7.json results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+# Non standard libraries
+import launchpy as lp
+from launchpy import metrics, transport
+from launchpy.generator import generateFixture
+from launchpy.launchpy import Translator, copySettings, extractSettings
+from launchpy.mockserver import MockReactor, MockServer, useMockReactor
+
+SCALES = {
+    "small": {"rules": 200, "rule_components": 1200, "data_elements": 400, "extensions": 12, "extra_properties": 60,
+              "targets": 2, "translate": 2000, "sync": 50, "check": 20, "settings": 100, "code_size": 50000},
+    "medium": {"rules": 1000, "rule_components": 6000, "data_elements": 2000, "extensions": 25, "extra_properties": 200,
+               "targets": 3, "translate": 10000, "sync": 500, "check": 100, "settings": 500, "code_size": 200000},
+    "large": {"rules": 5000, "rule_components": 30000, "data_elements": 10000, "extensions": 40, "extra_properties": 500,
+              "targets": 5, "translate": 30000, "sync": 500, "check": 500, "settings": 1000, "code_size": 1000000},
+}
+BASE = "Synthetic Property 1"
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark. The decorated generator prepares the benchmark (not measured),
+    yields the function to measure, and cleans up after the run.
+    """
+    def decorator(func):
+        BENCHMARKS[name] = contextmanager(func)
+        return func
+    return decorator
+
+
+class Context:
+    """
+    Fixture, mock API and parameters shared by the benchmarks.
+    """
+
+    def __init__(self, scale: str, transport_name: str = "memory", seed: int = 0) -> None:
+        self.scale = scale
+        self.params = SCALES[scale]
+        self.transport_name = transport_name
+        self.server = None
+        self.shared = {}
+        self.fixture = generateFixture(properties=1 + self.params["targets"], seed=seed, audit_events=0,
+                                       rules=self.params["rules"], rule_components=self.params["rule_components"],
+                                       data_elements=self.params["data_elements"], extensions=self.params["extensions"],
+                                       revisions=1, libraries=2)
+        company_id = self.fixture["companies"][0]["id"]
+        for index in range(self.params["extra_properties"]):  # empty properties, for the pagination of getProperties
+            self.fixture["properties"].append({
+                "id": "PR%032x" % (index + 1), "attributes": {"name": f"Empty Property {index + 1}"},
+                "relationships": {"company": {"data": {"id": company_id, "type": "companies"}}}})
+        self.targets = [f"Synthetic Property {index + 2}" for index in range(self.params["targets"])]
+        self.resetState()
+        admin = lp.Admin()
+        self.properties = {prop["attributes"]["name"]: prop for prop in admin.getProperties(admin.getCompanyId())}
+
+    def resetState(self) -> MockReactor:
+        """
+        Answer the requests with a new MockReactor loaded with the fixture, dropping the changes of the previous runs.
+        """
+        if self.transport_name == "memory":
+            self.reactor = useMockReactor(MockReactor(self.fixture))
+        else:
+            if self.server is None:
+                self.server = MockServer(MockReactor({})).start()
+            self.reactor = MockReactor(self.fixture, base_url=self.server.url)
+            self.server.httpd.reactor = self.reactor
+            transport.setTransport()
+            self.server.configure()
+        return self.reactor
+
+    def getProperty(self, name: str = BASE) -> lp.Property:
+        return lp.Property(self.properties[name])
+
+    def getComponentNames(self, count: int) -> list:
+        """
+        Returns names of rules and data elements of the base property, 4 rules for 1 data element.
+        """
+        prop = self.getProperty()
+        rules = [rule["attributes"]["name"] for rule in prop.getRules()]
+        data_elements = [de["attributes"]["name"] for de in prop.getDataElements()]
+        nb_data_elements = min(count // 5, len(data_elements))
+        return (rules[:count - nb_data_elements] + data_elements[:nb_data_elements])[:count]
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.stop()
+        transport.setTransport()
+
+
+@benchmark("admin.getProperties")
+def benchGetProperties(ctx: Context):
+    admin = lp.Admin()
+    company_id = admin.getCompanyId()
+    yield lambda: admin.getProperties(company_id)
+
+
+@benchmark("property.getRules+getRulesComponents")
+def benchGetRulesComponents(ctx: Context):
+    prop = ctx.getProperty()
+
+    def run():
+        prop.getRules()
+        prop.getRulesComponents()
+    yield run
+
+
+@benchmark("property.getDataElements")
+def benchGetDataElements(ctx: Context):
+    prop = ctx.getProperty()
+    yield prop.getDataElements
+
+
+@benchmark("translator.translate")
+def benchTranslate(ctx: Context):
+    if "translate" not in ctx.shared:
+        prop = ctx.getProperty()
+        rules = prop.getRules()
+        extensions = prop.getExtensions()
+        components = [copySettings(rc) for rc in prop.getRulesComponents()]
+        data_elements = [copySettings(de) for de in prop.getDataElements()]
+        # target property with the same rules and extensions, under other ids
+        target_rules = [{**rule, "id": "RL" + rule["id"][2:][::-1]} for rule in rules]
+        target_extensions = [{**ext, "id": "EX" + ext["id"][2:][::-1]} for ext in extensions]
+        ctx.shared["translate"] = (rules, extensions, target_rules, target_extensions, components, data_elements)
+    rules, extensions, target_rules, target_extensions, components, data_elements = ctx.shared["translate"]
+    count = ctx.params["translate"]
+    components = [components[index % len(components)] for index in range(count - count // 5)]
+    data_elements = [data_elements[index % len(data_elements)] for index in range(count // 5)]
+
+    def run():
+        translator = Translator()
+        translator.setBaseExtensions(extensions, BASE)
+        translator.setBaseRules(rules, BASE)
+        translator.extendExtensions(target_extensions, "target")
+        translator.extendRules(target_rules, "target")
+        for component in components:
+            translator.translate("target", rule_component=component)
+        for data_element in data_elements:
+            translator.translate("target", data_element=data_element)
+    yield run
+
+
+@benchmark("synchronizer.init")
+def benchSynchronizerInit(ctx: Context):
+    yield lambda: lp.Synchronizer(base=BASE, targets=ctx.targets)
+
+
+@benchmark("synchronizer.syncComponents")
+def benchSyncComponents(ctx: Context):
+    ctx.resetState()
+    names = ctx.getComponentNames(ctx.params["sync"])
+    synchronizer = lp.Synchronizer(base=BASE, targets=ctx.targets)
+    yield lambda: synchronizer.syncComponents(componentsName=names)
+    ctx.resetState()
+
+
+@benchmark("synchronizer.checkComponentSync")
+def benchCheckComponentSync(ctx: Context):
+    ctx.resetState()
+    names = ctx.getComponentNames(ctx.params["check"])
+    synchronizer = lp.Synchronizer(base=BASE, targets=ctx.targets)
+    synchronizer.syncComponents(componentsName=names)
+
+    def run():
+        for name in names:
+            synchronizer.checkComponentSync(name)
+    yield run
+    ctx.resetState()
+
+
+@benchmark("extractProperty")
+def benchExtractProperty(ctx: Context):
+    prop = ctx.getProperty()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            yield lambda: lp.extractProperty(prop)
+        finally:
+            os.chdir(cwd)
+
+
+@benchmark("extractSettings")
+def benchExtractSettings(ctx: Context):
+    custom_code = ("core::conditions::custom-code", "core::events::custom-code", "core::actions::custom-code", "core::dataElements::custom-code")
+    elements = [element for resource_type in ("rule_components", "data_elements")
+                for element in ctx.reactor.resources[resource_type].values()
+                if element["attributes"]["delegate_descriptor_id"] in custom_code][:ctx.params["settings"]]
+    large_elements = []
+    for element in elements:
+        source = json.loads(element["attributes"]["settings"])["source"]
+        source = (source + "\n") * (ctx.params["code_size"] // (len(source) + 1) + 1)
+        large_elements.append({**element, "attributes": {**element["attributes"], "settings": json.dumps({"source": source[:ctx.params["code_size"]]})}})
+
+    def run():
+        for element in large_elements:
+            extractSettings(element)
+    yield run
+
+
+def measure(ctx: Context, name: str, repeat: int) -> dict:
+    """
+    Run a benchmark repeat times, and once more with tracemalloc for the peak memory.
+    """
+    bench = BENCHMARKS[name]
+    times = []
+    requests_count = 0
+    for _ in range(repeat):
+        with bench(ctx) as run:
+            gc.collect()
+            before = metrics.registry.total("launchpy_requests_total")
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+            requests_count = int(metrics.registry.total("launchpy_requests_total") - before)
+    with bench(ctx) as run:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "wall_time": {"min": min(times), "median": statistics.median(times), "mean": statistics.mean(times), "runs": times},
+        "requests": requests_count,
+        "peak_memory_bytes": peak,
+    }
+
+
+def compare(old: dict, new: dict) -> None:
+    """
+    Print the ratios new / old of the median wall time, the requests and the peak memory.
+    """
+    print(f"{'benchmark':<40}{'time':>10}{'requests':>12}{'memory':>10}   ({old.get('launchpy')} -> {new.get('launchpy')})")
+    for name, result in new["benchmarks"].items():
+        if name not in old["benchmarks"]:
+            continue
+        previous = old["benchmarks"][name]
+
+        def ratio(a, b):
+            return f"x{b / a:.2f}" if a else "-"
+        print(f"{name:<40}{ratio(previous['wall_time']['median'], result['wall_time']['median']):>10}"
+              f"{ratio(previous['requests'], result['requests']):>12}"
+              f"{ratio(previous['peak_memory_bytes'], result['peak_memory_bytes']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of the launchpy hot paths, against the mock Reactor API")
+    parser.add_argument("-s", "--scale", choices=list(SCALES), default="small")
+    parser.add_argument("-t", "--transport", choices=["memory", "http"], default="memory",
+                        help="memory: InMemoryTransport (no sockets), http: local mock server")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="number of measured runs per benchmark")
+    parser.add_argument("--only", default=None, help="comma separated names of the benchmarks to run")
+    parser.add_argument("-o", "--output", default=None, help="JSON file of the results")
+    parser.add_argument("--compare", nargs="+", default=None, metavar="RESULTS",
+                        help="results to compare with; with 2 files, compare them without running the benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.compare is not None and len(args.compare) == 2:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            compare(json.load(old), json.load(new))
+        return
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name}, possible values: {', '.join(BENCHMARKS)}")
+    lp.configureRateLimits(enabled=False)  # the mock is not rate limited, only the launchpy code is measured
+    print(f"Generating the {args.scale} fixture...")
+    ctx = Context(args.scale, transport_name=args.transport, seed=args.seed)
+    results = {
+        "launchpy": lp.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "transport": args.transport,
+        "parameters": ctx.params,
+        "benchmarks": {},
+    }
+    try:
+        print(f"{'benchmark':<40}{'median (s)':>12}{'min (s)':>10}{'requests':>10}{'peak (MB)':>11}")
+        for name in names:
+            result = measure(ctx, name, args.repeat)
+            results["benchmarks"][name] = result
+            print(f"{name:<40}{result['wall_time']['median']:>12.3f}{result['wall_time']['min']:>10.3f}"
+                  f"{result['requests']:>10}{result['peak_memory_bytes'] / 1e6:>11.1f}")
+    finally:
+        ctx.close()
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare is not None:
+        with open(args.compare[0]) as old:
+            compare(json.load(old), results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,13 +5,30 @@ May  15 12:04:49 2019
 """
 from launchpy.__version__ import __version__
 from launchpy.configs import *
+from launchpy.connector import configureConnectionPool
+from launchpy.tokens import enableTokenCache
+from launchpy.ratelimit import configureRateLimits
+from launchpy.retry import RetryPolicy, configureRetryPolicy
+from launchpy.paginator import configurePagination
+from launchpy.cache import enableResponseCache, disableResponseCache
+from launchpy.httpcache import enableHTTPCache, disableHTTPCache
+from launchpy.metrics import dumpMetrics
+from launchpy.tracing import enableTracing, disableTracing, dumpTrace, traced
+from launchpy.exporter import startTextfileExporter, stopTextfileExporter
+from launchpy.transport import Transport, HTTPTransport, InMemoryTransport, RecordReplayTransport, setTransport, useCassette
+from launchpy.asyncconnector import AsyncAdobeRequest
+from launchpy.asyncproperty import AsyncProperty
 from launchpy.library import Library
 from launchpy.admin import Admin
 from launchpy.property import Property
+from launchpy.indexes import ElementIndex
+from launchpy.snapshot import PropertySnapshot, loadSnapshot
 from launchpy.synchronizer import Synchronizer
+from launchpy import config
 import re
+import json
 from pathlib import Path
-import httpx, asyncio
+import asyncio
 
 
 def __safe_name__(name: str):
@@ -23,36 +40,45 @@ def __safe_name__(name: str):
     text = re.sub(valid_chars, "_", name)
     return text.strip().lower()
 
-# 1. Make the function 'async'
-async def __extractRuleComponents__(rule: dict, client: httpx.AsyncClient, folder: str, header: dict):
+@traced
+async def __extractRuleComponents__(rule: dict, connector: AsyncAdobeRequest, folder: str):
     rule_url = rule['relationships']['rule_components']['links']['related']
     rule_name = __safe_name__(rule['attributes']['name'])
     rule_folder = Path(folder) / rule_name
     rule_folder.mkdir(parents=True, exist_ok=True)
-    # 2. Use 'await' with the shared client
-    response = await client.get(rule_url, headers=header,timeout=httpx.Timeout(60.0, pool=None))
-    if response.status_code == 200:
-        components = response.json().get('data', [])
-        for component in components:
-            component_name = __safe_name__(component['attributes']['name'])
-            file_path = rule_folder / f"{component_name}.json"
-            # Note: For massive scale, look into 'aiofiles' for async writing, 
-            # but standard open() is usually fine for small JSON files.
-            with open(file_path, "w") as f:
-                json.dump(component, f, indent=4)
+    response = await connector.getData(rule_url)
+    components = response.get('data', [])
+    for component in components:
+        component_name = __safe_name__(component['attributes']['name'])
+        file_path = rule_folder / f"{component_name}.json"
+        with open(file_path, "w") as f:
+            json.dump(component, f, indent=4)
 
-# 3. Use an orchestrator instead of ThreadPoolExecutor
-async def process_all_rules(rules_list, folder, header):
-    timeout = httpx.Timeout(10.0, read=120.0)
-    limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
-    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
-        # Create a list of "tasks" to run
-        tasks = [__extractRuleComponents__(rule, client, folder, header) for rule in rules_list]
-        
-        # 'gather' runs them all concurrently
+@traced
+async def process_all_rules(rules_list, folder, header: dict = None, connector: AsyncAdobeRequest = None, max_concurrency: int = 20):
+    """
+    Write the rule components of each rule in a sub-folder of folder, fetching them concurrently.
+    Arguments:
+        rules_list : REQUIRED : list of rules, as returned by Property.getRules
+        folder : REQUIRED : folder where to write the rule components
+        header : OPTIONAL : header used for the requests, when no connector is passed
+        connector : OPTIONAL : AsyncAdobeRequest instance to use
+        max_concurrency : OPTIONAL : number of requests running at the same time, when no connector is passed. Default 20.
+    """
+    if connector is None:
+        connector = AsyncAdobeRequest(header=header or config.header, max_concurrency=max_concurrency)
+    async with connector:
+        tasks = [__extractRuleComponents__(rule, connector, folder) for rule in rules_list]
         await asyncio.gather(*tasks)
 
-def extractProperty(property: dict | Property):
+@traced
+def extractProperty(property: dict | Property, max_concurrency: int = 20):
+    """
+    Extract the rule components of all the rules of a property in a folder named after the property.
+    Arguments:
+        property : REQUIRED : Property instance or property definition
+        max_concurrency : OPTIONAL : number of requests running at the same time. Default 20.
+    """
     if property is None:
         raise ValueError("Property is None")
     elif type(property) is not Property and type(property) is dict:
@@ -63,4 +89,5 @@ def extractProperty(property: dict | Property):
     folder = __safe_name__(property.name)
     Path(folder).mkdir(parents=True, exist_ok=True)
     rules = property.getRules()
-    asyncio.run(process_all_rules(rules, folder, property.header))
\ No newline at end of file
+    connector = AsyncAdobeRequest(config_object=property.connector.config, header=property.header, max_concurrency=max_concurrency)
+    asyncio.run(process_all_rules(rules, folder, connector=connector))
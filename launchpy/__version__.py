@@ -1 +1 @@
-__version__ = "0.4.7-1"
\ No newline at end of file
+__version__ = "0.5.0"
\ No newline at end of file
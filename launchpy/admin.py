@@ -1,8 +1,9 @@
 from launchpy import config, connector
-from concurrent import futures
+from launchpy.paginator import Paginator
 import datetime
 from .configs import saveFile
 from .property import Property
+from .indexes import ElementIndex
 
 class Admin:
 
@@ -12,10 +13,12 @@ class Admin:
         """
         self.connector = connector.AdobeRequest(
             config_object=config_object, header=header)
+        self.paginator = Paginator(self.connector)
         self.header = self.connector.header
         self.COMPANY_ID = ""
         self.COMPANY_NAME  = ""
         self.properties = []
+        self.indexes = {'properties': ElementIndex()}
         self.endpoint = config.endpoints['global']
         
 
@@ -54,28 +57,29 @@ class Admin:
             companyID : REQUIRED : Company from where you want the properties
         """
         path = f"/companies/{companyID}/properties"
-        properties = self.connector.getData(self.endpoint + path)
-        data = properties['data']  # properties information for page 1
-        # searching if page 1 is enough
-        pagination = properties['meta']['pagination']
-        # requesting all the pages
-        if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-            # calculate how many page to download
-            pages_left = pagination['total_pages'] - pagination['current_page']
-            workers = min(pages_left, 5)  # max 5 threads
-            list_page_number = [{
-                'page[number]': str(x)} for x in range(2, pages_left+2)]  # starting page 2
-            urls = [self.endpoint + path for x in range(2, pages_left+2)]
-            with futures.ThreadPoolExecutor(workers) as executor:
-                res = executor.map(lambda x, y: self.connector.getData(
-                    x, params=y), urls, list_page_number)
-            res = list(res)
-            append_data = [val for sublist in [data['data'] for data in res]
-                        for val in sublist]  # flatten list of list
-            data = data + append_data
+        data = self.paginator.getAll(self.endpoint + path)
         self.properties = data
+        self.indexes['properties'].replace(data)
         return data
 
+    def getProperty(self,property:str=None,companyID:str=None)->dict:
+        """
+        Returns the definition of a property from its name or its ID, without scanning the list of properties.
+        The properties are retrieved (getProperties) when they have not been retrieved yet or when the property is not found in them.
+        Returns None if the property does not exist.
+        Arguments:
+            property : REQUIRED : name or ID of the property
+            companyID : OPTIONAL : Company of the property. Default the company of getCompanyId.
+        """
+        if property is None:
+            raise ValueError("Require a property name or ID")
+        definition = self.indexes['properties'].get(property)
+        if definition is None:
+            companyID = companyID or self.COMPANY_ID or self.getCompanyId()
+            self.getProperties(companyID)
+            definition = self.indexes['properties'].get(property)
+        return definition
+
 
     def getAuditEvents(self, page_size: int = 50, nb_page: int = 10, **kwargs)->list:
         """
@@ -162,6 +166,7 @@ class Admin:
         obj['data']['type'] = 'properties'
         path = f"/companies/{companyId}/properties"
         new_property = self.connector.postData(self.endpoint +path, data=obj)
+        self.indexes['properties'].add(new_property.get('data'))
         if return_class:
             property_class = Property(new_property['data'])
             return property_class
@@ -189,6 +194,7 @@ class Admin:
         }
         path = f"/properties/{propertyId}"
         res:dict = self.connector.patchData(self.endpoint+path,data=obj)
+        self.indexes['properties'].add(res.get('data'))
         return res
     
     def deleteProperty(self,propertyId:str=None)->dict:
@@ -201,6 +207,8 @@ class Admin:
             raise ValueError('Require a property ID')
         path = f"/properties/{propertyId}"
         res:dict = self.connector.deleteData(self.endpoint+path)
+        if isinstance(res, int) and res < 300:
+            self.indexes['properties'].remove(propertyId)
         return res
 
     def getExtensionsCatalogue(self, availability: str = None, name: str = None, platform: str = "web", save: bool = False)->list:
@@ -220,25 +228,7 @@ class Admin:
             params['filter[display_name]'] = f"CONTAINS {name}"
         if platform is not None:
             params['filter[platform]'] = f"EQ {platform}"
-        extensions = self.connector.getData(path, params=params)
-        data = extensions['data']  # properties information for page 1
-        # searching if page 1 is enough
-        pagination = extensions['meta']['pagination']
-        # requesting all the pages
-        if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-            # calculate how many page to download
-            pages_left = pagination['total_pages'] - pagination['current_page']
-            workers = min(pages_left, 5)  # max 5 threads
-            params = [{
-                'page[number]': str(x), **params} for x in range(2, pages_left+2)]  # starting page 2
-            urls = [path for x in range(2, pages_left+2)]
-            with futures.ThreadPoolExecutor(workers) as executor:
-                res = executor.map(lambda x, y: self.connector.getData(
-                    x, params=y), urls, params)
-            res = list(res)
-            append_data = [val for sublist in [data['data'] for data in res]
-                        for val in sublist]  # flatten list of list
-            data = data + append_data
+        data = self.paginator.getAll(path, params=params)
         if save:
                 saveFile(data,'packages.txt',type='txt')
         return data
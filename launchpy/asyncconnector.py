@@ -0,0 +1,265 @@
+import json
+import time
+import asyncio
+from copy import deepcopy
+from typing import Awaitable, Callable
+# Non standard libraries
+import httpx
+import requests
+from launchpy import config, ratelimit, tokens, coalescing
+from launchpy.connector import AdobeRequest
+from launchpy.retry import RetryPolicy
+from launchpy.transport import Transport, HTTPTransport
+
+
+class AsyncAdobeRequest(AdobeRequest):
+    """
+    Asynchronous version of the AdobeRequest connector, based on httpx.
+    It shares the tokens, the rate limiter and the retry policy with the synchronous connectors.
+    The number of requests running at the same time is limited by max_concurrency.
+    Use it as an async context manager, or call aclose() when done:
+        async with AsyncAdobeRequest(config_object, header) as connector:
+            rules = await connector.getData(url)
+    """
+
+    def __init__(self,
+                 config_object: dict = config.config_object,
+                 header: dict = config.header,
+                 verbose: bool = False,
+                 retry: int = 0,
+                 retry_policy: RetryPolicy = None,
+                 max_concurrency: int = 10,
+                 timeout: float = 60.0,
+                 transport: Transport = None
+                 ) -> None:
+        """
+        Set the asynchronous connector.
+        Arguments:
+            config_object : OPTIONAL : Require the importConfig file to have been used.
+            header : OPTIONAL : header of the config modules
+            verbose : OPTIONAL : display comment on the request.
+            retry : OPTIONAL : Number of retries of the failed requests. Default uses config.retry.
+            retry_policy : OPTIONAL : RetryPolicy instance to use for all the requests (overrides retry).
+            max_concurrency : OPTIONAL : maximum number of requests running at the same time. Default 10.
+            timeout : OPTIONAL : timeout of the requests in seconds. Default 60.
+            transport : OPTIONAL : Transport sending the requests. Default the transport set with setTransport.
+                The HTTP requests are sent with httpx, the other transports are called in a thread.
+        """
+        super().__init__(config_object=config_object, header=header, verbose=verbose, retry=retry, retry_policy=retry_policy, transport=transport)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client = None
+        self._semaphore = None
+        self._inflight = {}
+
+    async def __aenter__(self) -> 'AsyncAdobeRequest':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        The httpx client of the connector, created on first use.
+        """
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(self.timeout), limits=limits)
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Semaphore bounding the number of concurrent requests, created on first use.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def aclose(self) -> None:
+        """
+        Close the connections of the connector.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _acheckingDate(self) -> None:
+        """
+        Checking if the token is still valid, refreshing it in a thread to not block the event loop.
+        """
+        if time.time() > self.config['date_limit']:
+            await asyncio.to_thread(self._refreshToken)
+
+    async def _sendRequest(self, method: str, endpoint: str, params: dict = None, data=None, headers: dict = None, **kwargs) -> httpx.Response:
+        """
+        Send a request and returns the response, applying the rate limiter and the retry policy.
+        Same behavior as AdobeRequest._sendRequest, waiting without blocking the event loop.
+        """
+        policy = kwargs.get('retry_policy', self.retryPolicy)
+        verbose = kwargs.get('verbose', False)
+        body = {}
+        if data is not None:
+            body = {'content': json.dumps(data)} if method != 'GET' else {'data': data}
+        start = time.monotonic()
+        attempt = 0
+        stats = {'throttled': 0, 'rate_limit_wait': 0.0, 'retry_wait': 0.0}
+        renewed = False
+        while True:
+            await self._acheckingDate()
+            wait = ratelimit.rateLimiter.reserve(method)
+            if wait > 0:
+                stats['rate_limit_wait'] += wait
+                await asyncio.sleep(wait)
+            error = None
+            res = None
+            request_headers = {**(headers or self.header), **kwargs.get('extra_headers', {})}
+            try:
+                async with self.semaphore:
+                    if isinstance(self.transport, HTTPTransport):
+                        res = await self.client.request(method, endpoint, headers=request_headers, params=params, **body)
+                    else:
+                        res = await self.transport.arequest(method, endpoint, headers=request_headers, params=params, data=body.get('content', body.get('data')))
+            except (httpx.TransportError, requests.exceptions.RequestException) as e:
+                error = e
+            elapsed = time.monotonic() - start
+            if res is not None and self._isThrottled(res):
+                stats['throttled'] += 1
+                delay = ratelimit.rateLimiter.throttle(method, res.headers)
+                if elapsed + delay > policy.max_elapsed:
+                    self._recordRequest(method, endpoint, start, res, error, attempt, stats)
+                    return res
+                if verbose:
+                    print(f'Too many requests, waiting {delay} seconds')
+                continue
+            if res is not None:
+                ratelimit.rateLimiter.update(method, res.headers)
+            if res is not None and res.status_code == 401 and not renewed:
+                renewed = True
+                if verbose:
+                    print('Token rejected by the API, requesting a new one')
+                await asyncio.to_thread(self._renewToken)
+                if headers is not None and 'Authorization' in headers:
+                    headers = {**headers, 'Authorization': f'Bearer {self.token}'}
+                continue
+            attempt += 1
+            retryable = policy.isRetryable(method, status_code=res.status_code if res is not None else None,
+                                           exception=error, idempotent=kwargs.get('idempotent', None))
+            backoff = policy.getBackoff(attempt) if retryable else 0
+            if not retryable or attempt > policy.max_retries or elapsed + backoff > policy.max_elapsed:
+                self._recordRequest(method, endpoint, start, res, error, attempt - 1, stats)
+                if error is not None:
+                    raise error
+                return res
+            if verbose:
+                print(f"{error or res.status_code} on {method} {endpoint}, retrying in {round(backoff, 2)} seconds")
+                print(f'{policy.max_retries - attempt} retry left')
+            stats['retry_wait'] += backoff
+            await asyncio.sleep(backoff)
+
+    async def _coalesce(self, key: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Returns the result of fetch, awaiting the identical request already running if any.
+        When the request has been shared, each caller receives its own copy of the result.
+        """
+        inflight = self._inflight.get(key, None)
+        if inflight is not None:
+            inflight['followers'] += 1
+            coalescing.coalescer.coalesced += 1
+            return deepcopy(await asyncio.shield(inflight['task']))
+        inflight = {'task': asyncio.ensure_future(fetch()), 'followers': 0}
+        self._inflight[key] = inflight
+        try:
+            res_json = await asyncio.shield(inflight['task'])
+        finally:
+            del self._inflight[key]
+        if inflight['followers'] > 0:
+            return deepcopy(res_json)
+        return res_json
+
+    async def getData(self, endpoint: str, params: dict = None, data: dict = None, headers: dict = None, *args, **kwargs):
+        """
+        Abstraction for getting data
+        possible kwargs:
+            cache : OPTIONAL : set to False to bypass the response caches.
+        Identical requests sent at the same time are only sent once, and each caller receives a copy of the response.
+        """
+        cache_key = self._getCacheKey(endpoint, params=params, data=data, **kwargs)
+        res_json, validation_headers = self._getCachedResponse(cache_key)
+        if res_json is not None:
+            return res_json
+
+        async def fetch() -> dict:
+            res = await self._sendRequest('GET', endpoint, params=params, data=data, headers=headers, extra_headers=validation_headers, **kwargs)
+            if kwargs.get("verbose", False):
+                print(f"request URL : {res.request.url}")
+                print(f"statut_code : {res.status_code}")
+            try:
+                res_json = self._readResponse(cache_key, endpoint, res)
+            except:
+                res_json = {'error': 'Request Error'}
+            return res_json
+        if not coalescing.coalescer.enabled:
+            return await fetch()
+        key = coalescing.coalescer.getKey(endpoint, params=params, data=data, headers=headers, auth=tokens.tokenStore.getKey(self.config))
+        return await self._coalesce(key, fetch)
+
+    async def postData(self, endpoint: str, params: dict = None, data: dict = None, headers: dict = None, *args, **kwargs):
+        """
+        Abstraction for posting data
+        possible kwargs:
+            idempotent : OPTIONAL : set to True to retry the request on 5xx and connection errors.
+        """
+        res = await self._sendRequest('POST', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
+        try:
+            res_json = res.json()
+        except:
+            if kwargs.get("verbose", False):
+                print(f"status_code: {res.status_code}")
+                print(res.text)
+            res_json = {'error': 'Request Error'}
+        return res_json
+
+    async def patchData(self, endpoint: str, params: dict = None, data=None, headers: dict = None, *args, **kwargs):
+        """
+        Abstraction for patching data
+        possible kwargs:
+            idempotent : OPTIONAL : set to True to retry the request on 5xx and connection errors.
+        """
+        res = await self._sendRequest('PATCH', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
+        try:
+            status_code = res.json()
+        except:
+            if kwargs.get("verbose", False):
+                print(res.text)
+            status_code = {'error': 'Request Error'}
+        return status_code
+
+    async def putData(self, endpoint: str, params: dict = None, data=None, headers: dict = None, *args, **kwargs):
+        """
+        Abstraction for putting data
+        """
+        res = await self._sendRequest('PUT', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
+        try:
+            status_code = res.json()
+        except:
+            if kwargs.get("verbose", False):
+                print(res.text)
+            status_code = {'error': 'Request Error'}
+        return status_code
+
+    async def deleteData(self, endpoint: str, params: dict = None, data=None, headers: dict = None, *args, **kwargs):
+        """
+        Abstraction for deleting data
+        """
+        res = await self._sendRequest('DELETE', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
+        try:
+            status_code = res.status_code
+        except:
+            status_code = {'error': 'Request Error'}
+        return status_code
@@ -0,0 +1,282 @@
+import json
+import asyncio
+# Non standard libraries
+from launchpy import config
+from launchpy.asyncconnector import AsyncAdobeRequest
+from launchpy.paginator import Paginator
+
+
+class AsyncProperty:
+    """
+    Asynchronous counterpart of the Property class for the read methods.
+    All the methods are coroutines, the pages and the rule components are requested concurrently.
+    Several instances can share the same AsyncAdobeRequest connector, so that all the requests of many properties
+    run under one global concurrency limit:
+        async with AsyncAdobeRequest(max_concurrency=20) as connector:
+            props = [AsyncProperty(prop, connector=connector) for prop in properties]
+            rules = await asyncio.gather(*[prop.getRules() for prop in props])
+    Attributes :
+        definition : the data that has been passed to the class for the instance creation
+        name : name of the property
+        id : id of the property
+        ruleComponents : dictionnary to extract ruleComponents from rules. Filled when running getRules
+    """
+
+    def __init__(self, data: dict, config_object: dict = config.config_object, header: dict = config.header,
+                 connector: AsyncAdobeRequest = None, max_concurrency: int = 10) -> None:
+        """
+        Instanciate the class with the object retrieved by getProperties.
+        Arguments :
+          data : REQUIRED : Single property dictionary definition
+          config_object : OPTIONAL : Configuration required to generate the token
+          header : OPTIONAL : Header used for the requests
+          connector : OPTIONAL : AsyncAdobeRequest instance to share between several instances
+          max_concurrency : OPTIONAL : number of requests running at the same time, when no connector is passed. Default 10.
+        """
+        self._ownConnector = connector is None
+        if connector is None:
+            connector = AsyncAdobeRequest(config_object=config_object, header=header, max_concurrency=max_concurrency)
+        self.connector = connector
+        self.endpoint = config.endpoints['global']
+        self.definition = data
+        self.name = data['attributes']['name']
+        self.id = data['id']
+        self.platform = data['attributes']['platform']
+        self.development = data['attributes']['development']
+        self._DataElement = data['links']['data_elements']
+        self._Extensions = data['links']['extensions']
+        self._Rules = data['links']['rules']
+        self._Environments = data['links']['environments']
+        self._Libraries = data['relationships']['libraries']['links']['related']
+        self.ruleComponents = {}
+        self.header = self.connector.header
+
+    def __repr__(self) -> str:
+        return json.dumps(self.definition, indent=4)
+
+    def __str__(self) -> str:
+        return str(json.dumps(self.definition, indent=4))
+
+    async def __aenter__(self) -> 'AsyncProperty':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the connector, if it has been created by this instance.
+        """
+        if self._ownConnector:
+            await self.connector.aclose()
+
+    async def _getAllPages(self, url: str, params: dict = None, strict: bool = False) -> list:
+        """
+        Returns the data of all the pages of a list endpoint. The pages after the first one are requested concurrently.
+        The pages are handled as by the Paginator: if the first page does not contain data, the response is returned,
+        an Exception is raised if one of the next pages does not contain data.
+        Arguments:
+            url : REQUIRED : url of the list endpoint
+            params : OPTIONAL : parameters of the request (filters)
+            strict : OPTIONAL : raise an Exception when the first page does not contain data as well. Default False.
+        """
+        params = params or {}
+        page1 = await self.connector.getData(url, params=params)
+        if 'data' not in page1.keys():
+            if strict:
+                Paginator.checkPage(page1, url)
+            return page1
+        pages = [page1]
+        page_numbers = Paginator.getPageNumbers(page1)
+        if page_numbers is not None:
+            pages += await asyncio.gather(*[self.connector.getData(url, params={**params, 'page[number]': str(page)})
+                                            for page in page_numbers])
+        else:  # no total of pages, following the next pages
+            next_page = Paginator.getPagination(page1).get('next_page', None)
+            while next_page is not None:
+                page = Paginator.checkPage(await self.connector.getData(url, params={**params, 'page[number]': str(next_page)}), url)
+                pages.append(page)
+                next_page = Paginator.getPagination(page).get('next_page', None)
+        return Paginator.mergePages(pages, url)
+
+    async def getRessource(self, res_url: str = None, params: dict = None) -> dict:
+        """
+        Enable you to request a specific resource from Launch API.
+        Arguments:
+            res_url : REQUIRED : Resource URL to request
+            params : OPTIONAL : If you want to pass any parameter.
+        """
+        if res_url is None:
+            raise Exception("You must provide a resource url")
+        return await self.connector.getData(res_url, params=params)
+
+    async def getEnvironments(self) -> list:
+        """
+        Retrieve the environment sets for this property
+        """
+        return await self._getAllPages(self._Environments)
+
+    async def getExtensions(self) -> list:
+        """
+        Retrieve the extensions of this property
+        """
+        return await self._getAllPages(self._Extensions)
+
+    async def getExtension(self, extensionId: str = None) -> dict:
+        """
+        Retrieve the definiton of the extension based on its ID.
+        Arguments:
+            extensionId : REQUIRED : ID of the extension to retrieve
+        """
+        if extensionId is None:
+            raise ValueError("Require an extension ID")
+        res = await self.connector.getData(f"{self.endpoint}/extensions/{extensionId}")
+        return res.get('data', res)
+
+    async def getRules(self, filter: dict = None) -> list:
+        """
+        Return the list of the rules data.
+        On top, it fills the ruleComponents attribute with a dictionnary based on rule id and their rule name and the ruleComponent of each.
+        Arguments:
+            filter : OPTIONAL : dictionary of filters, ex: {"name":"CONTAINS test"}
+        """
+        params = {}
+        if filter is not None:
+            for key in filter:
+                params[f'filter[{key}]'] = filter[key]
+        data = await self._getAllPages(self._Rules, params=params)
+        if type(data) == list:
+            for rule in data:
+                self.ruleComponents[rule['id']] = {
+                    'name': rule['attributes']['name'],
+                    'url': rule['links']['rule_components']
+                }
+        return data
+
+    async def getRule(self, rule_id: str = None) -> dict:
+        """
+        Retrieve a specific rule based on its ID.
+        Arguments:
+            rule_id : REQUIRED : Rule ID
+        """
+        if rule_id is None:
+            raise ValueError("Require a rule ID")
+        res = await self.connector.getData(f"{self.endpoint}/rules/{rule_id}")
+        return res.get('data', res)
+
+    async def getRuleComponents(self, rule: dict | str = None, **kwargs) -> list:
+        """
+        Returns the components of a specific rule.
+        Arguments:
+            rule : REQUIRED : rule definition or rule id
+        """
+        if rule is None or kwargs.get('rule_ids', False) or kwargs.get('rule_names', False):
+            return await self.getRulesComponents(**kwargs)
+        if type(rule) is dict:
+            if 'id' not in rule.keys():
+                raise ValueError("Rule definition must have an ID")
+            rule_id = rule['id']
+        else:
+            rule_id = rule
+        return await self._getAllPages(f"{self.endpoint}/rules/{rule_id}/rule_components")
+
+    async def getRulesComponents(self, **kwargs) -> list:
+        """
+        Returns a list of all the ruleComponents of the rules gathered in the ruleComponents attributes, requested concurrently.
+        The rules are retrieved first if getRules has not been used.
+        It will also enrich the RuleCompoment JSON data with the rule_name and rule_id attached to it.
+        Raises an Exception if the ruleComponents of a rule cannot be retrieved.
+        Possible kwargs:
+            rule_ids : list of rule ids to be used in order to retrieve ruleComponents
+            rule_names : list of rule names to be used in order to retrieve ruleComponents
+        """
+        if len(self.ruleComponents) == 0:
+            await self.getRules()
+        ruleComponents = self.ruleComponents
+        if kwargs.get('rule_ids', False):
+            rule_ids = kwargs['rule_ids']
+            if type(rule_ids) == str:
+                rule_ids = [rule_ids]
+            ruleComponents = {rule: ruleComponents[rule] for rule in ruleComponents if rule in rule_ids}
+        if kwargs.get('rule_names', False):
+            rule_names = kwargs['rule_names']
+            if type(rule_names) == str:
+                rule_names = [rule_names]
+            ruleComponents = {rule: ruleComponents[rule] for rule in ruleComponents if ruleComponents[rule]['name'] in rule_names}
+
+        async def request_data(rule_id: str, rule: dict) -> list:
+            data = await self._getAllPages(rule['url'], strict=True)
+            for element in data:
+                element['rule_name'] = rule['name']
+                element['rule_id'] = rule_id
+            return data
+        res = await asyncio.gather(*[request_data(rule_id, rule) for rule_id, rule in ruleComponents.items()])
+        return [element for data in res for element in data]
+
+    async def getDataElements(self) -> list:
+        """
+        Retrieve data elements of that property.
+        Returns a list.
+        """
+        return await self._getAllPages(self._DataElement)
+
+    async def getDataElement(self, dataElementId: str = None) -> dict:
+        """
+        Retrieve a specific data elements based on its ID.
+        Argument:
+            dataElementId : REQUIRED : a Data Element ID
+        """
+        if dataElementId is None:
+            raise ValueError('Require a Data Element ID')
+        res = await self.connector.getData(f"{self.endpoint}/data_elements/{dataElementId}")
+        return res.get('data', res)
+
+    async def getLibraries(self, state: str = None, **kwargs) -> list:
+        """
+        Retrieve libraries of the property.
+        Returns a list.
+        Arguments:
+            state : OPTIONAL : state of the library (development, submitted, approved, rejected, published).
+        possible kwargs:
+            - published_at : it will be greater that this date ('2022-12-12T10:19:20.867Z')
+            - name : it will be matching the name as equals
+            - created_at : it will be greater that this date ('2022-12-12T10:19:20.867Z')
+            - updated_at : it will be greater that this date ('2022-12-12T10:19:20.867Z')
+        """
+        params = {}
+        if state is not None:
+            if state not in ['development', "submitted", "approved", "rejected", "published"]:
+                raise KeyError("State provided didn't match possible state.")
+            params['filter[state]'] = f"EQ {state}"
+        for key in ["published_at", "name", "created_at", "updated_at"]:
+            if key in kwargs:
+                params[f'filter[{key}]'] = f"EQ {kwargs[key]}" if key == 'name' else f"GT {kwargs[key]}"
+        return await self._getAllPages(self._Libraries, params=params)
+
+    async def getNotes(self, data: dict = None) -> list:
+        """
+        Retrieve the note associated with the object pass to the method. Returns list.
+        Arguments:
+            data: OPTIONAL : object that is associated with a Note (rule, data element, etc...). Default the property.
+        """
+        supported_objects = "libraries data_elements rules rule_components extensions"
+        if data is not None and data['type'] not in supported_objects.split():
+            raise ReferenceError('Data passed are not supported for notes.')
+        if data is None:
+            url = self.definition['relationships']['notes']['links']['related']
+        else:
+            url = data['relationships']['notes']['links']['related']
+        return await self._getAllPages(url)
+
+    async def getRevisions(self, element: dict = None) -> list:
+        """
+        Get the revisions of an element.
+        Arguments:
+            element : REQUIRED : the element definition dictionary
+        """
+        if element is None or type(element) != dict:
+            raise ValueError("element must be a definition")
+        revisionURL = element['relationships'].get('revisions', {}).get('links', {}).get('related', 'unknown')
+        if revisionURL == "unknown":
+            raise Exception("could not find a revision link in the element")
+        return await self._getAllPages(revisionURL)
@@ -0,0 +1,175 @@
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from urllib.parse import urlparse
+# Non standard libraries
+from launchpy import config
+
+_ID_PATTERN = re.compile(r'^[A-Z]{2}[0-9a-fA-F]{32}$')
+
+
+def normalizeEndpoint(url: str) -> str:
+    """
+    Returns the path template of an url, with the ids of the resources replaced by "{id}".
+    ex: "https://reactor.adobe.io/properties/PR123.../rules" -> "/properties/{id}/rules"
+    Arguments:
+        url : REQUIRED : url of the request
+    """
+    path = urlparse(url).path
+    segments = ['{id}' if _ID_PATTERN.match(segment) else segment for segment in path.strip('/').split('/') if segment != '']
+    return '/' + '/'.join(segments)
+
+
+def getResourceTypes(url: str) -> list:
+    """
+    Returns the resource types (collections) of an url, ex: "/libraries/{id}/rules" -> ["libraries", "rules"].
+    Arguments:
+        url : REQUIRED : url of the request
+    """
+    return [segment for segment in normalizeEndpoint(url).strip('/').split('/') if segment not in ['{id}', 'relationships', '']]
+
+
+class ResponseCache:
+    """
+    In-memory cache of the GET responses, with a time to live and a maximum number of entries (least recently used are evicted).
+    The entries are keyed by url, parameters and credentials, and tagged with the resource type they contain,
+    so that a write request can invalidate the cached responses of the same resource type.
+    """
+
+    def __init__(self, ttl: float = 300, maxsize: int = 512) -> None:
+        """
+        Arguments:
+            ttl : OPTIONAL : number of seconds a response is kept. Default 300.
+            maxsize : OPTIONAL : maximum number of responses kept. Default 512.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.enabled = False
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def getKey(url: str, params: dict = None, data: dict = None, auth: tuple = None) -> str:
+        """
+        Returns the cache key of a request.
+        Arguments:
+            url : REQUIRED : url of the request
+            params : OPTIONAL : parameters of the request
+            data : OPTIONAL : body of the request
+            auth : OPTIONAL : identifier of the credentials used (org id, client id, scopes)
+        """
+        return json.dumps([url, params or {}, data, auth], sort_keys=True, default=str)
+
+    def get(self, key: str) -> dict:
+        """
+        Returns a copy of the cached response, None if not cached or expired.
+        Arguments:
+            key : REQUIRED : cache key of the request
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None or time.monotonic() > entry['expires']:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry['value']
+        return deepcopy(value)
+
+    def set(self, key: str, value: dict, url: str = None, ttl: float = None) -> None:
+        """
+        Cache a response.
+        Arguments:
+            key : REQUIRED : cache key of the request
+            value : REQUIRED : the response (JSON)
+            url : OPTIONAL : url of the request, used to tag the entry with its resource type
+            ttl : OPTIONAL : time to live of this entry. Default the cache ttl.
+        """
+        resource_types = getResourceTypes(url) if url is not None else []
+        entry = {
+            'value': deepcopy(value),
+            'expires': time.monotonic() + (ttl if ttl is not None else self.ttl),
+            'type': resource_types[-1] if len(resource_types) > 0 else None
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, resource_type: str = None, url: str = None) -> int:
+        """
+        Remove the cached responses of a resource type, or of all the resource types of an url.
+        Without argument, all the responses are removed. Returns the number of responses removed.
+        Arguments:
+            resource_type : OPTIONAL : resource type to invalidate, ex: "rules"
+            url : OPTIONAL : url of a write request, all the resource types of this url are invalidated.
+        """
+        with self._lock:
+            if resource_type is None and url is None:
+                nb_entries = len(self._entries)
+                self._entries.clear()
+                return nb_entries
+            resource_types = set(getResourceTypes(url)) if url is not None else set()
+            if resource_type is not None:
+                resource_types.add(resource_type)
+            keys = [key for key, entry in self._entries.items() if entry['type'] in resource_types]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        Remove all the cached responses and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def configure(self, enabled: bool = True, ttl: float = None, maxsize: int = None) -> None:
+        """
+        Enable or disable the cache and change its settings.
+        Arguments:
+            enabled : OPTIONAL : Default True.
+            ttl : OPTIONAL : number of seconds a response is kept.
+            maxsize : OPTIONAL : maximum number of responses kept.
+        """
+        self.enabled = enabled
+        if ttl is not None:
+            self.ttl = ttl
+        if maxsize is not None:
+            self.maxsize = maxsize
+        if not enabled:
+            self.clear()
+
+
+responseCache = ResponseCache(ttl=config.response_cache['ttl'], maxsize=config.response_cache['maxsize'])
+responseCache.enabled = config.response_cache['enabled']
+
+
+def enableResponseCache(ttl: float = 300, maxsize: int = 512) -> None:
+    """
+    Cache the GET responses in memory for all the connectors.
+    The cached responses of a resource type are invalidated when a POST, PATCH, PUT or DELETE request is sent for that resource type.
+    Arguments:
+        ttl : OPTIONAL : number of seconds a response is kept. Default 300.
+        maxsize : OPTIONAL : maximum number of responses kept. Default 512.
+    """
+    config.response_cache.update({'enabled': True, 'ttl': ttl, 'maxsize': maxsize})
+    responseCache.configure(enabled=True, ttl=ttl, maxsize=maxsize)
+
+
+def disableResponseCache() -> None:
+    """
+    Stop caching the GET responses and empty the cache.
+    """
+    config.response_cache['enabled'] = False
+    responseCache.configure(enabled=False)
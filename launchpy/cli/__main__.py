@@ -1,5 +1,6 @@
 from rich import rule
 import launchpy
+from launchpy import mockserver
 import argparse, cmd, shlex, json
 from functools import wraps
 from rich.console import Console
@@ -33,6 +34,10 @@ def login_required(f:Callable[Concatenate["MainShell", P], None]) -> Callable[Co
         return f(self, *args, **kwargs)
     return wrapper
 
+def str_to_bool(value:str) -> bool:
+    """Parse a boolean argument: 'False', '0' and 'no' are False (argparse type=bool would parse them as True)."""
+    return str(value).lower() not in ['false', '0', 'no']
+
 console = Console()
 
 class PropertyCLI(cmd.Cmd):
@@ -43,6 +48,7 @@ class PropertyCLI(cmd.Cmd):
         self.data_elements = None
         self.rules_components = None
         self.rules = None
+        self.snapshot = None
     
     @property_required
     def do_get_extensions(self, arg):
@@ -455,8 +461,8 @@ class PropertyCLI(cmd.Cmd):
         parser.add_argument("name", help="Name of the library to delete", type=str)
         try:
             args = parser.parse_args(shlex.split(arg))
-            libraries = self.property.getLibraries()
-            matching_libs = [lib for lib in libraries if lib['attributes']['name'] == args.name]
+            self.property.getLibraries()
+            matching_libs = self.property.indexes['libraries'].getByName(args.name)
             if not matching_libs:
                 console.print(f"Library '{args.name}' not found in this property.", style="red")
                 return
@@ -476,8 +482,8 @@ class PropertyCLI(cmd.Cmd):
         parser.add_argument("name", help="Name of the library to delete components from", type=str)
         try:
             args = parser.parse_args(shlex.split(args))
-            libraries = self.property.getLibraries()
-            matching_libs = [lib for lib in libraries if lib['attributes']['name'] == args.name]
+            self.property.getLibraries()
+            matching_libs = self.property.indexes['libraries'].getByName(args.name)
             if not matching_libs:
                 console.print(f"Library '{args.name}' not found in this property.", style="red")
                 return
@@ -507,6 +513,66 @@ class PropertyCLI(cmd.Cmd):
         except SystemExit:
             return
     
+    def _use_snapshot(self, snapshot:launchpy.PropertySnapshot) -> None:
+        """Keep the snapshot and use its elements for the rules, rules components and data elements commands."""
+        self.snapshot = snapshot
+        self.property.useSnapshot(snapshot)
+        self.rules = list(snapshot.iterElements('rules'))
+        self.rules_components = list(snapshot.iterElements('ruleComponents'))
+        self.data_elements = list(snapshot.iterElements('dataElements'))
+        for rule in self.rules:
+            self.property.ruleComponents[rule['id']] = {'name': rule['attributes']['name'], 'url': rule['links']['rule_components']}
+        table = Table(title=f"Snapshot of {snapshot.name} ({snapshot.fetched_at})")
+        table.add_column("Collection", style="cyan")
+        table.add_column("Elements", style="magenta")
+        for collection, count in snapshot.getSummary().items():
+            table.add_row(collection, str(count))
+        console.print(table)
+
+    @property_required
+    def do_snapshot(self, args:Any):
+        """Fetch the whole property in a snapshot (or refresh the current snapshot), and save it to a file if specified."""
+        parser = argparse.ArgumentParser(prog='snapshot', add_help=True)
+        parser.add_argument("-o", "--output", help="Path of the file to save the snapshot to. The extension defines the format: .pkl, .jsonl.gz, .jsonl.xz or .jsonl", type=str, default=None)
+        parser.add_argument("-r", "--refresh", help="Boolean. Refresh the current snapshot instead of fetching the property again. Default False. Possible values: True, False", type=str_to_bool, default=False)
+        try:
+            args = parser.parse_args(shlex.split(args))
+            if args.refresh and self.snapshot is not None:
+                changes = self.snapshot.refresh(self.property)
+                console.print(f"Snapshot refreshed: {sum(len(ids) for change in changes.values() for ids in change.values())} changes", style="green")
+                snapshot = self.snapshot
+            else:
+                snapshot = self.property.snapshot()
+            self._use_snapshot(snapshot)
+            if args.output is not None:
+                path = snapshot.save(args.output)
+                console.print(f"Snapshot saved to {path}", style="green")
+        except Exception as e:
+            console.print(f"(!) Error: {str(e)}", style="red")
+        except SystemExit:
+            return
+
+    @property_required
+    def do_load_snapshot(self, args:Any):
+        """Load a snapshot of the property saved to a file, and refresh it incrementally."""
+        parser = argparse.ArgumentParser(prog='load_snapshot', add_help=True)
+        parser.add_argument("path", help="Path of the snapshot file", type=str)
+        parser.add_argument("-r", "--refresh", help="Boolean. Refresh the snapshot with the changes made since it was saved. Default True. Possible values: True, False", type=str_to_bool, default=True)
+        try:
+            args = parser.parse_args(shlex.split(args))
+            snapshot = launchpy.loadSnapshot(args.path, api=self.property)
+            if snapshot.id != self.property.id:
+                console.print(f"(!) The snapshot is a snapshot of '{snapshot.name}', not of '{self.property.name}'.", style="red")
+                return
+            if args.refresh:
+                changes = snapshot.refresh(self.property)
+                console.print(f"Snapshot refreshed: {sum(len(ids) for change in changes.values() for ids in change.values())} changes", style="green")
+            self._use_snapshot(snapshot)
+        except Exception as e:
+            console.print(f"(!) Error: {str(e)}", style="red")
+        except SystemExit:
+            return
+
     def do_exit(self, arg):
         """Return to the main menu."""
         console.print(Panel("Returning to main menu..."),style="blue")
@@ -713,8 +779,8 @@ class SynchronizerCLI(cmd.Cmd):
             if args.id is not None:
                 lib = self.synchronizer.base["api"].getLibrary(args.id, return_class=True)
             else:
-                libs = self.synchronizer.base["api"].getLibraries()
-                matching_libs = [lib for lib in libs if lib['attributes']['name'] == args.name]
+                self.synchronizer.base["api"].getLibraries()
+                matching_libs = self.synchronizer.base["api"].indexes['libraries'].getByName(args.name)
                 if not matching_libs:
                     console.print(f"Library '{args.name}' not found in this property.", style="red")
                     return
@@ -750,8 +816,8 @@ class SynchronizerCLI(cmd.Cmd):
             if args.id is not None:
                 lib = self.synchronizer.base["api"].getLibrary(args.id, return_class=True)
             else:
-                libs = self.synchronizer.base["api"].getLibraries()
-                matching_libs = [lib for lib in libs if lib['attributes']['name'] == args.name]
+                self.synchronizer.base["api"].getLibraries()
+                matching_libs = self.synchronizer.base["api"].indexes['libraries'].getByName(args.name)
                 if not matching_libs:
                     console.print(f"Library '{args.name}' not found in this property.", style="red")
                     return
@@ -824,6 +890,14 @@ class MainShell(cmd.Cmd):
         self.admin = None
         self.cid = None
         self.properties = None
+        if kwargs.get("token_cache", False):
+            launchpy.enableTokenCache()
+        if kwargs.get("response_cache", False):
+            launchpy.enableResponseCache()
+        if kwargs.get("mock_server") is not None:
+            mockserver.useMockServer(kwargs.get("mock_server"))
+            for key in ["secret", "org_id", "client_id", "scopes"]:
+                kwargs[key] = kwargs.get(key) or "mock"
         if kwargs.get("config_file") is not None:
             config_path = Path(kwargs.get("config_file"))
             if not config_path.is_absolute():
@@ -1028,7 +1102,7 @@ class MainShell(cmd.Cmd):
             if self.properties is None:
                 properties = self.admin.getProperties(self.cid)
                 self.properties = properties
-            matching_props = [prop for prop in self.properties if prop['attributes']['name'] == args.name]
+            matching_props = self.admin.indexes['properties'].getByName(args.name)
             if not matching_props:
                 console.print(f"Property '{args.name}' not found in this instance.", style="red")
                 return
@@ -1052,7 +1126,7 @@ class MainShell(cmd.Cmd):
             if self.properties is None:
                 properties = self.admin.getProperties(self.cid)
                 self.properties = properties
-            matching_props = [prop for prop in self.properties if prop['attributes']['name'] == args.name]
+            matching_props = self.admin.indexes['properties'].getByName(args.name)
             if not matching_props:
                 console.print(f"Property '{args.name}' not found in this instance.", style="red")
                 return
@@ -1077,7 +1151,7 @@ class MainShell(cmd.Cmd):
             if self.properties is None:
                 properties = self.admin.getProperties(self.cid)
                 self.properties = properties
-            matching_props = [prop for prop in self.properties if prop['attributes']['name'] == args.name]
+            matching_props = self.admin.indexes['properties'].getByName(args.name)
             if not matching_props:
                 console.print(f"Property '{args.name}' not found in this instance.", style="red")
                 return
@@ -1130,12 +1204,18 @@ class MainShell(cmd.Cmd):
         parser.add_argument("base_name", help="Name of the Launch Property to use as base", type=str)
         parser.add_argument("-t", "--targets", help="list of target property names for synchronization", nargs='+', type=str, default=None)
         parser.add_argument("-dy","--dynamic_component", help="Name of the Data Element that would contain dynamic component rules", type=str, default=None)
+        parser.add_argument("-snap","--snapshots", help="list of snapshot files (saved with the snapshot command) of the base and target properties, used instead of fetching the properties again", nargs='+', type=str, default=None)
+        parser.add_argument("-rs","--refresh_snapshots", help="Boolean. Refresh the snapshots incrementally before using them. Default False. Possible values: True, False", type=str_to_bool, default=False)
         try:
             args = parser.parse_args(shlex.split(arg))
             if args.targets is None:
                 console.print("(!) Please provide at least one target property name using the -t or --targets option.", style="red")
                 return
-            synchronizer = launchpy.Synchronizer(base=args.base_name, targets=args.targets, dynamicRuleComponent=args.dynamic_component)
+            snapshots = {}
+            for path in args.snapshots or []:
+                snapshot = launchpy.loadSnapshot(path)
+                snapshots[snapshot.name] = snapshot
+            synchronizer = launchpy.Synchronizer(base=args.base_name, targets=args.targets, dynamicRuleComponent=args.dynamic_component, snapshots=snapshots, refresh_snapshots=args.refresh_snapshots)
             synchronizer_shell = SynchronizerCLI(synchronizer)
             synchronizer_shell.cmdloop()
         except Exception as e:
@@ -1165,6 +1245,9 @@ def main():
     parser.add_argument("-cid", "--client_id", help="Auto-login client ID")
     parser.add_argument("-cf", "--config_file", help="Path to config file", default=None)
     parser.add_argument("-p", "--property", help="Property Name to auto-load on startup", default=None)
+    parser.add_argument("-tc", "--token_cache", help="Boolean. Keep the access token on disk to reuse it in the next sessions. Default False. Possible values: True, False", type=str_to_bool, default=False)
+    parser.add_argument("-rc", "--response_cache", help="Boolean. Keep the responses in memory for 5 minutes to avoid requesting the same elements again. Default False. Possible values: True, False", type=str_to_bool, default=False)
+    parser.add_argument("-ms", "--mock_server", help="URL of a local mock of the Reactor API (python -m launchpy.mockserver) to use instead of Adobe. Any credentials are accepted.", default=None)
     args = parser.parse_args() 
     shell = MainShell(**vars(args))
     try:
@@ -0,0 +1,83 @@
+import json
+import threading
+from copy import deepcopy
+from typing import Callable
+# Non standard libraries
+from launchpy import config
+
+
+class _InflightCall:
+    """
+    A request being sent, that other threads can wait for.
+    """
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.followers = 0
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """
+    De-duplicate identical requests sent at the same time by several threads.
+    The first thread (leader) sends the request, the other threads wait for it and receive a copy of its result.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = config.coalescing['enabled']
+        self.coalesced = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def getKey(url: str, params: dict = None, data: dict = None, headers: dict = None, auth: tuple = None) -> str:
+        """
+        Returns the key identifying identical requests.
+        Arguments:
+            url : REQUIRED : url of the request
+            params : OPTIONAL : parameters of the request
+            data : OPTIONAL : body of the request
+            headers : OPTIONAL : headers of the request, when they differ from the connector ones
+            auth : OPTIONAL : identifier of the credentials used (org id, client id, scopes)
+        """
+        return json.dumps([url, params or {}, data, headers, auth], sort_keys=True, default=str)
+
+    def run(self, key: str, func: Callable[[], object]) -> object:
+        """
+        Returns the result of func, calling it only if no identical call is already running.
+        The threads waiting for a running call receive a deep copy of its result, and the same exception if it failed.
+        Arguments:
+            key : REQUIRED : key of the call (see getKey)
+            func : REQUIRED : function sending the request
+        """
+        with self._lock:
+            call = self._inflight.get(key, None)
+            leader = call is None
+            if leader:
+                call = _InflightCall()
+                self._inflight[key] = call
+            else:
+                call.followers += 1
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return deepcopy(call.result)
+        try:
+            result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                followers = call.followers
+            if call.error is None and followers > 0:  # copy before the caller of the leader can modify the result
+                call.result = deepcopy(result)
+            call.event.set()
+        return result
+
+
+coalescer = RequestCoalescer()
@@ -24,3 +24,54 @@ endpoints = {
     "global": 'https://reactor.adobe.io',
     "profile": '/profile'
 }
+
+connection_pool = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "hosts": {}
+}
+
+rate_limits = {
+    "enabled": False,
+    "read": {"rate": 10, "burst": 20},
+    "write": {"rate": 5, "burst": 10},
+    "default_retry_after": 5,
+    "max_retry_after": 120
+}
+
+retry = {
+    "max_retries": 3,
+    "backoff_factor": 0.5,
+    "max_backoff": 30,
+    "max_elapsed": 300,
+    "retry_statuses": [500, 502, 503, 504]
+}
+
+pagination = {
+    "max_workers": 5
+}
+
+response_cache = {
+    "enabled": False,
+    "ttl": 300,
+    "maxsize": 512
+}
+
+http_cache = {
+    "enabled": False,
+    "path": None,
+    "ttl": 86400
+}
+
+coalescing = {
+    "enabled": True
+}
+
+metrics = {
+    "enabled": True
+}
+
+tracing = {
+    "enabled": False,
+    "max_spans": 100000
+}
@@ -1,11 +1,73 @@
 import os
 import json
 import time
+import threading
 from typing import Dict, Union
 from copy import deepcopy
 # Non standard libraries
 import requests
-from launchpy import config, configs
+from requests.adapters import HTTPAdapter
+from launchpy import config, configs, tokens, ratelimit, cache, httpcache, coalescing, metrics, tracing
+from launchpy.retry import RetryPolicy
+from launchpy.transport import Transport, getTransport
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _createSession() -> requests.Session:
+    """
+    Build a new session with keep-alive connection pools mounted per host, following config.connection_pool.
+    """
+    session = requests.Session()
+    pool_connections = config.connection_pool.get('pool_connections', 10)
+    pool_maxsize = config.connection_pool.get('pool_maxsize', 10)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    for host, host_maxsize in config.connection_pool.get('hosts', {}).items():
+        session.mount(host, HTTPAdapter(pool_connections=1, pool_maxsize=host_maxsize))
+    return session
+
+
+def getSession() -> requests.Session:
+    """
+    Returns the HTTP session shared by all the connectors of the process (Admin, Property, Library, etc...).
+    Connections are kept alive and reused, avoiding a new TCP + TLS handshake for every request.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _createSession()
+    return _session
+
+
+def resetSession() -> None:
+    """
+    Close the shared HTTP session. A new one is created on the next request.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def configureConnectionPool(pool_maxsize: int = 10, pool_connections: int = 10, hosts: dict = None) -> None:
+    """
+    Configure the size of the connection pools used by the shared HTTP session.
+    Arguments:
+        pool_maxsize : OPTIONAL : Maximum number of connections kept alive per host. Default 10.
+        pool_connections : OPTIONAL : Number of host pools to cache. Default 10.
+        hosts : OPTIONAL : dictionary of {"https://host" : pool_maxsize} to override the pool size for specific hosts.
+            ex: {"https://reactor.adobe.io" : 20}
+    """
+    config.connection_pool['pool_maxsize'] = pool_maxsize
+    config.connection_pool['pool_connections'] = pool_connections
+    config.connection_pool['hosts'] = hosts or {}
+    resetSession()
+
 
 class AdobeRequest:
     """
@@ -16,7 +78,9 @@ class AdobeRequest:
                  config_object: dict = config.config_object,
                  header: dict = config.header,
                  verbose: bool = False,
-                 retry: int = 0
+                 retry: int = 0,
+                 retry_policy: RetryPolicy = None,
+                 transport: Transport = None
                 ) -> None:
         """
         Set the connector to be used for handling request to AAM
@@ -24,7 +88,9 @@ class AdobeRequest:
             config_object : OPTIONAL : Require the importConfig file to have been used.
             header : OPTIONAL : header of the config modules
             verbose : OPTIONAL : display comment on the request.
-            retry : OPTIONAL : If you wish to retry failed GET requests
+            retry : OPTIONAL : Number of retries of the failed requests. Default uses config.retry.
+            retry_policy : OPTIONAL : RetryPolicy instance to use for all the requests (overrides retry).
+            transport : OPTIONAL : Transport sending the requests. Default the transport set with setTransport (HTTP).
         """
         if config_object['org_id'] == '':
             raise Exception(
@@ -32,18 +98,36 @@ class AdobeRequest:
         self.config = deepcopy(config_object)
         self.header = deepcopy(header)
         self.retry = retry
-        if self.config['token'] == '' or time.time() > self.config['date_limit']:
-            if 'scopes' in self.config.keys() and self.config.get('scopes',None) is not None:
-                self.connectionType = 'oauthV2'
-                token_and_expiry = self.get_oauth_token_and_expiry_for_config(config=self.config, verbose=verbose)
-            else:
-                raise ValueError("Invalid configuration: missing 'scopes' for OAuth V2 authentication.")
-            token = token_and_expiry['token']
-            expiry = token_and_expiry['expiry']
-            self.token = deepcopy(token)
-            self.config['token'] = deepcopy(token)
-            self.config['date_limit'] = deepcopy(time.time() + expiry - 500)
-            self.header.update({'Authorization': f'Bearer {token}'})
+        self._transport = transport
+        if retry_policy is not None:
+            self.retryPolicy = retry_policy
+        elif retry > 0:
+            self.retryPolicy = RetryPolicy.fromConfig(max_retries=retry)
+        else:
+            self.retryPolicy = RetryPolicy.fromConfig()
+        if 'scopes' in self.config.keys() and self.config.get('scopes',None) is not None:
+            self.connectionType = 'oauthV2'
+        else:
+            raise ValueError("Invalid configuration: missing 'scopes' for OAuth V2 authentication.")
+        if self.config.get('token','') == '' or time.time() > self.config['date_limit']:
+            self._refreshToken(verbose=verbose)
+        else:
+            self.token = self.config['token']
+            self.header.update({'Authorization': f'Bearer {self.token}'})
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The pooled HTTP session shared between all connectors.
+        """
+        return getSession()
+
+    @property
+    def transport(self) -> Transport:
+        """
+        The transport sending the requests, the one set with setTransport if none was given to the connector.
+        """
+        return self._transport or getTransport()
     
     def get_oauth_token_and_expiry_for_config(self,config:dict,verbose:bool=False,save:bool=False)->Dict[str,str]:
         """
@@ -62,8 +146,8 @@ class AdobeRequest:
             "client_secret": config["secret"],
             "scope": config["scopes"]
         }
-        response = requests.post(
-            config["oauthTokenEndpointV2"], data=oauth_payload)
+        response = self.transport.request(
+            'POST', config["oauthTokenEndpointV2"], data=oauth_payload)
         json_response = response.json()
         if 'access_token' in json_response.keys():
             token = json_response['access_token']
@@ -83,99 +167,256 @@ class AdobeRequest:
         """
         now = time.time()
         if now > self.config['date_limit']:
-            if self.connectionType =='oauthV2':
-                token_and_expiry = self.get_oauth_token_and_expiry_for_config(config=self.config)
+            self._refreshToken()
+
+    def _refreshToken(self, verbose: bool = False) -> None:
+        """
+        Set a valid token on the connector, taken from the process-wide token store.
+        The token is only requested to IMS when no other connector holds a valid one for the same credentials.
+        """
+        def fetch() -> dict:
+            if self.connectionType == 'oauthV2':
+                return self.get_oauth_token_and_expiry_for_config(config=self.config, verbose=verbose)
             elif self.connectionType == 'jwt':
-                token_and_expiry = self.get_jwt_token_and_expiry_for_config(config=self.config)
-            token = token_and_expiry['token']
-            self.config['token'] = deepcopy(token)
-            self.config['date_limit'] = deepcopy(time.time() + token_and_expiry['expiry'] - 500)
-            self.header.update({'Authorization': f'Bearer {token}'})
+                return self.get_jwt_token_and_expiry_for_config(config=self.config)
+        token_info = tokens.tokenStore.getToken(self.config, fetch)
+        token = token_info['token']
+        self.token = token
+        self.config['token'] = token
+        self.config['date_limit'] = token_info['date_limit']
+        self.header.update({'Authorization': f'Bearer {token}'})
+
+    def _renewToken(self, verbose: bool = False) -> None:
+        """
+        Replace a token rejected by the API (401) before its expiry date, ex: revoked, or expired earlier than announced.
+        The token is only requested again to IMS if no other connector has already renewed it.
+        """
+        tokens.tokenStore.invalidate(self.config, token=self.token)
+        if metrics.registry.enabled:
+            metrics.registry.inc('launchpy_token_renewals_total')
+        self._refreshToken(verbose=verbose)
+
+    @staticmethod
+    def _isThrottled(res: requests.Response) -> bool:
+        """
+        Returns True if the response indicates that the request has been throttled.
+        """
+        if res.status_code == 429:
+            return True
+        if res.status_code >= 400:
+            try:
+                return res.json().get('error_code', None) == "429050"
+            except Exception:
+                return False
+        return False
+
+    @staticmethod
+    def _recordRequest(method: str, endpoint: str, start: float, res: object, error: Exception, retries: int, stats: dict) -> None:
+        """
+        Record a request in the metrics registry (see launchpy.metrics) and as a span of the active trace (see launchpy.tracing).
+        Arguments:
+            method : REQUIRED : HTTP method
+            endpoint : REQUIRED : URL of the request
+            start : REQUIRED : time.monotonic() when the request started
+            res : REQUIRED : last response received, None if the request failed
+            error : REQUIRED : exception raised, None if a response was received
+            retries : REQUIRED : number of retries
+            stats : REQUIRED : dictionary with the number of 429 received and the seconds waited.
+        """
+        if not metrics.registry.enabled and not tracing.tracer.enabled:
+            return
+        template = cache.normalizeEndpoint(endpoint)
+        status = res.status_code if res is not None else type(error).__name__
+        end = time.monotonic()
+        size = len(res.content) if res is not None else None
+        if metrics.registry.enabled:
+            metrics.registry.recordRequest(method, template, status=status, duration=end - start, size=size, retries=retries, **stats)
+        if tracing.tracer.enabled:
+            tracing.tracer.recordSpan(f"{method} {template}", start, end, category='request',
+                                      url=endpoint, status=status, size=size, retries=retries, **stats)
+
+    def _sendRequest(self, method: str, endpoint: str, params: dict = None, data=None, headers: dict = None, **kwargs) -> requests.Response:
+        """
+        Send a request and returns the response, applying the rate limiter and the retry policy.
+        Throttled requests (429) are retried after the delay given by the API, until the max elapsed time of the policy.
+        Transient errors (5xx, connection errors) are retried with an exponential backoff when the retry policy allows it.
+        A request rejected with a 401 is sent again once with a new token.
+        Arguments:
+            method : REQUIRED : HTTP method
+            endpoint : REQUIRED : URL of the request
+            params : OPTIONAL : query parameters
+            data : OPTIONAL : body of the request. JSON encoded for methods other than GET.
+            headers : OPTIONAL : headers of the request. Default the connector header.
+        possible kwargs:
+            verbose : OPTIONAL : print the retries.
+            idempotent : OPTIONAL : set to True to retry a POST or PATCH request on 5xx and connection errors.
+            retry_policy : OPTIONAL : RetryPolicy to use instead of the connector one.
+            extra_headers : OPTIONAL : headers added to the connector header (ex: conditional request headers).
+        """
+        policy = kwargs.get('retry_policy', self.retryPolicy)
+        verbose = kwargs.get('verbose', False)
+        if data is not None and method != 'GET':
+            data = json.dumps(data)
+        start = time.monotonic()
+        attempt = 0
+        stats = {'throttled': 0, 'rate_limit_wait': 0.0, 'retry_wait': 0.0}
+        renewed = False
+        while True:
+            self._checkingDate()
+            stats['rate_limit_wait'] += ratelimit.rateLimiter.acquire(method)
+            error = None
+            res = None
+            try:
+                res = self.transport.request(method, endpoint, headers={**(headers or self.header), **kwargs.get('extra_headers', {})}, params=params, data=data)
+            except requests.exceptions.RequestException as e:
+                error = e
+            elapsed = time.monotonic() - start
+            if res is not None and self._isThrottled(res):
+                stats['throttled'] += 1
+                delay = ratelimit.rateLimiter.throttle(method, res.headers)
+                if elapsed + delay > policy.max_elapsed:
+                    self._recordRequest(method, endpoint, start, res, error, attempt, stats)
+                    return res
+                if verbose:
+                    print(f'Too many requests, waiting {delay} seconds')
+                continue
+            if res is not None:
+                ratelimit.rateLimiter.update(method, res.headers)
+            if res is not None and res.status_code == 401 and not renewed:
+                renewed = True
+                if verbose:
+                    print('Token rejected by the API, requesting a new one')
+                self._renewToken(verbose=verbose)
+                if headers is not None and 'Authorization' in headers:
+                    headers = {**headers, 'Authorization': f'Bearer {self.token}'}
+                continue
+            attempt += 1
+            retryable = policy.isRetryable(method, status_code=res.status_code if res is not None else None,
+                                           exception=error, idempotent=kwargs.get('idempotent', None))
+            backoff = policy.getBackoff(attempt) if retryable else 0
+            if not retryable or attempt > policy.max_retries or elapsed + backoff > policy.max_elapsed:
+                self._recordRequest(method, endpoint, start, res, error, attempt - 1, stats)
+                if error is not None:
+                    raise error
+                return res
+            if verbose:
+                print(f"{error or res.status_code} on {method} {endpoint}, retrying in {round(backoff, 2)} seconds")
+                print(f'{policy.max_retries - attempt} retry left')
+            stats['retry_wait'] += backoff
+            time.sleep(backoff)
+
+    def _getCacheKey(self, endpoint: str, params: dict = None, data: dict = None, **kwargs) -> str:
+        """
+        Returns the key of the request in the response caches, None if no cache is used for the request.
+        """
+        if kwargs.get('cache', True) == False or (not cache.responseCache.enabled and httpcache.httpCache is None):
+            return None
+        return cache.ResponseCache.getKey(endpoint, params=params, data=data, auth=tokens.tokenStore.getKey(self.config))
+
+    def _getCachedResponse(self, key: str) -> tuple:
+        """
+        Returns the cached response if it can be used without requesting the API,
+        and the headers of the conditional request revalidating the persistent cache otherwise.
+        """
+        if key is None:
+            return None, {}
+        if cache.responseCache.enabled:
+            res_json = cache.responseCache.get(key)
+            if res_json is not None:
+                return res_json, {}
+        if httpcache.httpCache is not None:
+            entry = httpcache.httpCache.get(key)
+            if entry is None:
+                httpcache.httpCache.misses += 1
+            elif httpcache.httpCache.isFresh(entry):
+                httpcache.httpCache.hits += 1
+                return entry['body'], {}
+            else:
+                return None, httpcache.httpCache.getValidationHeaders(entry)
+        return None, {}
+
+    def _readResponse(self, key: str, endpoint: str, res: requests.Response) -> dict:
+        """
+        Returns the JSON of a GET response and saves it in the response caches.
+        For a 304 Not Modified response, the body saved in the persistent cache is returned.
+        """
+        if res.status_code == 304 and key is not None and httpcache.httpCache is not None:
+            entry = httpcache.httpCache.get(key)
+            if entry is not None:
+                httpcache.httpCache.revalidated += 1
+                if cache.responseCache.enabled:
+                    cache.responseCache.set(key, entry['body'], url=endpoint)
+                return entry['body']
+        res_json = res.json()
+        if key is not None and res.status_code < 400 and 'error' not in res_json and 'errors' not in res_json:
+            if cache.responseCache.enabled:
+                cache.responseCache.set(key, res_json, url=endpoint)
+            if httpcache.httpCache is not None:
+                httpcache.httpCache.set(key, endpoint, res_json, res.headers)
+        return res_json
+
+    @staticmethod
+    def _invalidateCaches(endpoint: str) -> None:
+        """
+        Remove the cached responses of the resource types modified by a write request.
+        """
+        if cache.responseCache.enabled:
+            cache.responseCache.invalidate(url=endpoint)
+        if httpcache.httpCache is not None:
+            httpcache.httpCache.invalidate(url=endpoint)
 
     def getData(self, endpoint: str, params: dict = None, data: dict = None, headers: dict = None, *args, **kwargs):
         """
         Abstraction for getting data
+        possible kwargs:
+            cache : OPTIONAL : set to False to bypass the response caches.
+        Identical requests sent at the same time by several threads are only sent once, and each thread receives a copy of the response.
         """
-        internRetry = self.retry - kwargs.get("retry", 0)
-        self._checkingDate()
-        if headers is None:
-            headers = self.header
-        if params is None and data is None:
-            res = requests.get(
-                endpoint, headers=headers)
-        elif params is not None and data is None:
-            res = requests.get(
-                endpoint, headers=headers, params=params)
-        elif params is None and data is not None:
-            res = requests.get(
-                endpoint, headers=headers, data=data)
-        elif params is not None and data is not None:
-            res = requests.get(endpoint, headers=headers, params=params, data=data)
-        if kwargs.get("verbose", False):
-            print(f"request URL : {res.request.url}")
-            print(f"statut_code : {res.status_code}")
-        try:
-            if res.status_code == 429:
-                if kwargs.get("verbose", False):
-                    print(f'Too many requests')
-                time.sleep(45)
-                res_json = self.getData(endpoint, params=params, data=data, headers=headers, retry=internRetry, **kwargs)
-                return res_json
-            res_json = res.json()
-        except:
-            res_json = {'error': 'Request Error'}
-            while internRetry > 0:
-                internRetry -= 1
-                if kwargs.get("verbose", False):
-                    print('Retry parameter activated')
-                    print(f'{internRetry} retry left')
-                if 'error' in res_json.keys():
-                    time.sleep(30)
-                    res_json = self.getData(endpoint, params=params, data=data, headers=headers, retry=internRetry, **kwargs)
-                    return res_json
-        return res_json
+        cache_key = self._getCacheKey(endpoint, params=params, data=data, **kwargs)
+        res_json, validation_headers = self._getCachedResponse(cache_key)
+        if res_json is not None:
+            return res_json
+
+        def fetch() -> dict:
+            res = self._sendRequest('GET', endpoint, params=params, data=data, headers=headers, extra_headers=validation_headers, **kwargs)
+            if kwargs.get("verbose", False):
+                print(f"request URL : {res.request.url}")
+                print(f"statut_code : {res.status_code}")
+            try:
+                res_json = self._readResponse(cache_key, endpoint, res)
+            except:
+                res_json = {'error': 'Request Error'}
+            return res_json
+        if not coalescing.coalescer.enabled:
+            return fetch()
+        key = coalescing.coalescer.getKey(endpoint, params=params, data=data, headers=headers, auth=tokens.tokenStore.getKey(self.config))
+        return coalescing.coalescer.run(key, fetch)
 
     def postData(self, endpoint: str, params: dict = None, data: dict = None, headers: dict = None, *args, **kwargs):
         """
         Abstraction for posting data
+        possible kwargs:
+            idempotent : OPTIONAL : set to True to retry the request on 5xx and connection errors.
         """
-        self._checkingDate()
-        if headers is None:
-            headers = self.header
-        if params is None and data is None:
-            res = requests.post(endpoint, headers=headers)
-        elif params is not None and data is None:
-            res = requests.post(endpoint, headers=headers, params=params)
-        elif params is None and data is not None:
-            res = requests.post(endpoint, headers=headers, data=json.dumps(data))
-        elif params is not None and data is not None:
-            res = requests.post(endpoint, headers=headers, params=params, data=json.dumps(data))
+        res = self._sendRequest('POST', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
         try:
             res_json = res.json()
-            if res.status_code == 429 or res_json.get('error_code', None) == "429050":
-                time.sleep(45)
-                res_json = self.postData(endpoint, params=params, data=data, headers=headers, **kwargs)
-                return res_json
         except:
             if kwargs.get("verbose", False):
-                print("status_code: {res.status_code}")
+                print(f"status_code: {res.status_code}")
                 print(res.text)
             res_json = {'error': 'Request Error'}
         return res_json
 
     def patchData(self, endpoint: str, params: dict = None, data=None, headers: dict = None, *args, **kwargs):
         """
-        Abstraction for deleting data
+        Abstraction for patching data
+        possible kwargs:
+            idempotent : OPTIONAL : set to True to retry the request on 5xx and connection errors.
         """
-        self._checkingDate()
-        if headers is None:
-            headers = self.header
-        if params is not None and data is None:
-            res = requests.patch(endpoint, headers=headers, params=params)
-        elif params is None and data is not None:
-            res = requests.patch(endpoint, headers=headers, data=json.dumps(data))
-        elif params is not None and data is not None:
-            res = requests.patch(endpoint, headers=headers, params=params, data=json.dumps(data))
+        res = self._sendRequest('PATCH', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
         try:
             status_code = res.json()
         except:
@@ -186,17 +427,10 @@ class AdobeRequest:
 
     def putData(self, endpoint: str, params: dict = None, data=None, headers: dict = None, *args, **kwargs):
         """
-        Abstraction for deleting data
+        Abstraction for putting data
         """
-        self._checkingDate()
-        if headers is None:
-            headers = self.header
-        if params is not None and data is None:
-            res = requests.put(endpoint, headers=headers, params=params)
-        elif params is None and data is not None:
-            res = requests.put(endpoint, headers=headers, data=json.dumps(data))
-        elif params is not None and data is not None:
-            res = requests.put(endpoint, headers=headers, params=params, data=json.dumps(data))
+        res = self._sendRequest('PUT', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
         try:
             status_code = res.json()
         except:
@@ -209,17 +443,8 @@ class AdobeRequest:
         """
         Abstraction for deleting data
         """
-        self._checkingDate()
-        if headers is None:
-            headers = self.header
-        if params is None:
-            res = requests.delete(endpoint, headers=headers)
-        elif params is not None:
-            res = requests.delete(endpoint, headers=headers, params=params)
-        elif params is None and data is not None:
-            res = requests.delete(endpoint, headers=headers, data=json.dumps(data))
-        elif params is not None and data is not None:
-            res = requests.delete(endpoint, headers=headers, params=params, data=json.dumps(data))
+        res = self._sendRequest('DELETE', endpoint, params=params, data=data, headers=headers, **kwargs)
+        self._invalidateCaches(endpoint)
         try:
             status_code = res.status_code
         except:
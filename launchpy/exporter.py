@@ -0,0 +1,177 @@
+import os
+import time
+import atexit
+import tempfile
+import threading
+from pathlib import Path
+# Non standard libraries
+from launchpy import metrics
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _formatLabels(labels: dict) -> str:
+    if len(labels) == 0:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _formatValue(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def toTextFormat(registry: metrics.MetricsRegistry = None, labels: dict = None, openmetrics: bool = False) -> str:
+    """
+    Returns the metrics in the Prometheus text format, read by the textfile collector of the node exporter.
+    Arguments:
+        registry : OPTIONAL : MetricsRegistry to export. Default the registry of the connectors.
+        labels : OPTIONAL : labels added to all the samples, ex: {"job": "sync"}
+        openmetrics : OPTIONAL : use the OpenMetrics format instead (counter families without "_total", "# EOF" at the end).
+    """
+    registry = registry or metrics.registry
+    labels = labels or {}
+    families = {}
+    for name, metric_labels, metric in registry.collect():
+        families.setdefault(name, []).append(({**labels, **metric_labels}, metric))
+    families['launchpy_last_export_timestamp_seconds'] = [(labels, time.time())]
+    lines = []
+    for name, samples in families.items():
+        kind = 'gauge'
+        if isinstance(samples[0][1], metrics.Counter):
+            kind = 'counter'
+        elif isinstance(samples[0][1], metrics.Histogram):
+            kind = 'histogram'
+        family = name[:-len('_total')] if openmetrics and kind == 'counter' and name.endswith('_total') else name
+        help_text = registry.help.get(name, 'Time of the last export of the metrics.' if kind == 'gauge' else name)
+        lines.append(f'# HELP {family} {_escape(help_text)}')
+        lines.append(f'# TYPE {family} {kind}')
+        for sample_labels, metric in samples:
+            if kind == 'counter':
+                lines.append(f'{name}{_formatLabels(sample_labels)} {_formatValue(metric.value)}')
+            elif kind == 'histogram':
+                cumulated = 0
+                for bound, count in zip(list(metric.buckets) + [float('inf')], metric.counts):
+                    cumulated += count
+                    lines.append(f'{name}_bucket{_formatLabels({**sample_labels, "le": _formatValue(bound)})} {cumulated}')
+                lines.append(f'{name}_sum{_formatLabels(sample_labels)} {_formatValue(metric.sum)}')
+                lines.append(f'{name}_count{_formatLabels(sample_labels)} {metric.count}')
+            else:
+                lines.append(f'{name}{_formatLabels(sample_labels)} {_formatValue(metric)}')
+    if openmetrics:
+        lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+def writeTextfile(path: str, labels: dict = None, openmetrics: bool = False) -> Path:
+    """
+    Write the metrics of the connectors in a file, in the Prometheus text format.
+    The file is replaced atomically, so the collector never reads a partial file.
+    Arguments:
+        path : REQUIRED : path of the file, it should end with ".prom" for the node exporter textfile collector.
+        labels : OPTIONAL : labels added to all the samples, ex: {"job": "sync"}
+        openmetrics : OPTIONAL : use the OpenMetrics format instead.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = toTextFormat(labels=labels, openmetrics=openmetrics)
+    descriptor, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+class TextfileExporter:
+    """
+    Write the metrics of the connectors in a textfile at the end of the job, and at regular intervals if requested.
+    """
+
+    def __init__(self, path: str, interval: float = None, labels: dict = None, openmetrics: bool = False) -> None:
+        """
+        Arguments:
+            path : REQUIRED : path of the file, it should end with ".prom" for the node exporter textfile collector.
+            interval : OPTIONAL : number of seconds between two writes. Default None, only written at the end of the job.
+            labels : OPTIONAL : labels added to all the samples, ex: {"job": "sync"}
+            openmetrics : OPTIONAL : use the OpenMetrics format instead.
+        """
+        self.path = path
+        self.interval = interval
+        self.labels = labels
+        self.openmetrics = openmetrics
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self) -> Path:
+        """
+        Write the metrics in the file.
+        """
+        return writeTextfile(self.path, labels=self.labels, openmetrics=self.openmetrics)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Could not write the metrics in {self.path}: {e}")
+
+    def start(self) -> None:
+        """
+        Write the metrics at the end of the process, and every interval seconds if an interval is set.
+        """
+        atexit.register(self.stop)
+        if self.interval is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='launchpy-metrics-exporter', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the periodic writes and write the metrics a last time.
+        """
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        atexit.unregister(self.stop)
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+
+_exporter = None
+
+
+def startTextfileExporter(path: str, interval: float = None, labels: dict = None, openmetrics: bool = False) -> TextfileExporter:
+    """
+    Write the request, retry, throttle and operation metrics in a textfile at the end of the job
+    (and every interval seconds if an interval is set), to be scraped by the node exporter textfile collector.
+    Arguments:
+        path : REQUIRED : path of the file, ex: "/var/lib/node_exporter/textfile/launchpy_sync.prom"
+        interval : OPTIONAL : number of seconds between two writes. Default None, only written at the end of the job.
+        labels : OPTIONAL : labels added to all the samples, ex: {"job": "sync"}
+        openmetrics : OPTIONAL : use the OpenMetrics format instead of the Prometheus text format.
+    """
+    global _exporter
+    if _exporter is not None:
+        _exporter.stop()
+    _exporter = TextfileExporter(path, interval=interval, labels=labels, openmetrics=openmetrics)
+    _exporter.start()
+    return _exporter
+
+
+def stopTextfileExporter() -> None:
+    """
+    Stop the textfile exporter, after writing the metrics a last time.
+    """
+    global _exporter
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
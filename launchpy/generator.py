@@ -0,0 +1,336 @@
+import json
+import gzip
+import math
+import random
+import argparse
+from copy import deepcopy
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+# Non standard libraries
+from launchpy.mockserver import PREFIXES
+
+START_DATE = datetime(2023, 1, 1, tzinfo=timezone.utc)
+AREAS = ['home', 'search', 'product', 'cart', 'checkout', 'account', 'login', 'video', 'article', 'support', 'promo', 'store-locator']
+ACTIONS = ['page view', 'click', 'form submit', 'error', 'scroll depth', 'add to cart', 'download', 'exit link', 'impression', 'consent']
+FIELDS = ['name', 'id', 'category', 'type', 'value', 'price', 'quantity', 'step', 'status', 'language', 'country', 'segment']
+# (name, display name, delegate descriptors of the events, conditions, actions, data elements) of the main extensions
+PACKAGES = [
+    ('core', 'Core', ['core::events::library-loaded', 'core::events::dom-ready', 'core::events::click', 'core::events::custom-event', 'core::events::direct-call'],
+     ['core::conditions::path-and-querystring', 'core::conditions::value-comparison', 'core::conditions::custom-code'],
+     ['core::actions::custom-code'],
+     ['core::dataElements::javascript-variable', 'core::dataElements::custom-code', 'core::dataElements::cookie',
+      'core::dataElements::query-string-parameter', 'core::dataElements::constant', 'core::dataElements::dom-attribute']),
+    ('adobe-analytics', 'Adobe Analytics', [], [], ['adobe-analytics::actions::set-variables', 'adobe-analytics::actions::send-beacon',
+                                                   'adobe-analytics::actions::clear-variables'], []),
+    ('adobe-mcid', 'Experience Cloud ID Service', [], [], [], []),
+    ('adobe-alloy', 'Adobe Experience Platform Web SDK', [], [], ['adobe-alloy::actions::send-event'], ['adobe-alloy::dataElements::xdm-object']),
+]
+CODE_SNIPPETS = [
+    'var {v} = document.querySelector("{s}");',
+    'if ({v} && {v}.getAttribute("data-{f}")) {{ _satellite.setVar("{f}", {v}.getAttribute("data-{f}")); }}',
+    'window.digitalData = window.digitalData || {{}}; digitalData.{f} = digitalData.{f} || "{a}";',
+    '_satellite.logger.log("{a} {f}: " + _satellite.getVar("{d}"));',
+    'for (var i = 0; i < {n}; i++) {{ {v}List.push({{ "{f}": i, "area": "{a}" }}); }}',
+    'return typeof {v} !== "undefined" ? String({v}).toLowerCase().trim() : "";',
+    's.linkTrackVars = "eVar{n},prop{n},events"; s.linkTrackEvents = "event{n}";',
+]
+
+
+class PropertyGenerator:
+    """
+    Generate deterministic JSON:API datasets shaped like real properties, to be loaded by the local mock (MockReactor).
+    The same seed always produces the same ids, names, settings and dates.
+    """
+
+    def __init__(self, seed: int = 0, custom_code_size: int = 1500) -> None:
+        """
+        Arguments:
+            seed : OPTIONAL : seed of the random generator. Default 0.
+            custom_code_size : OPTIONAL : median number of characters of the custom codes. Default 1500.
+                The sizes follow a log-normal distribution, so a few custom codes are much bigger.
+        """
+        self.random = random.Random(seed)
+        self.custom_code_size = custom_code_size
+        self.packages = None
+        self.fixture = {}
+
+    def newId(self, resource_type: str) -> str:
+        return PREFIXES[resource_type] + '%032x' % self.random.getrandbits(128)
+
+    def newDate(self, after: str = None) -> str:
+        start = datetime.fromisoformat(after.replace('Z', '+00:00')) if after is not None else START_DATE
+        date = start + timedelta(seconds=self.random.randint(0, 365 * 24 * 3600))
+        return date.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+    def _add(self, resource_type: str, resource: dict) -> dict:
+        self.fixture.setdefault(resource_type, []).append(resource)
+        return resource
+
+    @staticmethod
+    def _rel(resource_type: str, _id: str) -> dict:
+        return {'data': {'id': _id, 'type': resource_type}}
+
+    def customCode(self, data_element_names: list = None) -> str:
+        """
+        Returns a JavaScript custom code, with a log-normal size around custom_code_size.
+        """
+        size = int(self.custom_code_size * math.exp(self.random.gauss(0, 0.8)))
+        lines = []
+        length = 0
+        while length < size:
+            line = self.random.choice(CODE_SNIPPETS).format(
+                v=f"el{self.random.randint(0, 99)}", s=f".{self.random.choice(AREAS)}-{self.random.choice(FIELDS)}",
+                f=self.random.choice(FIELDS), a=self.random.choice(AREAS), n=self.random.randint(1, 250),
+                d=self.random.choice(data_element_names) if data_element_names else 'page name')
+            lines.append(line)
+            length += len(line) + 1
+        return '\n'.join(lines)
+
+    def settings(self, descriptor: str, data_element_names: list = None) -> str:
+        """
+        Returns the settings (JSON string) of a component with realistic content for its delegate descriptor.
+        """
+        def dataElement() -> str:
+            return f"%{self.random.choice(data_element_names)}%" if data_element_names else f"%{self.random.choice(FIELDS)}%"
+        kind = descriptor.split('::')[-1]
+        if kind == 'custom-code':
+            settings = {'source': self.customCode(data_element_names), 'language': 'javascript'}
+            if '::actions::' in descriptor:
+                settings['global'] = self.random.random() < 0.2
+        elif kind == 'click':
+            settings = {'elementSelector': f".{self.random.choice(AREAS)}-{self.random.choice(FIELDS)}", 'bubbleFireIfParent': True,
+                        'bubbleFireIfChildFired': True, 'anchorDelay': 100}
+        elif kind in ['custom-event', 'direct-call']:
+            settings = {'identifier': f"{self.random.choice(AREAS)}:{self.random.choice(ACTIONS).replace(' ', '-')}"}
+        elif kind == 'path-and-querystring':
+            settings = {'paths': [{'value': f"/{self.random.choice(AREAS)}", 'valueIsRegex': self.random.random() < 0.3}]}
+        elif kind == 'value-comparison':
+            settings = {'leftOperand': dataElement(), 'comparison': {'operator': 'equals', 'caseInsensitive': True},
+                        'rightOperand': self.random.choice(AREAS)}
+        elif kind == 'set-variables':
+            settings = {'trackerProperties': {
+                'eVars': [{'name': f"eVar{self.random.randint(1, 250)}", 'type': 'value', 'value': dataElement()} for _ in range(self.random.randint(1, 15))],
+                'props': [{'name': f"prop{self.random.randint(1, 75)}", 'type': 'alias', 'value': f"eVar{self.random.randint(1, 250)}"} for _ in range(self.random.randint(0, 8))],
+                'events': [{'name': f"event{self.random.randint(1, 1000)}"} for _ in range(self.random.randint(0, 5))],
+                'pageName': dataElement()}}
+        elif kind == 'send-beacon':
+            settings = {'type': self.random.choice(['page', 'link']), 'linkName': self.random.choice(ACTIONS)}
+        elif kind == 'send-event':
+            settings = {'type': 'web.webpagedetails.pageViews', 'xdm': dataElement(), 'instanceName': 'alloy'}
+        elif kind == 'xdm-object':
+            settings = {'data': {'web': {'webPageDetails': {'name': dataElement(), 'siteSection': dataElement()}}}}
+        elif kind in ['javascript-variable', 'dom-attribute']:
+            settings = {'path': f"digitalData.{self.random.choice(AREAS)}.{self.random.choice(FIELDS)}"}
+        elif kind in ['cookie', 'query-string-parameter']:
+            settings = {'name': f"{self.random.choice(AREAS)}_{self.random.choice(FIELDS)}", 'caseInsensitive': True}
+        elif kind == 'constant':
+            settings = {'value': self.random.choice(AREAS)}
+        else:
+            settings = {}
+        return json.dumps(settings)
+
+    def _revisions(self, resource_type: str, head: dict, count: int, published_ratio: float) -> None:
+        """
+        Add count revisions of a resource (copies with the origin relationship), the last ones being published.
+        """
+        date = head['attributes']['created_at']
+        published = self.random.random() < published_ratio
+        for number in range(1, count + 1):
+            date = self.newDate(after=date) if number > 1 else date
+            revision = deepcopy(head)
+            revision['id'] = self.newId(resource_type)
+            revision['attributes'].update({'revision_number': number, 'created_at': date, 'updated_at': date,
+                                           'published': published and number == count, 'dirty': False})
+            revision['relationships']['origin'] = self._rel(resource_type, head['id'])
+            self._add(resource_type, revision)
+        head['meta'] = {'latest_revision_number': count}
+        head['attributes'].update({'published': published, 'dirty': not published, 'updated_at': date})
+
+    def extensionPackages(self, extensions: int = 40) -> list:
+        """
+        Returns the extension packages (created once, shared by all the properties of the dataset).
+        """
+        if self.packages is None:
+            self.packages = []
+            for index in range(extensions):
+                if index < len(PACKAGES):
+                    name, display_name, events, conditions, actions, data_elements = PACKAGES[index]
+                else:
+                    name, display_name = f"vendor-extension-{index}", f"Vendor Extension {index}"
+                    events, conditions = [f"{name}::events::event-{i}" for i in range(2)], [f"{name}::conditions::condition-0"]
+                    actions, data_elements = [f"{name}::actions::action-{i}" for i in range(3)], [f"{name}::dataElements::element-0"]
+                package = self._add('extension_packages', {
+                    'id': self.newId('extension_packages'),
+                    'attributes': {'name': name, 'display_name': display_name, 'platform': 'web',
+                                   'version': f"{self.random.randint(1, 5)}.{self.random.randint(0, 20)}.{self.random.randint(0, 9)}",
+                                   'created_at': self.newDate()}})
+                package['descriptors'] = {'events': events, 'conditions': conditions, 'actions': actions, 'data_elements': data_elements}
+                self.packages.append(package)
+        return self.packages[:extensions]
+
+    def property(self, name: str = 'Synthetic Property', company_id: str = None, rules: int = 5000, rule_components: int = 30000,
+                 data_elements: int = 10000, extensions: int = 40, revisions: int = 3, libraries: int = 20,
+                 published_ratio: float = 0.8) -> str:
+        """
+        Add a property and its components to the dataset. Returns the id of the property.
+        Arguments:
+            name : OPTIONAL : name of the property
+            company_id : OPTIONAL : id of the company of the property
+            rules : OPTIONAL : number of rules. Default 5000.
+            rule_components : OPTIONAL : number of rule components, spread unevenly between the rules. Default 30000.
+            data_elements : OPTIONAL : number of data elements. Default 10000.
+            extensions : OPTIONAL : number of extensions. Default 40.
+            revisions : OPTIONAL : maximum number of revisions of each rule, data element and extension. Default 3.
+            libraries : OPTIONAL : number of libraries. Default 20.
+            published_ratio : OPTIONAL : share of the components that are published. Default 0.8
+        """
+        prop_id = self.newId('properties')
+        relationships = {'company': self._rel('companies', company_id)} if company_id is not None else {}
+        self._add('properties', {'id': prop_id, 'attributes': {'name': name, 'platform': 'web', 'development': False,
+                                                               'domains': [f"{name.lower().replace(' ', '-')}.example.com"],
+                                                               'created_at': self.newDate()},
+                                 'relationships': relationships})
+        in_property = {'property': self._rel('properties', prop_id)}
+        # extensions
+        extension_ids = {}
+        for package in self.extensionPackages(extensions):
+            extension = self._add('extensions', {
+                'id': self.newId('extensions'),
+                'attributes': {'name': package['attributes']['name'], 'display_name': package['attributes']['display_name'],
+                               'version': package['attributes']['version'], 'created_at': self.newDate(),
+                               'delegate_descriptor_id': f"{package['attributes']['name']}::extensionConfiguration::config",
+                               'settings': json.dumps({'libraryCode': {'type': 'managed'}, 'trackerProperties': {}})},
+                'relationships': {**in_property, 'extension_package': self._rel('extension_packages', package['id'])}})
+            extension_ids[package['attributes']['name']] = extension['id']
+            self._revisions('extensions', extension, self.random.randint(1, revisions), published_ratio)
+        packages = self.extensionPackages(extensions)
+
+        def pick(kind: str) -> tuple:
+            candidates = [p for p in packages if len(p['descriptors'][kind]) > 0]
+            weights = [20 if p['attributes']['name'] in ['core', 'adobe-analytics'] else 1 for p in candidates]
+            package = self.random.choices(candidates, weights=weights)[0]
+            return extension_ids[package['attributes']['name']], self.random.choice(package['descriptors'][kind])
+        # data elements
+        data_element_names = []
+        for index in range(data_elements):
+            de_name = f"{self.random.choice(AREAS)}.{self.random.choice(FIELDS)} {index}"
+            extension_id, descriptor = pick('data_elements')
+            data_element = self._add('data_elements', {
+                'id': self.newId('data_elements'),
+                'attributes': {'name': de_name, 'delegate_descriptor_id': descriptor, 'created_at': self.newDate(),
+                               'settings': self.settings(descriptor, data_element_names[-50:]),
+                               'storage_duration': self.random.choice([None, 'pageview', 'session', 'visitor'])},
+                'relationships': {**in_property, 'extension': self._rel('extensions', extension_id)}})
+            data_element_names.append(de_name)
+            self._revisions('data_elements', data_element, self.random.randint(1, revisions), published_ratio)
+        # rules and their components, at least one component per rule
+        counts = [1] * rules
+        for index in self.random.choices(range(rules), k=max(0, rule_components - rules)) if rules > 0 else []:
+            counts[index] += 1
+        for index, count in enumerate(counts):
+            rule = self._add('rules', {
+                'id': self.newId('rules'),
+                'attributes': {'name': f"RL - {self.random.choice(AREAS)} - {self.random.choice(ACTIONS)} {index}",
+                               'enabled': self.random.random() < 0.9, 'created_at': self.newDate()},
+                'relationships': dict(in_property)})
+            self._revisions('rules', rule, self.random.randint(1, revisions), published_ratio)
+            for order in range(count):
+                kind = 'events' if order == 0 else self.random.choices(['events', 'conditions', 'actions'], weights=[1, 2, 4])[0]
+                extension_id, descriptor = pick(kind)
+                self._add('rule_components', {
+                    'id': self.newId('rule_components'),
+                    'attributes': {'name': descriptor.split('::')[-1].replace('-', ' ').title(), 'delegate_descriptor_id': descriptor,
+                                   'order': order, 'negate': kind == 'conditions' and self.random.random() < 0.1,
+                                   'settings': self.settings(descriptor, data_element_names), 'created_at': rule['attributes']['created_at'],
+                                   'published': rule['attributes'].get('published', False)},
+                    'relationships': {**in_property, 'extension': self._rel('extensions', extension_id),
+                                      'rules': {'data': [{'id': rule['id'], 'type': 'rules'}]}}})
+        # environments, libraries and notes
+        host = self._add('hosts', {'id': self.newId('hosts'), 'attributes': {'name': 'Managed by Adobe'}, 'relationships': dict(in_property)})
+        for stage in ['development', 'staging', 'production']:
+            self._add('environments', {'id': self.newId('environments'), 'attributes': {'name': stage.capitalize(), 'stage': stage},
+                                       'relationships': {**in_property, 'host': self._rel('hosts', host['id'])}})
+        rule_ids = [rule['id'] for rule in self.fixture.get('rules', []) if rule['relationships'].get('property') == in_property['property']
+                    and 'origin' not in rule['relationships']]
+        for index in range(libraries):
+            library_rules = self.random.sample(rule_ids, min(len(rule_ids), self.random.randint(1, 50)))
+            state = 'published' if index < libraries - 1 else 'development'
+            self._add('libraries', {'id': self.newId('libraries'),
+                                    'attributes': {'name': f"Release {index + 1}", 'state': state, 'build_required': state != 'published',
+                                                   'created_at': self.newDate()},
+                                    'relationships': {**in_property, 'rules': {'data': [{'id': _id, 'type': 'rules'} for _id in library_rules]}}})
+        for _id in rule_ids[:max(1, len(rule_ids) // 20)]:
+            self._add('notes', {'id': self.newId('notes'), 'attributes': {'text': f"Updated for the {self.random.choice(AREAS)} release"},
+                                'relationships': {'resource': self._rel('rules', _id)}})
+        return prop_id
+
+    def getFixture(self) -> dict:
+        """
+        Returns the dataset generated, without the internal information.
+        """
+        fixture = dict(self.fixture)
+        fixture['extension_packages'] = [{key: value for key, value in package.items() if key != 'descriptors'}
+                                         for package in self.fixture.get('extension_packages', [])]
+        return fixture
+
+
+def generateFixture(properties: int = 1, seed: int = 0, custom_code_size: int = 1500, audit_events: int = 1000, **kwargs) -> dict:
+    """
+    Returns a deterministic dataset (fixture for MockReactor) with a company and synthetic properties.
+    The properties share the same extensions, so they can be synchronized with the Synchronizer.
+    Arguments:
+        properties : OPTIONAL : number of properties, named "Synthetic Property 1", "Synthetic Property 2"... Default 1.
+        seed : OPTIONAL : seed of the random generator. Default 0.
+        custom_code_size : OPTIONAL : median number of characters of the custom codes. Default 1500.
+        audit_events : OPTIONAL : number of audit events. Default 1000.
+    possible kwargs (see PropertyGenerator.property):
+        rules, rule_components, data_elements, extensions, revisions, libraries, published_ratio
+    """
+    generator = PropertyGenerator(seed=seed, custom_code_size=custom_code_size)
+    company = generator._add('companies', {'id': generator.newId('companies'), 'attributes': {'name': 'Synthetic Company'}})
+    for index in range(properties):
+        generator.property(name=f"Synthetic Property {index + 1}", company_id=company['id'], **kwargs)
+    for _ in range(audit_events):
+        generator._add('audit_events', {'id': generator.newId('audit_events'), 'attributes': {
+            'type_of': f"{generator.random.choice(['rule', 'data_element', 'library'])}.{generator.random.choice(['created', 'updated', 'deleted'])}",
+            'created_at': generator.newDate()}})
+    return generator.getFixture()
+
+
+def saveFixture(fixture: dict, path: str) -> Path:
+    """
+    Write a fixture in a JSON file, compressed with gzip if the path ends with ".gz".
+    Arguments:
+        fixture : REQUIRED : the dataset
+        path : REQUIRED : path of the file
+    """
+    path = Path(path)
+    content = json.dumps(fixture, separators=(',', ':')).encode()
+    if path.suffix == '.gz':
+        content = gzip.compress(content, mtime=0)  # same bytes for the same seed
+    path.write_bytes(content)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m launchpy.generator', description='Generate a synthetic fixture for the mock Reactor API.')
+    parser.add_argument('output', help='path of the fixture, compressed if it ends with .gz')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-p', '--properties', type=int, default=1)
+    parser.add_argument('-r', '--rules', type=int, default=5000)
+    parser.add_argument('-rc', '--rule_components', type=int, default=30000)
+    parser.add_argument('-de', '--data_elements', type=int, default=10000)
+    parser.add_argument('-e', '--extensions', type=int, default=40)
+    parser.add_argument('-rv', '--revisions', type=int, default=3)
+    parser.add_argument('-l', '--libraries', type=int, default=20)
+    parser.add_argument('-cs', '--custom_code_size', type=int, default=1500)
+    args = parser.parse_args()
+    fixture = generateFixture(properties=args.properties, seed=args.seed, custom_code_size=args.custom_code_size,
+                              rules=args.rules, rule_components=args.rule_components, data_elements=args.data_elements,
+                              extensions=args.extensions, revisions=args.revisions, libraries=args.libraries)
+    path = saveFixture(fixture, args.output)
+    print(f"{path}: " + ', '.join(f"{len(resources)} {resource_type}" for resource_type, resources in fixture.items()))
+
+
+if __name__ == '__main__':
+    main()
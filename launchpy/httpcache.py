@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from pathlib import Path
+# Non standard libraries
+from launchpy import config
+from launchpy.cache import getResourceTypes
+
+
+class HTTPCache:
+    """
+    Persistent cache of the GET responses, stored in a SQLite database.
+    When the API returns an ETag or a Last-Modified header, the cached response is revalidated with a conditional request
+    (If-None-Match / If-Modified-Since) and only downloaded again if it changed.
+    Responses without validators are reused until their time to live expires.
+    """
+
+    def __init__(self, path: str = None, ttl: float = 86400) -> None:
+        """
+        Arguments:
+            path : OPTIONAL : path of the SQLite database. Default "~/.launchpy/httpcache.sqlite"
+            ttl : OPTIONAL : number of seconds a response without validators is reused. Default 86400 (1 day).
+        """
+        if path is None:
+            path = Path.home() / '.launchpy' / 'httpcache.sqlite'
+        self.path = Path(path)
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not self.path.exists():  # the responses may contain sensitive data, readable only by the current user
+            os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                resource_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                expires REAL,
+                body BLOB)""")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_type ON responses (resource_type)")
+
+    def get(self, key: str) -> dict:
+        """
+        Returns the cached entry ({'etag','last_modified','expires','body'}), None if not cached.
+        Arguments:
+            key : REQUIRED : cache key of the request
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified, expires, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'expires': row[2], 'body': json.loads(zlib.decompress(row[3]))}
+
+    @staticmethod
+    def isFresh(entry: dict) -> bool:
+        """
+        Returns True if the entry can be used without asking the API.
+        Entries with validators are always revalidated.
+        """
+        return entry['etag'] is None and entry['last_modified'] is None and time.time() < entry['expires']
+
+    @staticmethod
+    def getValidationHeaders(entry: dict) -> dict:
+        """
+        Returns the headers of the conditional request revalidating an entry.
+        """
+        headers = {}
+        if entry['etag'] is not None:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified'] is not None:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def set(self, key: str, url: str, body: dict, headers: dict = None) -> None:
+        """
+        Save a response in the cache.
+        Arguments:
+            key : REQUIRED : cache key of the request
+            url : REQUIRED : url of the request
+            body : REQUIRED : the response (JSON)
+            headers : OPTIONAL : headers of the response, to extract the validators.
+        """
+        headers = headers or {}
+        resource_types = getResourceTypes(url)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, resource_types[-1] if len(resource_types) > 0 else None,
+                 headers.get('ETag'), headers.get('Last-Modified'), time.time() + self.ttl,
+                 zlib.compress(json.dumps(body).encode())))
+
+    def invalidate(self, resource_type: str = None, url: str = None) -> int:
+        """
+        Remove the cached responses of a resource type, or of all the resource types of an url.
+        Without argument, all the responses are removed. Returns the number of responses removed.
+        Arguments:
+            resource_type : OPTIONAL : resource type to invalidate, ex: "rules"
+            url : OPTIONAL : url of a write request, all the resource types of this url are invalidated.
+        """
+        with self._lock, self._connection:
+            if resource_type is None and url is None:
+                return self._connection.execute("DELETE FROM responses").rowcount
+            resource_types = set(getResourceTypes(url)) if url is not None else set()
+            if resource_type is not None:
+                resource_types.add(resource_type)
+            placeholders = ','.join('?' for _ in resource_types)
+            return self._connection.execute(
+                f"DELETE FROM responses WHERE resource_type IN ({placeholders})", tuple(resource_types)).rowcount
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+httpCache = None
+
+
+def enableHTTPCache(path: str = None, ttl: float = 86400) -> HTTPCache:
+    """
+    Keep the GET responses in a persistent cache on disk, shared by all the connectors and the next processes.
+    Responses with an ETag or Last-Modified header are revalidated with a conditional request, the others are reused until their ttl.
+    Arguments:
+        path : OPTIONAL : path of the SQLite database. Default "~/.launchpy/httpcache.sqlite"
+        ttl : OPTIONAL : number of seconds a response without validators is reused. Default 86400 (1 day).
+    """
+    global httpCache
+    if httpCache is not None:
+        httpCache.close()
+    config.http_cache.update({'enabled': True, 'path': path, 'ttl': ttl})
+    httpCache = HTTPCache(path=path, ttl=ttl)
+    return httpCache
+
+
+def disableHTTPCache() -> None:
+    """
+    Stop using the persistent cache. The responses already saved are kept on disk.
+    """
+    global httpCache
+    if httpCache is not None:
+        httpCache.close()
+    config.http_cache['enabled'] = False
+    httpCache = None
@@ -0,0 +1,151 @@
+from typing import Callable, Iterator
+
+
+class ElementIndex:
+    """
+    Hash indexes over a list of elements of the API (properties, rules, rule components, data elements, extensions, libraries...):
+        id -> element, name -> ids, delegate descriptor -> ids.
+    The lookups are O(1), instead of a scan of the list of elements.
+    The PropertySnapshot maintains its relations (rule -> rule components, extension -> components, library -> members) with the on_add and on_remove hooks.
+    """
+
+    def __init__(self, elements: list = None, on_add: Callable = None, on_remove: Callable = None) -> None:
+        """
+        Arguments:
+            elements : OPTIONAL : list of elements to index.
+            on_add : OPTIONAL : function called with each element added to the index.
+            on_remove : OPTIONAL : function called with each element removed from the index, and True when it is replaced by a new version of it.
+        """
+        self.elements = {}
+        self._names = {}
+        self._descriptors = {}
+        self.on_add = on_add
+        self.on_remove = on_remove
+        if elements is not None:
+            self.extend(elements)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __contains__(self, _id: str) -> bool:
+        return _id in self.elements
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(list(self.elements.values()))
+
+    @staticmethod
+    def _getKeys(element: dict) -> tuple:
+        attributes = element.get('attributes', {}) or {}
+        return attributes.get('name', None), attributes.get('delegate_descriptor_id', None)
+
+    def _unindex(self, element: dict) -> None:
+        for index, key in zip([self._names, self._descriptors], self._getKeys(element)):
+            ids = index.get(key, [])
+            if element['id'] in ids:
+                ids.remove(element['id'])
+                if len(ids) == 0:
+                    del index[key]
+
+    def add(self, element: dict) -> dict:
+        """
+        Add an element to the indexes, or replace the element with the same id. Returns the element.
+        The values that are not elements (no id, ex: an error returned by the API) are ignored.
+        Arguments:
+            element : REQUIRED : definition of the element
+        """
+        if not isinstance(element, dict) or element.get('id', None) is None:
+            return element
+        previous = self.elements.get(element['id'], None)
+        if previous is not None:
+            self._unindex(previous)
+            if self.on_remove is not None:
+                self.on_remove(previous, True)
+        self.elements[element['id']] = element
+        name, descriptor = self._getKeys(element)
+        self._names.setdefault(name, []).append(element['id'])
+        if descriptor is not None:
+            self._descriptors.setdefault(descriptor, []).append(element['id'])
+        if self.on_add is not None:
+            self.on_add(element)
+        return element
+
+    def extend(self, elements: list) -> list:
+        """
+        Add a list of elements to the indexes. Returns the list.
+        Arguments:
+            elements : REQUIRED : list of elements
+        """
+        if isinstance(elements, list):
+            for element in elements:
+                self.add(element)
+        return elements
+
+    def replace(self, elements: list) -> list:
+        """
+        Replace all the elements indexed by the list of elements (complete listing): the elements missing from the list are removed. Returns the list.
+        Arguments:
+            elements : REQUIRED : list of elements
+        """
+        if isinstance(elements, list):
+            listed = {element.get('id', None) for element in elements if isinstance(element, dict)}
+            for _id in [_id for _id in self.elements if _id not in listed]:
+                self.remove(_id)
+            self.extend(elements)
+        return elements
+
+    def remove(self, _id: str) -> dict:
+        """
+        Remove an element from the indexes. Returns the element removed, None if it was not indexed.
+        Arguments:
+            _id : REQUIRED : id of the element
+        """
+        element = self.elements.pop(_id, None)
+        if element is not None:
+            self._unindex(element)
+            if self.on_remove is not None:
+                self.on_remove(element, False)
+        return element
+
+    def clear(self) -> None:
+        """
+        Remove all the elements.
+        """
+        for _id in list(self.elements):
+            self.remove(_id)
+
+    def get(self, key: str) -> dict:
+        """
+        Returns an element from its id or its name (the first one indexed when several elements share the name). None if not found.
+        Arguments:
+            key : REQUIRED : id or name of the element
+        """
+        element = self.elements.get(key, None)
+        if element is None:
+            ids = self._names.get(key, [])
+            element = self.elements[ids[0]] if len(ids) > 0 else None
+        return element
+
+    def getId(self, name: str) -> str:
+        """
+        Returns the id of the element with that name (the first one indexed when several elements share the name). None if not found.
+        Arguments:
+            name : REQUIRED : name of the element
+        """
+        ids = self._names.get(name, [])
+        return ids[0] if len(ids) > 0 else None
+
+    def getByName(self, name: str) -> list:
+        """
+        Returns the elements with that name.
+        Arguments:
+            name : REQUIRED : name of the elements
+        """
+        return [self.elements[_id] for _id in self._names.get(name, [])]
+
+    def getByDescriptor(self, descriptor: str) -> list:
+        """
+        Returns the elements using that delegate descriptor (ex: "core::events::library-loaded").
+        Arguments:
+            descriptor : REQUIRED : delegate_descriptor_id of the elements
+        """
+        return [self.elements[_id] for _id in self._descriptors.get(descriptor, [])]
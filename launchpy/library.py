@@ -1,6 +1,8 @@
 import time
 # Non standard libraries
 from launchpy import config, connector
+from launchpy.paginator import Paginator
+from launchpy.tracing import traced
 from typing import Union
 
 class Library:
@@ -18,10 +20,11 @@ class Library:
             raise ValueError("Require a library definition") 
         self.connector = connector.AdobeRequest(
             config_object=config_object, header=header)
+        self.paginator = Paginator(self.connector)
         self.header = self.connector.header
         self.endpoint = config.endpoints['global']
         if type(data) == str:
-            data = self.connector.getData("https://reactor.adobe.io/libraries/"+data).get('data')
+            data = self.connector.getData(self.endpoint+"/libraries/"+data).get('data')
         self.id = data['id']
         self.name = data['attributes']['name']
         self.state = data['attributes']['state']
@@ -41,6 +44,7 @@ class Library:
         self._environments = {}
         self._dev_env = ''
 
+    @traced
     def getDataElements(self,page:int=0,pageSize:int=50,origin:bool=True)->list:
         """
         retrieve the list of Data Elements attached to this library
@@ -49,15 +53,8 @@ class Library:
             pageSize : OPTIONAL : How many result per page
             origin : OPTIONAL : If you want to list the original data element ID and not the revision
         """
-        params = {"page[number]":page,"page[size]":pageSize}
-        res = self.connector.getData(self._DataElements,params=params)
-        data = res.get('data',[])
-        next = res.get('meta',{}).get('pagination',{}).get('next_page',None)
-        while next is not None:
-            params["page[number]"] +=1
-            res = self.connector.getData(self._DataElements,params=params)
-            data += res.get('data',[])
-            next = res.get('meta',{}).get('pagination',{}).get('next_page',None)
+        params = {"page[size]":pageSize}
+        data = self.paginator.getAll(self._DataElements,params=params,start_page=page,strict=True)
         # assign the list to its dict value
         if origin:
             dataOrigin = []
@@ -73,6 +70,7 @@ class Library:
         self.relationships['data_elements'] = data
         return data
 
+    @traced
     def getExtensions(self,page:int=0,pageSize:int=50,origin:bool=True)->list:
         """
         retrieve the list of Extensions attached to this library
@@ -81,15 +79,8 @@ class Library:
             pageSize : OPTIONAL : How many result per page
             origin : OPTIONAL : If you want to list the original extension ID and not the revision
         """
-        params = {"page[number]":page,"page[size]":pageSize}
-        res = self.connector.getData(self._Extensions,params=params)
-        data = res.get('data',[])
-        next = res.get('meta',{}).get('pagination',{}).get('next_page',None)
-        while next is not None:
-            params["page[number]"] +=1
-            res = self.connector.getData(self._Extensions,params=params)
-            data += res.get('data',[])
-            next = res.get('meta',{}).get('pagination',{}).get('next_page',None)
+        params = {"page[size]":pageSize}
+        data = self.paginator.getAll(self._Extensions,params=params,start_page=page,strict=True)
         if origin:
             dataOrigin = []
             for ext in data:
@@ -104,23 +95,17 @@ class Library:
         self.relationships['extensions'] = data
         return data
     
+    @traced
     def getBuilds(self)->list:
         """
         Retrieve the last builds.
         Return a list of build
         """
-        params = {'page[number]':1}
-        res = self.connector.getData(self._Builds,params=params)
-        builds = res.get('data',[])
-        next_page = res.get('meta',{}).get('pagination',{}).get('next_page',None)
-        while next_page is not None:
-            params['page[number]'] +=1
-            res = self.connector.getData(self._Builds,params=params)
-            builds += res.get('data',[])
-            next_page = res.get('meta',{}).get('pagination',{}).get('next_page',None)
+        builds = self.paginator.getAll(self._Builds,start_page=1,strict=True)
         return builds
 
 
+    @traced
     def getRules(self,page:int=0,pageSize:int=50,origin:bool=True)->list:
         """
         retrieve the list of rules attached to this library
@@ -129,15 +114,8 @@ class Library:
             pageSize : OPTIONAL : How many result per page
             origin : OPTIONAL : If you want to list the original rule ID and not the revision
         """
-        params = {"page[number]":page,"page[size]":pageSize}
-        res = self.connector.getData(self._Rules,params=params)
-        data = res.get('data',[])
-        next = res.get('meta',{}).get('pagination',{}).get('next_page',None)
-        while next is not None:
-            params["page[number]"] +=1
-            res = self.connector.getData(self._Rules,params=params)
-            data += res.get('data',[])
-            next = res.get('meta',{}).get('pagination',{}).get('next_page',None)
+        params = {"page[size]":pageSize}
+        data = self.paginator.getAll(self._Rules,params=params,start_page=page,strict=True)
         if origin:
             dataOrigin = []
             for rule in data:
@@ -152,12 +130,14 @@ class Library:
         self.relationships['rules'] = data
         return data
 
+    @traced
     def getFullLibrary(self)->dict:
         self.getDataElements()
         self.getRules()
         self.getExtensions()
         return self.relationships
 
+    @traced
     def addDataElements(self, data_element_ids: list)->dict:
         """
         Take a list of data elements id and attach them to the library. 
@@ -177,6 +157,7 @@ class Library:
         res = self.connector.postData(self.endpoint +url, data=obj)
         return res
     
+    @traced
     def updateDataElements(self,data_element_ids:list)->dict:
         """
         Update the data element inside the library. (PATCH)
@@ -196,6 +177,7 @@ class Library:
         res = self.connector.patchData(self.endpoint +url, data=obj)
         return res
 
+    @traced
     def removeDataElements(self,data_element_ids:list)->dict:
         """
         Take a list of data elements and remove them from the library.
@@ -215,6 +197,7 @@ class Library:
         res = self.connector.deleteData(self.endpoint +url, data=obj)
         return res
 
+    @traced
     def addRules(self, rules_ids: list)->dict:
         """
         Take a list of rules id and attach them to the library. 
@@ -235,6 +218,7 @@ class Library:
         res = self.connector.postData(self.endpoint + url, data=obj)
         return res
     
+    @traced
     def updateRules(self,rules_ids:list)->dict:
         """
         Replace all existing rules with the ones posted.
@@ -254,6 +238,7 @@ class Library:
         res = self.connector.patchData(self.endpoint + url, data=obj)
         return res
 
+    @traced
     def removeRules(self,rules_ids:list)->dict:
         """
         Remove the rules that are passed. 
@@ -273,6 +258,7 @@ class Library:
         return res
 
 
+    @traced
     def addExtensions(self, extensions_ids: list)->object:
         """
         Take a list of extension id and attach them to the library. 
@@ -292,6 +278,7 @@ class Library:
         res = self.connector.postData(self.endpoint+url, data=obj)
         return res
     
+    @traced
     def updateExtensions(self, extensions_ids: list)->object:
         """
         Replace all existing extensions into the library. 
@@ -311,6 +298,7 @@ class Library:
         res = self.connector.patchData(self.endpoint+url, data=obj)
         return res
 
+    @traced
     def setEnvironments(self, environments_list: list, dev_name: str = None)->None:
         """
         Save the different environments ids available in a config variable.
@@ -340,6 +328,7 @@ class Library:
         res = new_env
         return res
 
+    @traced
     def setEnvironment(self, env_id: str,verbose:bool=False)->None:
         """
         Set the environment of the library. 
@@ -363,6 +352,7 @@ class Library:
         new_env = self.connector.getData(self.endpoint+path) 
         return new_env
 
+    @traced
     def updateLibrary(self,empty:bool=False)->dict:
         """
         Update the library
@@ -398,6 +388,7 @@ class Library:
         return res
 
 
+    @traced
     def build(self,timesleep:int=20, verbose:bool=False)->dict:
         """
         Build the library. 
@@ -460,6 +451,7 @@ class Library:
             self.build_status = build['data']['attributes']['status']
         return build
 
+    @traced
     def transition(self, action: str = None, **kwargs)->object:
         """
         Move the library along the publishing funnel.
@@ -0,0 +1,243 @@
+import json
+import time
+import threading
+from bisect import bisect_left
+from pathlib import Path
+# Non standard libraries
+from launchpy import config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Counter:
+    """
+    Value that only increases, such as a number of requests.
+    """
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def toDict(self) -> dict:
+        return {'value': self.value}
+
+
+class Histogram:
+    """
+    Distribution of observed values (latency, size), counted in buckets.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns an estimation of the quantile q (0 to 1), interpolated within the buckets.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulated = 0
+        for index, count in enumerate(self.counts):
+            if cumulated + count >= rank and count > 0:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(self.max, max(self.min, lower + (upper - lower) * (rank - cumulated) / count))
+            cumulated += count
+        return self.max
+
+    def toDict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count > 0 else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': {str(bound): count for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts)}
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process registry of the metrics (counters and histograms), identified by a name and labels.
+    The connectors record every request in the default registry (launchpy.metrics.registry).
+    """
+
+    def __init__(self) -> None:
+        self.enabled = config.metrics['enabled']
+        self.help = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _getMetric(self, kind: type, name: str, labels: dict, **kwargs) -> object:
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key, None)
+        if metric is None:
+            metric = kind(**kwargs)
+            self._metrics[key] = metric
+        return metric
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """
+        Increment a counter.
+        Arguments:
+            name : REQUIRED : name of the counter
+            amount : OPTIONAL : value to add. Default 1.
+            labels : OPTIONAL : labels of the counter, as keyword arguments
+        """
+        with self._lock:
+            self._getMetric(Counter, name, labels).inc(amount)
+
+    def observe(self, name: str, value: float, buckets: tuple = DEFAULT_BUCKETS, **labels) -> None:
+        """
+        Add a value to a histogram.
+        Arguments:
+            name : REQUIRED : name of the histogram
+            value : REQUIRED : observed value
+            buckets : OPTIONAL : upper bounds of the buckets, used when the histogram is created.
+            labels : OPTIONAL : labels of the histogram, as keyword arguments
+        """
+        with self._lock:
+            self._getMetric(Histogram, name, labels, buckets=buckets).observe(value)
+
+    def get(self, name: str, **labels) -> object:
+        """
+        Returns the counter or histogram matching the name and the labels, None if it does not exist.
+        """
+        return self._metrics.get((name, tuple(sorted(labels.items()))), None)
+
+    def total(self, name: str, **labels) -> float:
+        """
+        Returns the sum of the counters (or the number of observations of the histograms) with that name,
+        for all the label values not specified.
+        ex: registry.total("launchpy_requests_total", status="429")
+        """
+        total = 0
+        with self._lock:
+            for (metric_name, metric_labels), metric in self._metrics.items():
+                metric_labels = dict(metric_labels)
+                if metric_name == name and all(metric_labels.get(key) == str(value) for key, value in labels.items()):
+                    total += metric.value if isinstance(metric, Counter) else metric.count
+        return total
+
+    def collect(self) -> list:
+        """
+        Returns the list of the metrics as tuples (name, labels, metric), sorted by name.
+        """
+        with self._lock:
+            return sorted([(name, dict(labels), metric) for (name, labels), metric in self._metrics.items()],
+                          key=lambda metric: (metric[0], sorted(metric[1].items())))
+
+    def getMetrics(self) -> dict:
+        """
+        Returns all the metrics as a dictionary {name: [{"labels":..., <values>}]}.
+        """
+        metrics = {}
+        for name, labels, metric in self.collect():
+            metrics.setdefault(name, []).append({'labels': labels, 'type': type(metric).__name__.lower(), **metric.toDict()})
+        return metrics
+
+    def dump(self, path: str = None) -> str:
+        """
+        Returns the metrics as a JSON string, and write them in a file if a path is provided.
+        Arguments:
+            path : OPTIONAL : path of the JSON file to write.
+        """
+        content = json.dumps({'started': self.started, 'ended': time.time(), 'metrics': self.getMetrics()}, indent=2)
+        if path is not None:
+            Path(path).write_text(content)
+        return content
+
+    def reset(self) -> None:
+        """
+        Remove all the metrics.
+        """
+        with self._lock:
+            self._metrics.clear()
+        self.started = time.time()
+
+    def recordRequest(self, method: str, endpoint: str, status: str, duration: float, size: int = None,
+                      retries: int = 0, throttled: int = 0, rate_limit_wait: float = 0, retry_wait: float = 0) -> None:
+        """
+        Record a request sent by a connector.
+        Arguments:
+            method : REQUIRED : HTTP method
+            endpoint : REQUIRED : endpoint template, with the ids normalized (see cache.normalizeEndpoint)
+            status : REQUIRED : status code of the response, or name of the exception raised
+            duration : REQUIRED : seconds spent, including the retries and waits
+            size : OPTIONAL : bytes of the response body
+            retries : OPTIONAL : number of retries (excluding the 429)
+            throttled : OPTIONAL : number of 429 responses received
+            rate_limit_wait : OPTIONAL : seconds spent waiting for the rate limiter
+            retry_wait : OPTIONAL : seconds spent waiting before the retries
+        """
+        if not self.enabled:
+            return
+        self.inc('launchpy_requests_total', method=method, endpoint=endpoint, status=str(status))
+        self.observe('launchpy_request_duration_seconds', duration, method=method, endpoint=endpoint)
+        if size is not None:
+            self.observe('launchpy_response_size_bytes', size, buckets=BYTES_BUCKETS, method=method, endpoint=endpoint)
+        if retries > 0:
+            self.inc('launchpy_retries_total', retries, method=method, endpoint=endpoint)
+        if throttled > 0:
+            self.inc('launchpy_throttled_total', throttled, method=method, endpoint=endpoint)
+        if rate_limit_wait > 0:
+            self.inc('launchpy_rate_limit_wait_seconds_total', rate_limit_wait, method=method)
+        if retry_wait > 0:
+            self.inc('launchpy_retry_wait_seconds_total', retry_wait, method=method)
+
+    def recordOperation(self, operation: str, duration: float, status: str = 'success') -> None:
+        """
+        Record a call of a high-level method (see launchpy.tracing.traced).
+        Arguments:
+            operation : REQUIRED : name of the method, ex: "Synchronizer.syncComponent"
+            duration : REQUIRED : seconds spent
+            status : OPTIONAL : "success" or "error"
+        """
+        if not self.enabled:
+            return
+        self.inc('launchpy_operations_total', operation=operation, status=status)
+        self.observe('launchpy_operation_duration_seconds', duration, operation=operation)
+
+
+registry = MetricsRegistry()
+registry.help = {
+    'launchpy_requests_total': 'Number of requests sent to the API.',
+    'launchpy_request_duration_seconds': 'Duration of the requests, including the retries and waits.',
+    'launchpy_response_size_bytes': 'Size of the response bodies.',
+    'launchpy_retries_total': 'Number of retries of failed requests.',
+    'launchpy_throttled_total': 'Number of requests throttled by the API (429).',
+    'launchpy_rate_limit_wait_seconds_total': 'Time spent waiting for the rate limiter.',
+    'launchpy_retry_wait_seconds_total': 'Time spent waiting before retrying a request.',
+    'launchpy_token_renewals_total': 'Number of tokens renewed after being rejected by the API (401).',
+    'launchpy_operations_total': 'Number of calls of the high-level methods.',
+    'launchpy_operation_duration_seconds': 'Duration of the high-level methods.',
+}
+
+
+def dumpMetrics(path: str = None) -> str:
+    """
+    Returns the metrics recorded by the connectors as a JSON string, and write them in a file if a path is provided.
+    Arguments:
+        path : OPTIONAL : path of the JSON file to write.
+    """
+    return registry.dump(path)
@@ -0,0 +1,820 @@
+import json
+import gzip
+import math
+import time
+import random
+import argparse
+import threading
+from copy import deepcopy
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+# Non standard libraries
+from launchpy import config
+
+# prefix of the ids generated for each resource type
+PREFIXES = {
+    'companies': 'CO', 'properties': 'PR', 'rules': 'RL', 'rule_components': 'RC', 'data_elements': 'DE',
+    'extensions': 'EX', 'extension_packages': 'EP', 'libraries': 'LB', 'builds': 'BL', 'environments': 'EN',
+    'hosts': 'HT', 'notes': 'NT', 'audit_events': 'AE', 'extension_package_usage_authorizations': 'EA'
+}
+# collections reachable from a resource, ex: /properties/{id}/rules
+CHILDREN = {
+    'companies': ['properties'],
+    'properties': ['rules', 'rule_components', 'data_elements', 'extensions', 'libraries', 'environments', 'hosts', 'notes'],
+    'rules': ['rule_components', 'revisions', 'notes'],
+    'rule_components': ['revisions', 'notes'],
+    'data_elements': ['revisions', 'notes'],
+    'extensions': ['revisions', 'notes'],
+    'libraries': ['rules', 'data_elements', 'extensions', 'builds', 'notes'],
+    'extension_packages': ['extension_package_usage_authorizations'],
+}
+# name of the relationship pointing to a resource of that type
+SINGULARS = {'companies': 'company', 'properties': 'property', 'libraries': 'library', 'rules': 'rule',
+             'extensions': 'extension', 'environments': 'environment', 'extension_packages': 'extension_package'}
+LIBRARY_RESOURCES = ['rules', 'data_elements', 'extensions']
+REVISABLE = ['rules', 'rule_components', 'data_elements', 'extensions']
+TRANSITIONS = {'develop': 'development', 'submit': 'submitted', 'approve': 'approved', 'reject': 'rejected'}
+DEFAULTS = {
+    'companies': {'name': 'Mock Company', 'org_id': 'MOCK@AdobeOrg'},
+    'properties': {'platform': 'web', 'development': False, 'domains': ['example.com'], 'enabled': True,
+                   'privacy': 'optedin', 'ssl_enabled': True, 'undefined_vars_return_empty': False},
+    'rules': {'enabled': True, 'published': False, 'dirty': True, 'revision_number': 0, 'published_at': None},
+    'rule_components': {'order': 0, 'negate': False, 'rule_order': 50.0, 'timeout': 2000, 'delay_next': True,
+                        'settings': None, 'published': False, 'dirty': True, 'revision_number': 0},
+    'data_elements': {'enabled': True, 'settings': None, 'default_value': '', 'clean_text': False, 'force_lower_case': False,
+                      'storage_duration': None, 'published': False, 'dirty': True, 'revision_number': 0},
+    'extensions': {'enabled': True, 'settings': None, 'published': False, 'dirty': True, 'revision_number': 0},
+    'extension_packages': {'platform': 'web', 'availability': 'public', 'version': '1.0.0'},
+    'libraries': {'state': 'development', 'build_required': True, 'published_at': None},
+    'builds': {'status': 'succeeded'},
+    'environments': {'stage': 'development', 'archive': False, 'path': ''},
+    'hosts': {'type_of': 'akamai', 'status': 'succeeded'},
+    'notes': {'text': '', 'author_display_name': 'Mock User'},
+    'audit_events': {'type_of': 'rule.updated', 'display_type': 'rule'},
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class DroppedConnection(ConnectionError):
+    """
+    Raised by MockReactor.handle when the fault injection drops the connection, no response is sent.
+    """
+
+
+class Faults:
+    """
+    Failures and latency injected by the MockReactor in the Reactor requests (the IMS requests are not affected),
+    to measure the retries, the rate limiter and the throughput under realistic conditions.
+    ex:
+        Faults(latency={"distribution": "lognormal", "median": 0.15, "sigma": 0.6}, throttle_rate=0.01, throttle_duration=5, error_rate=0.02)
+    The latency is a number of seconds or a dictionary with the distribution and its parameters:
+        {"distribution": "constant", "value": 0.1}
+        {"distribution": "uniform", "min": 0.05, "max": 0.3}
+        {"distribution": "normal", "mean": 0.2, "stddev": 0.05}
+        {"distribution": "lognormal", "median": 0.2, "sigma": 0.5}
+        {"distribution": "exponential", "mean": 0.2}
+        {"distribution": "pareto", "scale": 0.1, "alpha": 2.5}
+    Optional keys: "per_item" (seconds added per element of a page, for slow pages) and "max" (cap of the latency).
+    """
+
+    def __init__(self, latency: float | dict = None, error_rate: float = 0.0, error_statuses: list = (500, 502, 503, 504),
+                 throttle_rate: float = 0.0, throttle_duration: float = 1.0, retry_after: int = None,
+                 drop_rate: float = 0.0, token_lifetime: float = None, seed: int = 0) -> None:
+        """
+        Arguments:
+            latency : OPTIONAL : latency added to the responses, in seconds or as a distribution (see above).
+            error_rate : OPTIONAL : share of the requests answered with a 5xx error (0 to 1). Default 0.
+            error_statuses : OPTIONAL : status codes of the errors, picked randomly. Default 500, 502, 503, 504.
+            throttle_rate : OPTIONAL : probability that a request starts a burst of 429 (0 to 1). Default 0.
+            throttle_duration : OPTIONAL : seconds during which all the requests are answered with a 429 once a burst started. Default 1.
+            retry_after : OPTIONAL : value of the Retry-After header of the 429. Default the seconds left in the burst.
+            drop_rate : OPTIONAL : share of the requests for which the connection is closed without response (0 to 1). Default 0.
+            token_lifetime : OPTIONAL : seconds after which the tokens are rejected (401), even if IMS announced a longer expiry.
+            seed : OPTIONAL : seed of the random draws, for reproducible runs.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.throttle_rate = throttle_rate
+        self.throttle_duration = throttle_duration
+        self.retry_after = retry_after
+        self.drop_rate = drop_rate
+        self.token_lifetime = token_lifetime
+        self.injected = {'throttled': 0, 'errors': 0, 'dropped': 0, 'expired_tokens': 0}
+        self._burst_end = 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def getLatency(self, items: int = 0) -> float:
+        """
+        Returns a latency drawn from the distribution, in seconds.
+        Arguments:
+            items : OPTIONAL : number of elements in the response, for the "per_item" latency.
+        """
+        spec = self.latency
+        if spec is None:
+            return 0.0
+        if isinstance(spec, (int, float)):
+            return float(spec)
+        distribution = spec.get('distribution', 'constant')
+        with self._lock:
+            if distribution == 'constant':
+                value = spec.get('value', 0.0)
+            elif distribution == 'uniform':
+                value = self._random.uniform(spec.get('min', 0.0), spec['max'])
+            elif distribution == 'normal':
+                value = self._random.gauss(spec['mean'], spec.get('stddev', 0.0))
+            elif distribution == 'lognormal':
+                value = spec['median'] * math.exp(self._random.gauss(0, spec.get('sigma', 0.5)))
+            elif distribution == 'exponential':
+                value = self._random.expovariate(1 / spec['mean'])
+            elif distribution == 'pareto':
+                value = spec['scale'] * self._random.paretovariate(spec.get('alpha', 2.5))
+            else:
+                raise ValueError(f"Unknown latency distribution: {distribution}")
+        value += spec.get('per_item', 0.0) * items
+        return min(max(value, 0.0), spec.get('max', float('inf')))
+
+    def inject(self) -> tuple:
+        """
+        Returns the injected response (status code, headers, body) for a request, None if the request is answered normally.
+        Raises DroppedConnection when the connection is dropped.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.drop_rate > 0 and self._random.random() < self.drop_rate:
+                self.injected['dropped'] += 1
+                raise DroppedConnection('Connection dropped by the fault injection')
+            if now >= self._burst_end and self.throttle_rate > 0 and self._random.random() < self.throttle_rate:
+                self._burst_end = now + self.throttle_duration
+            if now < self._burst_end:
+                self.injected['throttled'] += 1
+                retry_after = self.retry_after if self.retry_after is not None else math.ceil(self._burst_end - now)
+                return 429, {'Content-Type': 'application/json', 'Retry-After': str(retry_after)}, {
+                    'error_code': '429050', 'message': 'Too many requests'}
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                self.injected['errors'] += 1
+                status = self._random.choice(self.error_statuses)
+                return status, {'Content-Type': 'application/vnd.api+json'}, {
+                    'errors': [{'status': str(status), 'title': 'Injected error', 'detail': 'Error injected by the mock server'}]}
+        return None
+
+    def reset(self) -> None:
+        """
+        Reset the counters of the injected faults and end the current 429 burst.
+        """
+        with self._lock:
+            self.injected = {key: 0 for key in self.injected}
+            self._burst_end = 0.0
+
+
+class MockReactor:
+    """
+    In-memory stand-in of the Reactor API (and of the IMS token endpoint), seeded from a fixture.
+    The requests are answered by the handle method, that has no network dependency, so it can be used
+    behind the local HTTP server (MockServer) or called directly.
+    The fixture is a dictionary of resource type to list of JSON:API resources, ex:
+        {"companies": [{"id": "CO...", "attributes": {"name": "My company"}}],
+         "properties": [{"id": "PR...", "attributes": {"name": "My property"}, "relationships": {"company": {"data": {"id": "CO...", "type": "companies"}}}}]}
+    Missing attributes, links and relationships to the sub-collections are added automatically.
+    """
+
+    def __init__(self, fixture: dict | str = None, base_url: str = 'http://127.0.0.1', page_size: int = 25, seed: int = 0,
+                 faults: Faults = None) -> None:
+        """
+        Arguments:
+            fixture : OPTIONAL : dictionary or path to a JSON file of the resources. Default a small property (see defaultFixture).
+            base_url : OPTIONAL : base url used in the links of the resources.
+            page_size : OPTIONAL : default number of elements per page. Default 25.
+            seed : OPTIONAL : seed of the generated ids, for reproducible runs.
+            faults : OPTIONAL : Faults injected in the responses (latency, 429 bursts, 5xx, dropped connections, token expiry).
+        """
+        self.base_url = base_url.rstrip('/')
+        self.page_size = page_size
+        self.resources = {resource_type: {} for resource_type in PREFIXES}
+        self.tokens = {}  # token: time.monotonic() after which it is rejected
+        self.faults = faults
+        self.require_auth = True
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._indexes = {}  # resource type: {(relationship name, related id): [resources]}, rebuilt after a change
+        self.load(fixture if fixture is not None else self.defaultFixture(seed=seed))
+
+    # ---- state ----
+
+    def newId(self, resource_type: str) -> str:
+        """
+        Returns a new id for a resource type, ex: "RL" followed by 32 hexadecimal characters.
+        """
+        resources = self.resources.get(resource_type, {})
+        while True:
+            _id = PREFIXES.get(resource_type, 'XX') + '%032x' % self._random.getrandbits(128)
+            if _id not in resources:  # a fixture generated with the same seed can already use it
+                return _id
+
+    def add(self, resource_type: str, resource: dict) -> dict:
+        """
+        Add a resource to the state, completing its id, attributes and meta. Returns the stored resource.
+        """
+        resource = deepcopy(resource)
+        resource.setdefault('id', self.newId(resource_type))
+        resource['type'] = resource_type
+        now = _now()
+        attributes = {**DEFAULTS.get(resource_type, {}), **resource.get('attributes', {})}
+        attributes.setdefault('name', f"{resource_type} {resource['id'][-6:]}")
+        attributes.setdefault('created_at', now)
+        attributes.setdefault('updated_at', attributes['created_at'])
+        resource['attributes'] = attributes
+        resource.setdefault('relationships', {})
+        meta = resource.setdefault('meta', {})
+        if resource_type in REVISABLE:
+            meta.setdefault('latest_revision_number', attributes['revision_number'])
+        if resource_type == 'libraries':
+            meta.setdefault('build_status', None)
+            for collection in LIBRARY_RESOURCES:
+                resource['relationships'].setdefault(collection, {'data': []})
+        if resource_type == 'environments':
+            meta.setdefault('script_sources', [{
+                'minified': f"https://assets.adobedtm.com/launch-{resource['id'][-12:]}.min.js",
+                'license_path': f"https://assets.adobedtm.com/launch-{resource['id'][-12:]}.js"}])
+        with self._lock:
+            resources = self.resources.setdefault(resource_type, {})
+            index = self._indexes.get(resource_type)
+            if index is not None and resource['id'] not in resources:
+                self._addToIndex(index, resource)
+            else:
+                self._indexes.pop(resource_type, None)
+            resources[resource['id']] = resource
+        return resource
+
+    def load(self, fixture: dict | str) -> None:
+        """
+        Add the resources of a fixture to the state.
+        Arguments:
+            fixture : REQUIRED : dictionary or path to a JSON file (gzip compressed if it ends with .gz) of resource type to list of resources.
+        """
+        if not isinstance(fixture, dict):
+            with (gzip.open if str(fixture).endswith('.gz') else open)(fixture, 'rt') as f:
+                fixture = json.load(f)
+        for resource_type, resources in fixture.items():
+            for resource in resources:
+                self.add(resource_type, resource)
+
+    def toFixture(self) -> dict:
+        """
+        Returns the current state as a fixture, that can be saved and loaded later.
+        """
+        with self._lock:
+            return {resource_type: [deepcopy(resource) for resource in resources.values()]
+                    for resource_type, resources in self.resources.items() if len(resources) > 0}
+
+    @staticmethod
+    def defaultFixture(seed: int = 0) -> dict:
+        """
+        Returns a small fixture: one company with one web property, the Core extension, a rule with two components,
+        a data element, the 3 environments with their host, and a library.
+        """
+        generator = random.Random(seed)
+
+        def newId(resource_type: str) -> str:
+            return PREFIXES[resource_type] + '%032x' % generator.getrandbits(128)
+        company, prop, package, extension, rule, data_element, host, library = (
+            newId(t) for t in ['companies', 'properties', 'extension_packages', 'extensions', 'rules', 'data_elements', 'hosts', 'libraries'])
+
+        def rel(resource_type: str, _id: str) -> dict:
+            return {'data': {'id': _id, 'type': resource_type}}
+        in_property = {'property': rel('properties', prop)}
+        core = {'extension': rel('extensions', extension)}
+        return {
+            'companies': [{'id': company, 'attributes': {'name': 'Mock Company'}}],
+            'properties': [{'id': prop, 'attributes': {'name': 'Mock Property'}, 'relationships': {'company': rel('companies', company)}}],
+            'extension_packages': [{'id': package, 'attributes': {'name': 'core', 'display_name': 'Core'}}],
+            'extensions': [{'id': extension, 'attributes': {'name': 'core', 'display_name': 'Core', 'delegate_descriptor_id': 'core::extensionConfiguration::config'},
+                            'relationships': {**in_property, 'extension_package': rel('extension_packages', package)}}],
+            'rules': [{'id': rule, 'attributes': {'name': 'RL - Page Load'}, 'relationships': in_property}],
+            'rule_components': [
+                {'attributes': {'name': 'Library Loaded', 'delegate_descriptor_id': 'core::events::library-loaded', 'settings': '{}', 'order': 0},
+                 'relationships': {**in_property, **core, 'rules': {'data': [{'id': rule, 'type': 'rules'}]}}},
+                {'attributes': {'name': 'Custom Code', 'delegate_descriptor_id': 'core::actions::custom-code', 'order': 1,
+                                'settings': json.dumps({'source': 'console.log("page load");', 'language': 'javascript'})},
+                 'relationships': {**in_property, **core, 'rules': {'data': [{'id': rule, 'type': 'rules'}]}}}],
+            'data_elements': [{'id': data_element, 'attributes': {'name': 'page name', 'delegate_descriptor_id': 'core::dataElements::javascript-variable',
+                                                                 'settings': json.dumps({'path': 'document.title'})},
+                               'relationships': {**in_property, **core}}],
+            'hosts': [{'id': host, 'attributes': {'name': 'Managed by Adobe'}, 'relationships': in_property}],
+            'environments': [{'attributes': {'name': stage.capitalize(), 'stage': stage},
+                              'relationships': {**in_property, 'host': rel('hosts', host)}} for stage in ['development', 'staging', 'production']],
+            'libraries': [{'id': library, 'attributes': {'name': 'Mock Library'}, 'relationships': in_property}],
+        }
+
+    # ---- rendering ----
+
+    def render(self, resource: dict) -> dict:
+        """
+        Returns the resource as sent by the API, with the links to itself and to its sub-collections.
+        """
+        resource = deepcopy(resource)
+        resource_type, _id = resource['type'], resource['id']
+        url = f"{self.base_url}/{resource_type}/{_id}"
+        links = resource.setdefault('links', {})
+        links['self'] = url
+        relationships = resource.setdefault('relationships', {})
+        for child in CHILDREN.get(resource_type, []):
+            links[child] = f"{url}/{child}"
+            relationship = relationships.setdefault(child, {})
+            relationship['links'] = {'self': f"{url}/relationships/{child}", 'related': f"{url}/{child}"}
+        for name, relationship in relationships.items():
+            data = relationship.get('data', None)
+            if isinstance(data, dict) and name not in CHILDREN.get(resource_type, []):
+                relationship.setdefault('links', {'related': f"{self.base_url}/{data['type']}/{data['id']}"})
+        if resource_type == 'libraries':
+            relationships.setdefault('environment', {})['links'] = {'self': f"{url}/relationships/environment", 'related': f"{url}/environment"}
+        return resource
+
+    # ---- queries ----
+
+    @staticmethod
+    def _getRelatedIds(resource: dict, name: str) -> list:
+        data = resource.get('relationships', {}).get(name, {}).get('data', None)
+        if isinstance(data, dict):
+            return [data.get('id')]
+        if isinstance(data, list):
+            return [element.get('id') for element in data]
+        return []
+
+    def _getOrigin(self, resource: dict) -> str:
+        origin = self._getRelatedIds(resource, 'origin')
+        return origin[0] if len(origin) > 0 else None
+
+    def _find(self, _id: str) -> dict:
+        for resources in self.resources.values():
+            if _id in resources:
+                return resources[_id]
+        return None
+
+    def _getRelated(self, resource_type: str, name: str, _id: str) -> list:
+        """
+        Returns the resources of a type with the id in their relationship name, in the order they were added.
+        The index of a resource type is built on first use, so that listing the children does not scan all the resources.
+        """
+        index = self._indexes.get(resource_type)
+        if index is None:
+            index = {}
+            for resource in self.resources.get(resource_type, {}).values():
+                self._addToIndex(index, resource)
+            self._indexes[resource_type] = index
+        return index.get((name, _id), [])
+
+    def _addToIndex(self, index: dict, resource: dict) -> None:
+        for relationship_name in resource.get('relationships', {}):
+            for related_id in self._getRelatedIds(resource, relationship_name):
+                index.setdefault((relationship_name, related_id), []).append(resource)
+
+    def _listChildren(self, parent: dict, child: str) -> list:
+        parent_type, parent_id = parent['type'], parent['id']
+        if child == 'revisions':
+            head_id = self._getOrigin(parent) or parent_id
+            head = self.resources[parent_type].get(head_id)
+            revisions = self._getRelated(parent_type, 'origin', head_id)
+            return sorted(([head] if head is not None else []) + revisions, key=lambda r: r['attributes'].get('revision_number', 0))
+        if child == 'notes':
+            return list(self._getRelated('notes', 'resource', parent_id))
+        if parent_type == 'libraries' and child in LIBRARY_RESOURCES:
+            ids = self._getRelatedIds(parent, child)
+            return [self.resources[child][_id] for _id in ids if _id in self.resources[child]]
+        origin = self._getOrigin(parent)
+        names = [SINGULARS.get(parent_type, parent_type), parent_type]
+        related = {resource['id']: resource for name in dict.fromkeys(names) for resource in self._getRelated(child, name, parent_id)}
+        children = [resource for resource in related.values() if origin is not None or self._getOrigin(resource) is None]
+        if len(children) == 0 and origin in self.resources[parent_type]:  # revision without its own components
+            return self._listChildren(self.resources[parent_type][origin], child)
+        return children
+
+    @staticmethod
+    def _matchFilter(value: object, expression: str) -> bool:
+        operator, _, operand = str(expression).partition(' ')
+        if operator not in ['EQ', 'NOT', 'CONTAINS', 'GT', 'LT']:
+            operator, operand = 'EQ', expression
+        if isinstance(value, bool):
+            value = str(value).lower()
+        value = '' if value is None else str(value)
+        if operator == 'EQ':
+            return value in operand.split(',')
+        if operator == 'NOT':
+            return value not in operand.split(',')
+        if operator == 'CONTAINS':
+            return operand.lower() in value.lower()
+        if operator == 'GT':
+            return value > operand
+        return value < operand
+
+    def _query(self, resources: list, params: dict) -> list:
+        for key, expression in params.items():
+            if key.startswith('filter[') and key.endswith(']'):
+                attribute = key[len('filter['):-1]
+                resources = [r for r in resources if self._matchFilter(r['attributes'].get(attribute), expression)]
+            elif key == 'platform':
+                resources = [r for r in resources if r['attributes'].get('platform', expression) == expression]
+        sort = params.get('sort', None)
+        if sort:
+            for field in reversed(sort.split(',')):
+                reverse = field.startswith('-')
+                field = field.lstrip('-')
+                resources = sorted(resources, key=lambda r: str(r['attributes'].get(field, '')), reverse=reverse)
+        return resources
+
+    def _paginate(self, resources: list, params: dict) -> dict:
+        size = max(1, min(int(params.get('page[size]', self.page_size)), 100))
+        number = max(1, int(params.get('page[number]', 1)))
+        total_pages = max(1, -(-len(resources) // size))
+        page = resources[(number - 1) * size:number * size]
+        return {
+            'data': [self.render(resource) for resource in page],
+            'meta': {'pagination': {
+                'current_page': number,
+                'next_page': number + 1 if number < total_pages else None,
+                'prev_page': number - 1 if number > 1 else None,
+                'total_pages': total_pages,
+                'total_count': len(resources)}}
+        }
+
+    # ---- writes ----
+
+    def _create(self, resource_type: str, body: dict, parent: dict = None) -> dict:
+        data = (body or {}).get('data', {}) or {}
+        resource = {'attributes': deepcopy(data.get('attributes', {})), 'relationships': deepcopy(data.get('relationships', {}))}
+        if parent is not None:
+            name = SINGULARS.get(parent['type'], parent['type'])
+            resource['relationships'][name] = {'data': {'id': parent['id'], 'type': parent['type']}}
+            if parent['type'] != 'properties' and 'property' in parent.get('relationships', {}):
+                resource['relationships'].setdefault('property', deepcopy(parent['relationships']['property']))
+        if resource_type == 'extensions':
+            package_ids = self._getRelatedIds(resource, 'extension_package')
+            package = self.resources['extension_packages'].get(package_ids[0]) if len(package_ids) > 0 else None
+            if package is not None:
+                for key in ['name', 'display_name', 'version']:
+                    resource['attributes'].setdefault(key, package['attributes'].get(key))
+        if resource_type == 'builds':
+            parent['meta']['build_status'] = 'succeeded'
+            parent['attributes']['build_required'] = False
+            if parent['attributes']['state'] == 'approved':
+                self._publish(parent)
+        return self.add(resource_type, resource)
+
+    def _revise(self, resource: dict) -> dict:
+        """
+        Create a revision of a resource (and of the components of a rule), and returns the revision.
+        """
+        number = resource['meta'].get('latest_revision_number', 0) + 1
+        resource['meta']['latest_revision_number'] = number
+        revision = deepcopy(resource)
+        revision['id'] = self.newId(resource['type'])
+        revision['attributes']['revision_number'] = number
+        revision['relationships']['origin'] = {'data': {'id': resource['id'], 'type': resource['type']}}
+        revision = self.add(resource['type'], revision)
+        if resource['type'] == 'rules':
+            for component in self._listChildren(resource, 'rule_components'):
+                component_revision = self._revise(component)
+                component_revision['relationships']['rules'] = {'data': [{'id': revision['id'], 'type': 'rules'}]}
+        return revision
+
+    def _publish(self, library: dict) -> None:
+        now = _now()
+        library['attributes'].update({'state': 'published', 'published_at': now})
+        for collection in LIBRARY_RESOURCES:
+            for resource in self._listChildren(library, collection):
+                resource['attributes'].update({'published': True, 'published_at': now, 'dirty': False})
+                origin = self._getOrigin(resource)
+                if origin in self.resources[collection]:
+                    self.resources[collection][origin]['attributes'].update({'published': True, 'dirty': False})
+
+    def _update(self, resource: dict, body: dict) -> dict:
+        data = (body or {}).get('data', {}) or {}
+        action = (data.get('meta', {}) or {}).get('action', None)
+        if resource['type'] == 'libraries' and action in TRANSITIONS:
+            resource['attributes']['state'] = TRANSITIONS[action]
+            return resource
+        resource['attributes'].update(data.get('attributes', {}) or {})
+        for name, relationship in (data.get('relationships', {}) or {}).items():
+            resource['relationships'][name] = deepcopy(relationship)
+        resource['attributes']['updated_at'] = _now()
+        if 'dirty' in resource['attributes']:
+            resource['attributes']['dirty'] = True
+        if action == 'revise' and resource['type'] in REVISABLE:
+            self._revise(resource)
+        return resource
+
+    def _updateRelationship(self, method: str, library: dict, name: str, body: dict) -> tuple:
+        data = (body or {}).get('data', None)
+        relationships = library['relationships']
+        if name == 'environment':
+            if method == 'GET':
+                return 200, {'data': relationships.get('environment', {}).get('data')}
+            relationships['environment'] = {'data': data if method != 'DELETE' else None}
+            if method != 'DELETE' and data is not None and data.get('id') in self.resources['environments']:
+                self.resources['environments'][data['id']]['relationships']['library'] = {'data': {'id': library['id'], 'type': 'libraries'}}
+            return 200, {'data': relationships['environment']['data']}
+        current = relationships.setdefault(name, {'data': []}).get('data') or []
+        if method == 'GET':
+            return 200, {'data': current}
+        data = data if isinstance(data, list) else [data] if data is not None else []
+        ids = [element['id'] for element in data]
+        if method == 'POST':
+            current = current + [element for element in data if element['id'] not in [c['id'] for c in current]]
+        elif method == 'PATCH':
+            current = [element for element in current if element['id'] not in ids] + data
+        elif method == 'DELETE':
+            current = [element for element in current if element['id'] not in ids]
+        relationships[name] = {'data': current}
+        library['attributes']['build_required'] = True
+        return 200, {'data': current}
+
+    # ---- entry point ----
+
+    @staticmethod
+    def _error(status: int, title: str, detail: str = None) -> tuple:
+        return status, {'Content-Type': 'application/vnd.api+json'}, {
+            'errors': [{'status': str(status), 'title': title, 'detail': detail or title}]}
+
+    def _token(self) -> tuple:
+        token = 'mock-' + '%032x' % self._random.getrandbits(128)
+        lifetime = self.faults.token_lifetime if self.faults is not None and self.faults.token_lifetime is not None else 86399
+        self.tokens[token] = time.monotonic() + lifetime
+        return 200, {'Content-Type': 'application/json'}, {'access_token': token, 'token_type': 'bearer', 'expires_in': 86399}
+
+    def handle(self, method: str, url: str, params: dict = None, body: object = None, headers: dict = None) -> tuple:
+        """
+        Answer a request. Returns a tuple (status code, headers, JSON body or None).
+        Arguments:
+            method : REQUIRED : HTTP method
+            url : REQUIRED : url or path of the request, the query string is merged with params.
+            params : OPTIONAL : query parameters
+            body : OPTIONAL : body of the request (dictionary, or JSON string / bytes)
+            headers : OPTIONAL : headers of the request, used to check the Authorization token.
+        Raises DroppedConnection when the fault injection drops the connection.
+        """
+        method = method.upper()
+        parsed = urlparse(url)
+        params = {**dict(parse_qsl(parsed.query)), **{key: str(value) for key, value in (params or {}).items()}}
+        if isinstance(body, (bytes, str)):
+            try:
+                body = json.loads(body) if len(body) > 0 else None
+            except ValueError:
+                body = None  # form encoded body of the token requests
+        segments = [segment for segment in parsed.path.split('/') if segment != '']
+        if segments[:1] == ['ims']:
+            with self._lock:
+                self.requests += 1
+                return self._token()
+        result = self._handle(method, segments, params, body, headers)
+        if self.faults is not None and self.faults.latency is not None:
+            response = result[2]
+            items = len(response['data']) if isinstance(response, dict) and isinstance(response.get('data'), list) else 0
+            time.sleep(self.faults.getLatency(items))
+        return result
+
+    def _handle(self, method: str, segments: list, params: dict, body: dict, headers: dict) -> tuple:
+        with self._lock:
+            self.requests += 1
+            if self.faults is not None:
+                injected = self.faults.inject()
+                if injected is not None:
+                    return injected
+            headers = {key.lower(): value for key, value in (headers or {}).items()}
+            if self.require_auth:
+                expiry = self.tokens.get(headers.get('authorization', '').replace('Bearer ', '', 1), None)
+                if expiry is None or time.monotonic() > expiry:
+                    if expiry is not None and self.faults is not None:
+                        self.faults.injected['expired_tokens'] += 1
+                    return 401, {'Content-Type': 'application/json'}, {'error_code': '401013', 'message': 'Oauth token is not valid'}
+            if method != 'GET':
+                self._indexes.pop(segments[0], None)
+            try:
+                status, response = self._route(method, segments, params, body)
+            except (KeyError, ValueError, TypeError, IndexError) as e:
+                return self._error(400, 'Bad Request', f"{type(e).__name__}: {e}")
+            finally:
+                if method != 'GET':
+                    self._indexes.pop(segments[0], None)  # the relationships of the resource may have changed, the created resources are handled by add
+        if status == 204:
+            return status, {}, None
+        if status >= 400:
+            return self._error(status, response)
+        return status, {'Content-Type': 'application/vnd.api+json'}, response
+
+    def expireTokens(self) -> None:
+        """
+        Reject all the tokens issued so far (401), as if they expired in the middle of a run.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = {token: min(expiry, now) for token, expiry in self.tokens.items()}
+
+    def _route(self, method: str, segments: list, params: dict, body: dict) -> tuple:
+        if segments == ['profile']:
+            return 200, {'data': {'id': 'UR' + '0' * 32, 'type': 'users', 'attributes': {
+                'email': 'mock@example.com', 'display_name': 'Mock User', 'tenants': []}}}
+        if len(segments) == 1:  # top level collection: /companies, /audit_events, /extension_packages
+            resource_type = segments[0]
+            if resource_type not in self.resources:
+                return 404, f"Unknown collection {resource_type}"
+            if method == 'POST':
+                return 201, {'data': self.render(self._create(resource_type, body))}
+            resources = [r for r in self.resources[resource_type].values() if self._getOrigin(r) is None]
+            return 200, self._paginate(self._query(resources, params), params)
+        resource_type, _id = segments[0], segments[1]
+        resource = self.resources.get(resource_type, {}).get(_id, None)
+        if resource is None:
+            return 404, f"Record {_id} not found"
+        if len(segments) == 2:
+            if method == 'GET':
+                return 200, {'data': self.render(resource)}
+            if method in ['PATCH', 'PUT']:
+                return 200, {'data': self.render(self._update(resource, body))}
+            if method == 'DELETE':
+                if resource_type == 'rules':  # the rule components are deleted with the rule, as by the API
+                    for component in self._listChildren(resource, 'rule_components'):
+                        self.resources['rule_components'].pop(component['id'], None)
+                    self._indexes.pop('rule_components', None)
+                del self.resources[resource_type][_id]
+                return 204, None
+            return 405, f"{method} not allowed on {resource_type}"
+        if segments[2] == 'relationships' and len(segments) == 4:
+            if resource_type != 'libraries':
+                return 200, {'data': [{'id': r['id'], 'type': r['type']} for r in self._listChildren(resource, segments[3])]}
+            return self._updateRelationship(method, resource, segments[3], body)
+        child = segments[2]
+        if resource_type == 'libraries' and child in ['environment', 'envrionment']:
+            environment_ids = self._getRelatedIds(resource, 'environment')
+            environment = self.resources['environments'].get(environment_ids[0]) if len(environment_ids) > 0 else None
+            return 200, {'data': self.render(environment) if environment is not None else None}
+        if child not in CHILDREN.get(resource_type, []):
+            return 404, f"Unknown collection {child} for {resource_type}"
+        if method == 'POST':
+            if child == 'notes':
+                body = deepcopy(body or {'data': {}})
+                body['data'].setdefault('relationships', {})['resource'] = {'data': {'id': _id, 'type': resource_type}}
+                return 201, {'data': self.render(self._create('notes', body))}
+            return 201, {'data': self.render(self._create(child, body, parent=resource))}
+        return 200, self._paginate(self._query(self._listChildren(resource, child), params), params)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # otherwise the small responses wait for the delayed ACK of the client
+
+    def _answer(self) -> None:
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(length) if length > 0 else None
+        try:
+            status, headers, response = self.server.reactor.handle(self.command, self.path, body=body, headers=dict(self.headers))
+        except DroppedConnection:
+            self.close_connection = True
+            return
+        payload = json.dumps(response).encode() if response is not None else b''
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _answer
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class MockServer:
+    """
+    Local HTTP server answering the Reactor and IMS requests with a MockReactor, in a background thread.
+    ex:
+        with MockServer() as server:
+            server.configure()
+            admin = launchpy.Admin()
+    """
+
+    def __init__(self, reactor: MockReactor = None, host: str = '127.0.0.1', port: int = 0, verbose: bool = False) -> None:
+        """
+        Arguments:
+            reactor : OPTIONAL : MockReactor answering the requests. Default a MockReactor with the default fixture.
+            host : OPTIONAL : interface to listen on. Default "127.0.0.1"
+            port : OPTIONAL : port to listen on. Default 0 (a free port is chosen).
+            verbose : OPTIONAL : print the requests received.
+        """
+        self.reactor = reactor or MockReactor()
+        self.httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.reactor = self.reactor
+        self.httpd.verbose = verbose
+        self.reactor.base_url = self.url
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockServer':
+        """
+        Start answering the requests in a background thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.httpd.serve_forever, name='launchpy-mockserver', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'MockServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def configure(self, **kwargs) -> None:
+        """
+        Point launchpy to this server (see useMockServer). The instances created afterwards use it.
+        """
+        useMockServer(self.url, **kwargs)
+
+
+def useMockServer(url: str, org_id: str = 'MOCK@AdobeOrg', client_id: str = 'mock', secret: str = 'mock', scopes: str = 'mock') -> None:
+    """
+    Configure launchpy to send the Reactor and IMS requests to a mock server, with dummy credentials.
+    Arguments:
+        url : REQUIRED : url of the mock server, ex: "http://127.0.0.1:8080"
+        org_id, client_id, secret, scopes : OPTIONAL : credentials to use, any value is accepted by the mock.
+    """
+    from launchpy import configs, tokens
+    url = url.rstrip('/')
+    config.endpoints['global'] = url
+    config.config_object['oauthTokenEndpointV2'] = f"{url}/ims/token/v2"
+    config.config_object['jwtTokenEndpoint'] = f"{url}/ims/exchange/jwt"
+    tokens.tokenStore.invalidate()  # tokens issued by another server are not valid on this one
+    configs.configure(org_id=org_id, client_id=client_id, secret=secret, scopes=scopes)
+
+
+def useMockReactor(reactor: MockReactor = None, **kwargs) -> MockReactor:
+    """
+    Configure launchpy to answer the requests in the process with a MockReactor, without sockets (see transport.InMemoryTransport).
+    Returns the MockReactor.
+    Arguments:
+        reactor : OPTIONAL : MockReactor answering the requests. Default a MockReactor with the default fixture.
+    possible kwargs:
+        org_id, client_id, secret, scopes : OPTIONAL : credentials to use, any value is accepted by the mock.
+    """
+    from launchpy import transport
+    reactor = reactor or MockReactor()
+    useMockServer(reactor.base_url, **kwargs)
+    transport.setTransport(transport.InMemoryTransport(reactor))
+    return reactor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m launchpy.mockserver', description='Local stand-in of the Reactor API.')
+    parser.add_argument('-f', '--fixture', help='JSON fixture of the resources. Default a small property.', default=None)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('-p', '--port', type=int, default=8080)
+    parser.add_argument('--page_size', type=int, default=25, help='default number of elements per page')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print the requests received')
+    parser.add_argument('--latency', type=json.loads, default=None,
+                        help='latency in seconds, or JSON distribution ex: \'{"distribution": "lognormal", "median": 0.2, "sigma": 0.5}\'')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='share of the requests answered with a 5xx')
+    parser.add_argument('--throttle_rate', type=float, default=0.0, help='probability that a request starts a burst of 429')
+    parser.add_argument('--throttle_duration', type=float, default=1.0, help='seconds of a burst of 429')
+    parser.add_argument('--drop_rate', type=float, default=0.0, help='share of the requests for which the connection is dropped')
+    parser.add_argument('--token_lifetime', type=float, default=None, help='seconds after which the tokens are rejected')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    faults = None
+    if args.latency is not None or args.error_rate or args.throttle_rate or args.drop_rate or args.token_lifetime is not None:
+        faults = Faults(latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate, throttle_duration=args.throttle_duration,
+                        drop_rate=args.drop_rate, token_lifetime=args.token_lifetime, seed=args.seed)
+    reactor = MockReactor(args.fixture, page_size=args.page_size, seed=args.seed, faults=faults)
+    server = MockServer(reactor, host=args.host, port=args.port, verbose=args.verbose)
+    print(f"Mock Reactor API listening on {server.url} (IMS token endpoint: {server.url}/ims/token/v2)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+from collections import deque
+from itertools import islice
+from concurrent import futures
+from typing import Callable, Iterable, Iterator
+# Non standard libraries
+from launchpy import config, tracing
+
+
+class Paginator:
+    """
+    Retrieve all the pages of a list endpoint of the Reactor API.
+    The pagination information is read from the "meta.pagination" of the first page,
+    the remaining pages are requested in parallel and returned in order.
+    """
+
+    def __init__(self, connector: object, max_workers: int = None) -> None:
+        """
+        Arguments:
+            connector : REQUIRED : AdobeRequest instance used for the requests.
+            max_workers : OPTIONAL : number of pages requested in parallel. Default config.pagination['max_workers'].
+        """
+        self.connector = connector
+        self.max_workers = max_workers
+
+    @staticmethod
+    def getPagination(response: dict) -> dict:
+        """
+        Returns the pagination information of a response.
+        """
+        return response.get('meta', {}).get('pagination', {}) or {}
+
+    @classmethod
+    def getPageNumbers(cls, first_page: dict) -> list:
+        """
+        Returns the numbers of the pages left after the first page.
+        None when the total of pages is not given, the next pages have to be followed one by one.
+        """
+        pagination = cls.getPagination(first_page)
+        current_page = pagination.get('current_page', None)
+        total_pages = pagination.get('total_pages', None)
+        if current_page is None or total_pages is None:
+            return None
+        return list(range(current_page + 1, total_pages + 1))
+
+    @staticmethod
+    def checkPage(page: dict, url: str) -> dict:
+        """
+        Returns the page. Raises an Exception when it does not contain data (error still returned by the API after the retries),
+        so that a list is never returned with the elements of a page missing.
+        Arguments:
+            page : REQUIRED : response of the request of a page.
+            url : REQUIRED : url of the list endpoint, for the error message.
+        """
+        if not isinstance(page, dict) or 'data' not in page.keys():
+            raise Exception(f"Could not retrieve the elements of {url}: {page}")
+        return page
+
+    @classmethod
+    def mergePages(cls, pages: list, url: str) -> list:
+        """
+        Returns the data of the pages in a single list. Raises an Exception if a page does not contain data.
+        Arguments:
+            pages : REQUIRED : list of the responses of the pages, in order.
+            url : REQUIRED : url of the list endpoint, for the error message.
+        """
+        data = []
+        for page in pages:
+            data.extend(cls.checkPage(page, url)['data'])
+        return data
+
+    def getPages(self, url: str, params: dict = None, start_page: int = None, verbose: bool = False) -> list:
+        """
+        Returns the list of the responses of all the pages, in order.
+        If the first page does not contain data, it is returned alone. Raises an Exception if one of the next pages does not contain data.
+        Arguments:
+            url : REQUIRED : url of the list endpoint.
+            params : OPTIONAL : parameters of the request (filters, page size).
+            start_page : OPTIONAL : number of the first page to request.
+            verbose : OPTIONAL : print the progress.
+        """
+        params = dict(params or {})
+        if start_page is not None:
+            params['page[number]'] = start_page
+        first_page = self.connector.getData(url, params=params)
+        pages = [first_page]
+        if 'data' not in first_page.keys():
+            return pages
+        page_numbers = self.getPageNumbers(first_page)
+        if page_numbers is not None:
+            if len(page_numbers) > 0:
+                workers = min(len(page_numbers), self.max_workers or config.pagination['max_workers'])
+                if verbose:
+                    print(f'handling pagination: {len(page_numbers)} pages left, {workers} workers')
+                with futures.ThreadPoolExecutor(workers) as executor:
+                    res = executor.map(tracing.propagate(lambda page: self.checkPage(self.connector.getData(
+                        url, params={**params, 'page[number]': page}), url)), page_numbers)
+                    pages += list(res)
+        else:  # no total of pages, following the next pages
+            next_page = self.getPagination(first_page).get('next_page', None)
+            while next_page is not None:
+                res = self.checkPage(self.connector.getData(url, params={**params, 'page[number]': next_page}), url)
+                pages.append(res)
+                next_page = self.getPagination(res).get('next_page', None)
+        return pages
+
+    def getAll(self, url: str, params: dict = None, start_page: int = None, strict: bool = False, verbose: bool = False) -> list:
+        """
+        Returns the data of all the pages in a single list.
+        If the first page does not contain data, the response is returned. Raises an Exception if one of the next pages does not contain data.
+        Arguments:
+            url : REQUIRED : url of the list endpoint.
+            params : OPTIONAL : parameters of the request (filters, page size).
+            start_page : OPTIONAL : number of the first page to request.
+            strict : OPTIONAL : raise an Exception when the first page does not contain data as well. Default False.
+            verbose : OPTIONAL : print the progress.
+        """
+        pages = self.getPages(url, params=params, start_page=start_page, verbose=verbose)
+        if 'data' not in pages[0].keys():
+            if strict:
+                self.checkPage(pages[0], url)
+            return pages[0]
+        return self.mergePages(pages, url)
+
+    def _submitMap(self, func: Callable, items: Iterable, prefetch: int = None) -> tuple:
+        """
+        Start applying func to the first items in a thread pool. Returns the executor, the function submitted, the pending futures and the remaining items.
+        """
+        workers = self.max_workers or config.pagination['max_workers']
+        prefetch = prefetch or workers
+        items = iter(items)
+        func = tracing.propagate(func)
+        executor = futures.ThreadPoolExecutor(min(workers, prefetch))
+        pending = deque(executor.submit(func, item) for item in islice(items, prefetch))
+        return executor, func, pending, items
+
+    @staticmethod
+    def _iterResults(executor: futures.ThreadPoolExecutor, func: Callable, pending: deque, items: Iterator) -> Iterator:
+        """
+        Yield the results of the pending futures in order, submitting a new item each time a result is consumed.
+        """
+        try:
+            while len(pending) > 0:
+                result = pending.popleft().result()
+                for item in islice(items, 1):  # keep the prefetch window full while the result is consumed
+                    pending.append(executor.submit(func, item))
+                yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iterMap(self, func: Callable, items: Iterable, prefetch: int = None) -> Iterator:
+        """
+        Apply func to the items in a thread pool and yield the results in order.
+        Only `prefetch` results are requested ahead of the one being consumed, so the memory stays bounded.
+        Arguments:
+            func : REQUIRED : function to apply to each item.
+            items : REQUIRED : iterable of items, consumed lazily.
+            prefetch : OPTIONAL : number of results requested in advance. Default the number of workers.
+        """
+        yield from self._iterResults(*self._submitMap(func, items, prefetch))
+
+    def iterPages(self, url: str, params: dict = None, start_page: int = None, prefetch: int = None) -> Iterator[dict]:
+        """
+        Yield the responses of the pages in order, as they arrive. The next pages are requested in the background.
+        If the first page does not contain data, it is yielded alone. Raises an Exception if one of the next pages does not contain data.
+        Arguments:
+            url : REQUIRED : url of the list endpoint.
+            params : OPTIONAL : parameters of the request (filters, page size).
+            start_page : OPTIONAL : number of the first page to request.
+            prefetch : OPTIONAL : number of pages requested in advance. Default the number of workers.
+        """
+        params = dict(params or {})
+        if start_page is not None:
+            params['page[number]'] = start_page
+        first_page = self.connector.getData(url, params=params)
+        if 'data' not in first_page.keys():
+            yield first_page
+            return
+        page_numbers = self.getPageNumbers(first_page)
+        if page_numbers is not None:
+            # the next pages are requested before the first one is consumed
+            def getPage(page: int) -> dict:
+                return self.checkPage(self.connector.getData(url, params={**params, 'page[number]': page}), url)
+            executor, getPage, pending, items = self._submitMap(getPage, page_numbers, prefetch)
+            try:
+                yield first_page
+            except GeneratorExit:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            yield from self._iterResults(executor, getPage, pending, items)
+        else:
+            yield first_page
+            next_page = self.getPagination(first_page).get('next_page', None)
+            while next_page is not None:
+                res = self.checkPage(self.connector.getData(url, params={**params, 'page[number]': next_page}), url)
+                yield res
+                next_page = self.getPagination(res).get('next_page', None)
+
+    def iterAll(self, url: str, params: dict = None, start_page: int = None, prefetch: int = None) -> Iterator[dict]:
+        """
+        Yield the elements of all the pages one by one, as the pages arrive.
+        Raises an Exception if a page does not contain data.
+        Arguments:
+            url : REQUIRED : url of the list endpoint.
+            params : OPTIONAL : parameters of the request (filters, page size).
+            start_page : OPTIONAL : number of the first page to request.
+            prefetch : OPTIONAL : number of pages requested in advance. Default the number of workers.
+        """
+        for page in self.iterPages(url, params=params, start_page=start_page, prefetch=prefetch):
+            yield from self.checkPage(page, url)['data']
+
+
+def configurePagination(max_workers: int = 5) -> None:
+    """
+    Configure the number of pages requested in parallel by the list methods.
+    Arguments:
+        max_workers : OPTIONAL : number of pages requested in parallel. Default 5.
+    """
+    config.pagination['max_workers'] = max_workers
@@ -3,10 +3,14 @@ from collections import defaultdict
 from concurrent import futures
 from copy import deepcopy
 # Non standard libraries
-from launchpy import config, connector
-from typing import IO, Union
+from launchpy import config, connector, tracing
+from launchpy.paginator import Paginator
+from launchpy.tracing import traced
+from typing import IO, Iterator, Union
 from .library import Library
 from .configs import saveFile
+from .indexes import ElementIndex
+from .snapshot import PropertySnapshot, COLLECTIONS, LIBRARY_MEMBERS, getOriginId, getRelatedIds, isModified, now
 
 class Property:
     """
@@ -32,6 +36,7 @@ class Property:
         """
         self.connector = connector.AdobeRequest(
             config_object=config_object, header=header)
+        self.paginator = Paginator(self.connector)
         self.endpoint = config.endpoints['global']
         self.definition = data
         self.name = data['attributes']['name']
@@ -46,14 +51,15 @@ class Property:
         self._DataElement = data['links']['data_elements']
         self._Extensions = data['links']['extensions']
         self._Rules = data['links']['rules']
-        self._RuleComponents = 'https://reactor.adobe.io/properties/' + \
+        self._RuleComponents = self.endpoint+'/properties/' + \
             self.id + '/rule_components'
-        self._Host = 'https://reactor.adobe.io/properties/' + \
+        self._Host = self.endpoint+'/properties/' + \
             data['id']+'/hosts'
-        self._Note = 'https://reactor.adobe.io/notes/'
+        self._Note = self.endpoint+'/notes/'
         self._Environments = data['links']['environments']
         self._Libraries = data['relationships']['libraries']['links']['related']
         self.ruleComponents = {}
+        self.indexes = {collection: ElementIndex() for collection in COLLECTIONS}
         self.header = deepcopy(self.connector.header)
 
     def __repr__(self)-> dict:
@@ -112,20 +118,13 @@ class Property:
         res = self.connector.getData(res_url, params=params)
         return res
 
+    @traced
     def getEnvironments(self)->object:
         """
         Retrieve the environment sets for this property
         """
-        params = {"page[number]":1}
-        env = self.connector.getData(self._Environments)
-        data = env['data']  # skip meta for now
-        next_page = env.get('meta',{}).get('pagination',{}).get('next_page',None)
-        while next_page is not None:
-            params['page[number]'] = next_page
-            env = self.connector.getData(self._Environments,params=params)
-            data += env.get('data',[])
-            next_page = env.get('meta',{}).get('pagination',{}).get('next_page',None)
-        return data
+        data = self.paginator.getAll(self._Environments)
+        return self.indexes['environments'].replace(data)
 
     def getHost(self)->object:
         """
@@ -133,36 +132,27 @@ class Property:
         """
         host = self.connector.getData(self._Host)
         data = host['data']  # skip meta for now
-        return data
+        return self.indexes['hosts'].replace(data)
 
+    @traced
     def getExtensions(self)-> object:
         """
         retrieve the different information from url retrieve in the properties
         """
-        extensions = self.connector.getData(self._Extensions)
-        try:
-            pagination = extensions['meta']['pagination']
-            data = extensions['data']  # keep only information on extensions
-            # requesting all the pages
-            if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-                # calculate how many page to download
-                pages_left = pagination['total_pages'] - \
-                    pagination['current_page']
-                workers = min(pages_left, 5)  # max 5 threads
-                list_page_number = [
-                    {'page[number]': str(x)} for x in range(2, pages_left+2)]
-                urls = [self._Extensions for x in range(2, pages_left+2)]
-                with futures.ThreadPoolExecutor(workers) as executor:
-                    res = executor.map(lambda x, y: self.connector.getData(
-                        x, params=y), urls, list_page_number)
-                res = list(res)
-                append_data = [val for sublist in [data['data'] for data in res]
-                               for val in sublist]  # flatten list of list
-                data = data + append_data
-        except:
-            data = extensions
-        return data
+        data = self.paginator.getAll(self._Extensions)
+        return self.indexes['extensions'].replace(data)
     
+    def iterExtensions(self, prefetch: int = None)-> Iterator[dict]:
+        """
+        Yield the extensions of the property one by one, as the pages arrive.
+        The next pages are requested in the background.
+        Arguments:
+            prefetch : OPTIONAL : number of pages requested in advance. Default the number of pagination workers.
+        """
+        for extension in self.paginator.iterAll(self._Extensions, prefetch=prefetch):
+            yield self.indexes['extensions'].add(extension)
+
+    @traced
     def getExtension(self,extensionId:str=None)-> object:
         """
         Retrieve the definiton of the extension based on its ID.
@@ -171,8 +161,9 @@ class Property:
         """
         path = f"/extensions/{extensionId}"
         extensions = self.connector.getData(self.endpoint+path)
-        return extensions['data']
+        return self.indexes['extensions'].add(extensions['data'])
 
+    @traced
     def checkExtensionUpdate(self, name:str=None, platform: str = "web", verbose: bool = False):
         """
         Returns a dictionary of extensions with their names, ids and if there is an update. 
@@ -207,6 +198,7 @@ class Property:
                 dict_extensions[name]['update'] = True
         return dict_extensions
 
+    @traced
     def upgradeExtension(self, extension_id: str, package_id: str, **kwargs)-> object:
         """
         Upgrade the extension with the new package id (EP...). 
@@ -230,7 +222,7 @@ class Property:
                         "type": "extensions",
                         "relationships": {"extension_package": {
                             "links": {
-                                "related": "https://reactor.adobe.io/extensions/"+extension_id+"/extension_package"
+                                "related": self.endpoint+"/extensions/"+extension_id+"/extension_package"
                             },
                             "data": {
                                 "id": package_id,
@@ -251,7 +243,7 @@ class Property:
                         "type": "extensions",
                         "relationships": {"extension_package": {
                             "links": {
-                                "related": "https://reactor.adobe.io/extensions/"+extension_id+"/extension_package"
+                                "related": self.endpoint+"/extensions/"+extension_id+"/extension_package"
                             },
                             "data": {
                                 "id": latest_package_id,
@@ -271,7 +263,7 @@ class Property:
             data = res['data']  # skip meta for now
         except:
             data = res
-        return data
+        return self.indexes['extensions'].add(data)
     
     def getProfile(self)->dict:
         """
@@ -282,6 +274,7 @@ class Property:
         return res['data']
 
 
+    @traced
     def getRules(self,filter:dict=None,verbose:bool=False)->object:
         """
         Return the list of the rules data.
@@ -291,40 +284,37 @@ class Property:
         if filter is not None:
             for key in filter:
                 params[f'filter[{key}]'] = filter[key]
-        rules = self.connector.getData(self._Rules, params=params)
-        try:
-            data = rules['data']  # skip meta for now
-            pagination = rules['meta']['pagination']
-            # requesting all the pages
-            if verbose:
-                print('handling pagination')
-            if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-                # calculate how many page to download
-                pages_left = pagination['total_pages'] - \
-                    pagination['current_page']
-                workers = min(pages_left, 5)  # max 5 threads
-                list_page_number = [
-                    {'page[number]': str(x)} for x in range(2, pages_left+2)]
-                urls = [self._Rules for x in range(2, pages_left+2)]
-                headers = [self.header for x in range(2, pages_left+2)]
-                with futures.ThreadPoolExecutor(workers) as executor:
-                    res = executor.map(lambda x, y, z: self.connector.getData(
-                        x, params=y, header=z), urls, list_page_number, headers)
-                res = list(res)
-                if verbose:
-                    print('parsing responses')
-                append_data = [val for sublist in [data['data']
-                                                   for data in res] for val in sublist]
-                data = data + append_data
+        data = self.paginator.getAll(self._Rules, params=params, verbose=verbose)
+        if type(data) == list:
             for rule in data:
                 self.ruleComponents[rule['id']] = {
                     'name': rule['attributes']['name'],
                     'url': rule['links']['rule_components']
                 }
-        except:
-            data = rules
-        return data
+        if filter is None:
+            return self.indexes['rules'].replace(data)
+        return self.indexes['rules'].extend(data)
+
+    def iterRules(self, filter: dict = None, prefetch: int = None)-> Iterator[dict]:
+        """
+        Yield the rules one by one, as the pages arrive. The next pages are requested in the background.
+        It also fills the ruleComponents attribute along the way.
+        Arguments:
+            filter : OPTIONAL : dictionary of filters, ex: {"name":"CONTAINS test"}
+            prefetch : OPTIONAL : number of pages requested in advance. Default the number of pagination workers.
+        """
+        params = {}
+        if filter is not None:
+            for key in filter:
+                params[f'filter[{key}]'] = filter[key]
+        for rule in self.paginator.iterAll(self._Rules, params=params, prefetch=prefetch):
+            self.ruleComponents[rule['id']] = {
+                'name': rule['attributes']['name'],
+                'url': rule['links']['rule_components']
+            }
+            yield self.indexes['rules'].add(rule)
 
+    @traced
     def searchRules(self, name: str = None,name_contains:str=None, enabled: bool = None, published: bool = None, dirty: bool = None, verbose:bool = False, **kwargs)->object:
         """
         Returns the rules searched through the different operator. One argument is required in order to return a result. 
@@ -348,28 +338,9 @@ class Property:
             filters['filter[published]'] = f"EQ {str(published).lower()}"
         if 'created_at' in kwargs:
             pass  # documentation unclear on how to handle it
-        rules = self.connector.getData(self._Rules, params=filters)
-        data = rules['data']  # skip meta for now
-        pagination = rules['meta']['pagination']
-        # requesting all the pages
-        if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-            if verbose:
-                print('handling pagination')
-            # calculate how many page to download
-            pages_left = pagination['total_pages'] - pagination['current_page']
-            workers = min(pages_left, 5)  # max 5 threads
-            list_parameters = [{'&page[number]':
-                                str(x), **filters} for x in range(2, pages_left+2)]
-            urls = [self._Rules for x in range(2, pages_left+2)]
-            with futures.ThreadPoolExecutor(workers) as executor:
-                res = executor.map(lambda x, y: self.connector.getData(
-                    x, params=y), urls, list_parameters)
-            res = list(res)
-            if verbose:
-                    print('parsing responses')
-            append_data = [val for sublist in [data['data']
-                                               for data in res] for val in sublist]
-            data = data + append_data
+        data = self.paginator.getAll(self._Rules, params=filters, verbose=verbose)
+        if type(data) != list:
+            return data
         for rule in data:
             self.ruleComponents[rule['id']] = {
                 'name': rule['attributes']['name'],
@@ -377,6 +348,7 @@ class Property:
             }
         return data
     
+    @traced
     def extractRuleComponents(self,rule:dict=None)->list:
         """
         Extract the rule component based on the rule definition.
@@ -385,19 +357,26 @@ class Property:
         """
         if rule is None:
             raise ValueError("No rule definition provided")
-        params={'page[number]':0}
         rc_endpoint = rule['relationships']['rule_components']['links']['related']
-        page1 = self.getRessource(rc_endpoint)
-        data = page1.get('data',{})
-        next_page = page1.get('meta',{}).get('pagination',{}).get('next_page',None)
-        while next_page is not None:
-            params['page[number]'] = next_page
-            pageN = self.connector.getData(rc_endpoint,params=params)
-            data += pageN.get('data',[])
-            next_page = pageN.get('meta',{}).get('pagination',{}).get('next_page',None)
+        data = self.paginator.getAll(rc_endpoint, strict=True)
+        return data
+
+    def _requestRuleComponents(self, rule: tuple)->list:
+        """
+        Returns all the rule components of a rule, enriched with the rule_name and rule_id.
+        Raises an Exception if they cannot be retrieved.
+        Arguments:
+            rule : REQUIRED : tuple (rule id, rule name, url of the rule components)
+        """
+        rule_id, name, url = rule
+        data = self.paginator.getAll(url, strict=True)
+        for element in data:
+            element['rule_name'] = name
+            element['rule_id'] = rule_id
         return data
 
 
+    @traced
     def getRulesComponents(self, verbose:bool=False,**kwargs)->dict:
         """
         Returns a list of all the ruleComponents gathered in the ruleComponents attributes.
@@ -427,35 +406,42 @@ class Property:
                 print(f"using the rule_names. {len(rule_names)} rules given")
             ruleComponents = {rule: {'name': ruleComponents[rule]['name'],
                                      'url': ruleComponents[rule]['url']} for rule in ruleComponents if ruleComponents[rule]['name'] in rule_names}
-        list_urls = [ruleComponents[_id]['url'] for _id in ruleComponents]
-        names = [ruleComponents[_id]['name'] for _id in ruleComponents]
-        ids = list(ruleComponents.keys())
-        headers = [self.header for nb in range(len(list_urls))]
-        workers = min((len(list_urls), 5))
-        def request_data(url, header, name, ids):
-            rule_component = self.connector.getData(url)
-            data = rule_component['data']
-            for element in data:
-                element['rule_name'] = name
-                element['rule_id'] = ids
-            return data
+        rules = [(_id, ruleComponents[_id]['name'], ruleComponents[_id]['url']) for _id in ruleComponents]
         if verbose:
             print('Starting requests')
-        with futures.ThreadPoolExecutor(workers) as executor:
-            res = executor.map(lambda x, y, z, a: request_data(
-                x, header=y, name=z, ids=a), list_urls, headers, names, ids)
-        list_data = list(res)
         expanded_list = []
+        for data in self.paginator.iterMap(self._requestRuleComponents, rules, prefetch=len(rules) or None):
+            expanded_list.extend(data)
         if verbose:
             print('parsing response')
-        for element in list_data:
-            if type(element) is list:
-                for sub_element in element:
-                    expanded_list.append(sub_element)
-            else:
-                expanded_list.append(element)
-        return expanded_list
+        return self.indexes['ruleComponents'].extend(expanded_list)
     
+    def iterRulesComponents(self, prefetch: int = None, **kwargs)-> Iterator[dict]:
+        """
+        Yield the ruleComponents one by one, enriched with the rule_name and rule_id attached to it.
+        The rules are iterated if they have not been retrieved before (getRules), and the ruleComponents
+        of the next rules are requested in the background.
+        Arguments:
+            prefetch : OPTIONAL : number of rules whose components are requested in advance. Default the number of pagination workers.
+        Possible kwargs:
+            rule_ids : list of rule ids to be used in order to retrieve ruleComponents
+            rule_names : list of rule names to be used in order to retrieve ruleComponents
+        """
+        if len(self.ruleComponents) == 0:
+            rules = ((rule['id'], rule['attributes']['name'], rule['links']['rule_components']) for rule in self.iterRules())
+        else:
+            rules = ((_id, rule['name'], rule['url']) for _id, rule in list(self.ruleComponents.items()))
+        rule_ids = kwargs.get('rule_ids', None)
+        if type(rule_ids) == str:
+            rule_ids = [rule_ids]
+        rule_names = kwargs.get('rule_names', None)
+        if type(rule_names) == str:
+            rule_names = [rule_names]
+        rules = (rule for rule in rules if (not rule_ids or rule[0] in rule_ids) and (not rule_names or rule[1] in rule_names))
+        for data in self.paginator.iterMap(self._requestRuleComponents, rules, prefetch=prefetch):
+            yield from data
+
+    @traced
     def getRuleComponent(self,rc_id:str=None)->dict:
         """
         Return a ruleComponent information
@@ -466,8 +452,10 @@ class Property:
             raise ValueError('Require a ruleComponent ID')
         path = f"/rule_components/{rc_id}"
         res:dict = self.connector.getData(self.endpoint+path)
+        self.indexes['ruleComponents'].add(res.get('data'))
         return res
     
+    @traced
     def getRuleComponents(self,rule:dict|str=None,**kwargs)->dict:
         """
         Returns the components of a specific rule.
@@ -484,41 +472,27 @@ class Property:
             rule_id = rule
         path = f"/rules/{rule_id}/rule_components"
         res:dict = self.connector.getData(self.endpoint+path).get('data',[])
-        return res
+        return self.indexes['ruleComponents'].extend(res)
 
+    @traced
     def getDataElements(self,verbose:bool=False)->object:
         """
         Retrieve data elements of that property.
         Returns a list.
         """
-        dataElements = self.connector.getData(self._DataElement)
-        try:
-            data = dataElements['data']  # data for page 1
-            pagination = dataElements['meta']['pagination']
-            # requesting all the pages
-            if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-                if verbose:
-                    print('handling pagination')
-                # calculate how many page to download
-                pages_left = pagination['total_pages'] - \
-                    pagination['current_page']
-                workers = min(pages_left, 5)  # max 5 threads
-                list_page_number = [{'page[number]':
-                                     str(x)} for x in range(2, pages_left+2)]
-                urls = [self._DataElement for x in range(2, pages_left+2)]
-                with futures.ThreadPoolExecutor(workers) as executor:
-                    res = executor.map(lambda x, y: self.connector.getData(
-                        x, params=y), urls, list_page_number)
-                res = list(res)
-                if verbose:
-                    print('parsing responses')
-                append_data = [val for sublist in [data['data']
-                                                   for data in res] for val in sublist]
-                data = data + append_data
-        except:
-            data = dataElements
-        return data
+        data = self.paginator.getAll(self._DataElement, verbose=verbose)
+        return self.indexes['dataElements'].replace(data)
     
+    def iterDataElements(self, prefetch: int = None)-> Iterator[dict]:
+        """
+        Yield the data elements one by one, as the pages arrive. The next pages are requested in the background.
+        Arguments:
+            prefetch : OPTIONAL : number of pages requested in advance. Default the number of pagination workers.
+        """
+        for dataElement in self.paginator.iterAll(self._DataElement, prefetch=prefetch):
+            yield self.indexes['dataElements'].add(dataElement)
+
+    @traced
     def getDataElement(self,dataElementId:str=None,verbose:bool=False)->dict:
         """
         Retrieve a specific data elements based on its ID.
@@ -530,9 +504,10 @@ class Property:
         path = f"/data_elements/{dataElementId}"
         res = self.connector.getData(self.endpoint+path)
         if 'data' in res.keys():
-            return res['data']
+            return self.indexes['dataElements'].add(res['data'])
         return res
 
+    @traced
     def searchDataElements(self, name: str = None, enabled: bool = None, published: bool = None, dirty: bool = None, **kwargs)->object:
         """
         Returns the rules searched through the different operator. One argument is required in order to return a result. 
@@ -553,27 +528,10 @@ class Property:
             filters['filter[published]'] = f"EQ {str(published).lower()}"
         if 'created_at' in kwargs:
             pass  # documentation unclear on how to handle it
-        parameters = {**filters}
-        dataElements = self.connector.getData(self._DataElement, params=parameters)
-        data = dataElements['data']  # skip meta for now
-        pagination = dataElements['meta']['pagination']
-        # requesting all the pages
-        if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-            # calculate how many page to download
-            pages_left = pagination['total_pages'] - pagination['current_page']
-            workers = min(pages_left, 5)  # max 5 threads
-            list_parameters = [{'page[number]': str(
-                x), **parameters} for x in range(2, pages_left+2)]
-            urls = [self._Rules for x in range(2, pages_left+2)]
-            with futures.ThreadPoolExecutor(workers) as executor:
-                res = executor.map(lambda x, y: self.connector.getData(
-                    x, params=y), urls, list_parameters)
-            res = list(res)
-            append_data = [val for sublist in [data['data']
-                                               for data in res] for val in sublist]
-            data = data + append_data
+        data = self.paginator.getAll(self._DataElement, params=filters)
         return data
 
+    @traced
     def getLibraries(self, state: str = None,**kwargs)->object:
         """
         Retrieve libraries of the property.
@@ -604,26 +562,12 @@ class Property:
                     params[f'filter[{key}]'] = f"EQ {kwargs[key]}"
                 else:
                     params[f'filter[{key}]'] = f"GT {kwargs[key]}"
-        libs = self.connector.getData(self._Libraries, params=params)
-        data = libs['data']  # dat for page 1
-        pagination = libs['meta']['pagination']
-        # requesting all the pages
-        if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-            # calculate how many page to download
-            pages_left = pagination['total_pages'] - pagination['current_page']
-            workers = min(pages_left, 5)  # max 5 threads
-            list_page_number = [
-                {'page[number]': str(x), **params} for x in range(2, pages_left+2)]
-            urls = [self._Libraries for x in range(2, pages_left+2)]
-            with futures.ThreadPoolExecutor(workers) as executor:
-                res = executor.map(lambda x, y: self.connector.getData(
-                    x, params=y), urls, list_page_number)
-            res = list(res)
-            append_data = [val for sublist in [data['data']
-                                               for data in res] for val in sublist]
-            data = data + append_data
-        return data
+        data = self.paginator.getAll(self._Libraries, params=params)
+        if len(params) == 0:
+            return self.indexes['libraries'].replace(data)
+        return self.indexes['libraries'].extend(data)
 
+    @traced
     def getLibrary(self,libraryId:str=None,return_class:bool=False)->dict:
         """
         get a library based on its ID.
@@ -635,11 +579,13 @@ class Property:
         path = f"/libraries/{libraryId}"
         res = self.connector.getData(self.endpoint+path)
         if 'data' in res.keys():
+            self.indexes['libraries'].add(res['data'])
             if return_class:
                 return Library(res['data'],config_object=self.connector.config,header=self.header)
             return res['data']
         return res
 
+    @traced
     def getNotes(self, data: object)->list:
         """
         Retrieve the note associated with the object pass to the method. Returns list.
@@ -653,26 +599,237 @@ class Property:
             url = self.definition['relationships']['notes']['links']['related']
         else:
             url = data['relationships']['notes']['links']['related']
-        notes = self.connector.getData(url)
-        data = notes['data']  # data for page 1
-        pagination = notes['meta']['pagination']
-        # requesting all the pages
-        if pagination['current_page'] != pagination['total_pages'] and pagination['total_pages'] != 0:
-            # calculate how many page to download
-            pages_left = pagination['total_pages'] - pagination['current_page']
-            workers = min(pages_left, 5)  # max 5 threads
-            list_page_number = [
-                {'page[number]': str(x)} for x in range(2, pages_left+2)]
-            urls = [url for x in range(2, pages_left+2)]
-            with futures.ThreadPoolExecutor(workers) as executor:
-                res = executor.map(lambda x, y: self.connector.getData(
-                    x, params=y), urls, list_page_number)
-            res = list(res)
-            append_data = [val for sublist in [data['data']
-                                               for data in res] for val in sublist]
-            data = data + append_data
+        data = self.paginator.getAll(url)
         return data
 
+    def _indexDeleted(self, collection: str, _id: str, status: object)->object:
+        """
+        Remove an element from the indexes when its deletion succeeded. Returns the status of the deletion.
+        """
+        if isinstance(status, int) and status < 300:
+            self.indexes[collection].remove(_id)
+        return status
+
+    def getIndexedElement(self, collection: str, key: str)->dict:
+        """
+        Returns an element of the property from the indexes, by its id or its name, without scanning the lists.
+        The indexes are filled by the get methods (getRules, getDataElements, getExtensions, getLibraries, getRulesComponents, getEnvironments, getHost)
+        and kept up to date by the create, update and delete methods. The collection is retrieved entirely if it has not been indexed yet.
+        Returns None if the element is not found.
+        Arguments:
+            collection : REQUIRED : name of the collection (rules, ruleComponents, dataElements, extensions, environments, hosts, libraries)
+            key : REQUIRED : id or name of the element
+        """
+        if collection not in self.indexes:
+            raise KeyError(f"Unknown collection {collection}, possible values: {list(self.indexes)}")
+        if len(self.indexes[collection]) == 0:
+            getters = {'rules': self.getRules, 'ruleComponents': self.getRulesComponents, 'dataElements': self.getDataElements,
+                       'extensions': self.getExtensions, 'environments': self.getEnvironments, 'hosts': self.getHost, 'libraries': self.getLibraries}
+            getters[collection]()
+        return self.indexes[collection].get(key)
+
+    def useSnapshot(self, snapshot: PropertySnapshot)->None:
+        """
+        Use the indexes of a snapshot of the property as the indexes of the instance. The indexes are shared, not copied:
+        the create, update and delete methods keep the snapshot up to date.
+        Arguments:
+            snapshot : REQUIRED : PropertySnapshot of the property
+        """
+        if snapshot.id is not None and snapshot.id != self.id:
+            raise ValueError(f"The snapshot is the snapshot of another property ({snapshot.id})")
+        self.indexes.update(snapshot.indexes)
+
+    def _getSnapshotRuleComponents(self, rule: dict)->list:
+        """
+        Returns the rule components of a rule, enriched with the rule_name and rule_id.
+        Raises an Exception if they cannot be retrieved.
+        """
+        return self._requestRuleComponents((rule['id'], rule['attributes']['name'], rule['links']['rule_components']))
+
+    def _getLibraryMemberIds(self, library: dict)->dict:
+        """
+        Returns the ids of the rules, data elements and extensions of a library (the head resources, not the revisions).
+        Raises an Exception if they cannot be retrieved.
+        """
+        members = {}
+        for collection, resource_type in LIBRARY_MEMBERS.items():
+            url = f"{self.endpoint}/libraries/{library['id']}/{resource_type}"
+            members[collection] = [getOriginId(element) for element in self.paginator.getAll(url, strict=True)]
+        return members
+
+    @traced
+    def snapshot(self, libraries: bool = True, max_workers: int = None, verbose: bool = False)->PropertySnapshot:
+        """
+        Fetch the whole property in a single concurrent pipeline and returns it as a PropertySnapshot,
+        indexed by id and by name, with the rule components of each rule, the extension of each component and the members of each library resolved.
+        The rules, data elements, extensions, environments, hosts and libraries are listed at the same time,
+        the rule components (and the library members) are requested as soon as the rules (and the libraries) are known.
+        Raises an Exception if one of the requests fails after the retries, so that a snapshot is never incomplete.
+        Arguments:
+            libraries : OPTIONAL : if set to False, the members of the libraries are not fetched. Default True.
+            max_workers : OPTIONAL : number of requests sent in parallel. Default config.pagination['max_workers'].
+            verbose : OPTIONAL : print the progress.
+        """
+        workers = max_workers or config.pagination['max_workers']
+        listings = {
+            'rules': self._Rules,
+            'dataElements': self._DataElement,
+            'extensions': self._Extensions,
+            'environments': self._Environments,
+            'hosts': self._Host,
+            'libraries': self._Libraries,
+        }
+        snap = PropertySnapshot(self.definition, api=self)
+        with futures.ThreadPoolExecutor(workers) as executor:
+            lists = {collection: executor.submit(tracing.propagate(self.paginator.getAll), url, strict=True) for collection, url in listings.items()}
+            rules = lists['rules'].result()
+            for rule in rules:
+                self.ruleComponents[rule['id']] = {'name': rule['attributes']['name'], 'url': rule['links']['rule_components']}
+            if verbose:
+                print(f"{len(rules)} rules, requesting their rule components")
+            components = [executor.submit(tracing.propagate(self._getSnapshotRuleComponents), rule) for rule in rules]
+            members = {}
+            if libraries:
+                members = {library['id']: executor.submit(tracing.propagate(self._getLibraryMemberIds), library) for library in lists['libraries'].result()}
+            for collection, future in lists.items():
+                for element in future.result():
+                    snap.add(collection, element)
+            for future in components:
+                for element in future.result():
+                    snap.add('ruleComponents', element)
+            for library_id, future in members.items():
+                snap.setLibraryMembers(library_id, future.result())
+        self.useSnapshot(snap)
+        if verbose:
+            print(f"snapshot of {self.name}: {snap.getSummary()}")
+        return snap
+
+    def _getTotalCount(self, url: str)->int:
+        """
+        Returns the number of elements of a list endpoint (total_count of the pagination), requesting a single element.
+        Returns None if the API does not provide it. Raises an Exception if the request fails.
+        """
+        page = self.paginator.checkPage(self.connector.getData(url, params={'page[size]': 1}), url)
+        return self.paginator.getPagination(page).get('total_count', None)
+
+    def _getListedIds(self, url: str)->set:
+        """
+        Returns the ids of all the elements (head resources, not the revisions) of a list endpoint, 100 per page.
+        Raises an Exception if a page cannot be retrieved, so that the ids are always complete.
+        """
+        return {element['id'] for element in self.paginator.getAll(url, params={'page[size]': 100}, strict=True) if getOriginId(element) == element['id']}
+
+    @traced
+    def refreshSnapshot(self, snapshot: PropertySnapshot, since: str = None, deletions: bool = True, max_workers: int = None, verbose: bool = False)->dict:
+        """
+        Bring a PropertySnapshot up to date by fetching only what changed since the last sync, and merge the changes into it.
+        The rules, rule components, data elements, extensions and libraries updated since the last sync are listed with a filter on updated_at (server side).
+        The rule components of the rules modified, and the members of the libraries modified, are requested again.
+        The deletions are detected with the total count of each collection (one element requested): only when it differs from the snapshot,
+        the ids of the collection are listed and the elements of the snapshot missing from that listing are deleted.
+        The environments and hosts are always listed entirely.
+        Raises an Exception if one of the requests fails after the retries: an element is never deleted from an incomplete listing.
+        Returns the changes: a dictionary of collection to the ids added, updated and deleted.
+        Arguments:
+            snapshot : REQUIRED : PropertySnapshot of this property to refresh
+            since : OPTIONAL : date (ISO format) of the last sync. Default the fetched_at attribute of the snapshot.
+            deletions : OPTIONAL : detect the deleted elements. Default True.
+            max_workers : OPTIONAL : number of requests sent in parallel. Default config.pagination['max_workers'].
+            verbose : OPTIONAL : print the changes.
+        """
+        if snapshot.id is not None and snapshot.id != self.id:
+            raise ValueError(f"The snapshot is not a snapshot of the property {self.name}")
+        since = since or snapshot.fetched_at
+        fetched_at = now()
+        workers = max_workers or config.pagination['max_workers']
+        incremental = {
+            'rules': self._Rules,
+            'ruleComponents': self._RuleComponents,
+            'dataElements': self._DataElement,
+            'extensions': self._Extensions,
+            'libraries': self._Libraries,
+        }
+        params = {'filter[updated_at]': f"GT {since}"} if since is not None else {'page[size]': 100}
+        changes = {collection: {'added': [], 'updated': [], 'deleted': []} for collection in COLLECTIONS}
+        def merge(collection: str, elements: list)->list:
+            """returns the elements added or updated, with the rule_name and rule_id of the rule components kept"""
+            modified = []
+            for element in elements:
+                previous = snapshot.elements[collection].get(element['id'], None)
+                if isModified(previous, element):
+                    if previous is not None and collection == 'ruleComponents':
+                        element.setdefault('rule_name', previous.get('rule_name'))
+                        element.setdefault('rule_id', previous.get('rule_id'))
+                    if element['id'] not in changes[collection]['added'] + changes[collection]['updated']:
+                        changes[collection]['added' if previous is None else 'updated'].append(element['id'])
+                    modified.append(element)
+            return modified
+        def delete(collection: str, ids: list)->None:
+            for _id in ids:
+                if collection == 'rules':  # the rule components are removed with the rule
+                    changes['ruleComponents']['deleted'] += [component['id'] for component in snapshot.getRuleComponents(_id)]
+                if snapshot.remove(collection, _id) is not None and _id not in changes[collection]['deleted']:
+                    changes[collection]['deleted'].append(_id)
+        with futures.ThreadPoolExecutor(workers) as executor:
+            submit = lambda func, *args, **kwargs: executor.submit(tracing.propagate(func), *args, **kwargs)
+            totals = {collection: submit(self._getTotalCount, url) for collection, url in incremental.items()} if deletions else {}
+            lists = {collection: submit(self.paginator.getAll, url, params=params, strict=True) for collection, url in incremental.items()}
+            lists['environments'] = submit(self.paginator.getAll, self._Environments, strict=True)
+            lists['hosts'] = submit(self.paginator.getAll, self._Host, strict=True)
+            ## every listing is complete before the snapshot is modified
+            lists = {collection: future.result() for collection, future in lists.items()}
+            totals = {collection: future.result() for collection, future in totals.items()}
+            rules = merge('rules', lists['rules'])
+            components = [submit(self._getSnapshotRuleComponents, rule) for rule in rules]
+            libraries = merge('libraries', lists['libraries'])
+            members = {library['id']: submit(self._getLibraryMemberIds, library) for library in libraries}
+            for collection in ['dataElements', 'extensions', 'environments', 'hosts']:
+                for element in merge(collection, lists[collection]):
+                    snapshot.add(collection, element)
+            for collection in ['environments', 'hosts']:  # listed entirely
+                listed = {element['id'] for element in lists[collection]}
+                delete(collection, [_id for _id in snapshot.elements[collection] if _id not in listed])
+            for rule in rules:
+                snapshot.add('rules', rule)
+                self.ruleComponents[rule['id']] = {'name': rule['attributes']['name'], 'url': rule['links']['rule_components']}
+            for library in libraries:
+                snapshot.add('libraries', library)
+            ## the ids are listed only for the collections whose total differs from the snapshot
+            listed_ids = {collection: submit(self._getListedIds, incremental[collection]) for collection in ['rules', 'dataElements', 'extensions', 'libraries']
+                          if deletions and totals[collection] != len(snapshot.elements[collection])}
+            for collection, future in listed_ids.items():
+                listed = future.result()
+                delete(collection, [_id for _id in snapshot.elements[collection] if _id not in listed])
+            rule_ids = {rule['id'] for rule in rules}
+            listed = []
+            for element in lists['ruleComponents']:
+                related = getRelatedIds(element, 'rules')
+                if getOriginId(element) != element['id']:  # revision
+                    continue
+                if len(related) > 0 and not any(rule_id in snapshot.elements['rules'] for rule_id in related):  # component of a deleted rule
+                    continue
+                listed.append(element)
+            for element in merge('ruleComponents', listed):
+                if element.get('rule_id') not in rule_ids:  # the components of the rules modified are replaced below
+                    snapshot.add('ruleComponents', element)
+            for rule, future in zip(rules, components):
+                fetched = future.result()
+                fetched_ids = {element['id'] for element in fetched}
+                delete('ruleComponents', [component['id'] for component in snapshot.getRuleComponents(rule['id']) if component['id'] not in fetched_ids])
+                for element in merge('ruleComponents', fetched):
+                    snapshot.add('ruleComponents', element)
+            if deletions and totals['ruleComponents'] != len(snapshot.elements['ruleComponents']):
+                listed = self._getListedIds(self._RuleComponents)
+                delete('ruleComponents', [_id for _id in snapshot.elements['ruleComponents'] if _id not in listed])
+            for library_id, future in members.items():
+                snapshot.setLibraryMembers(library_id, future.result())
+        snapshot.fetched_at = fetched_at
+        self.useSnapshot(snapshot)
+        if verbose:
+            print(f"refresh of {self.name}: " + str({collection: {change: len(ids) for change, ids in change_ids.items()} for collection, change_ids in changes.items()}))
+        return changes
+
+    @traced
     def createExtension(self, extension_id: str, settings: str = None, descriptor: str = None, **kwargs)-> object:
         """
         Create an extension in your property. Your extension_id argument should be the latest one extension id available.
@@ -706,8 +863,9 @@ class Property:
             data = extensions['data']
         except:
             data = extensions
-        return data
+        return self.indexes['extensions'].add(data)
 
+    @traced
     def createRule(self, name: str)->object:
         """
         Create a rule by provided a rule name.
@@ -731,8 +889,9 @@ class Property:
                                                'url': data['links']['rule_components']}
         except:
             data = rules
-        return data
+        return self.indexes['rules'].add(data)
 
+    @traced
     def createRuleComponent(self, name: str, settings: str = None, descriptor: str = None, extension_infos: dict = None, rule_infos: dict = None, **kwargs)->object:
         """
         Create a ruleComponent by provided a rule name and descriptor (minimum). It returns an object.
@@ -790,8 +949,9 @@ class Property:
             data = rc['data']
         except:
             data = rc
-        return data
+        return self.indexes['ruleComponents'].add(data)
 
+    @traced
     def createDataElement(self, name: str, descriptor: str = None, settings: str = None, extension: dict = None, **kwargs: dict)->object:
         """
         Create Data Elements following the usage of required arguments. 
@@ -831,8 +991,9 @@ class Property:
             data = dataElements['data']
         except:
             data = dataElements
-        return data
+        return self.indexes['dataElements'].add(data)
 
+    @traced
     def createEnvironment(self, name: str, host_id: str, stage: str = 'development', **kwargs)->object:
         """
         Create an environment. Note that you cannot create more than 1 environment for Staging and Production stage. 
@@ -861,8 +1022,9 @@ class Property:
         }
         env = self.connector.postData(self._Environments, data=obj)
         data = env['data']
-        return data
+        return self.indexes['environments'].add(data)
 
+    @traced
     def createHost(self, name: str, host_type: str = 'akamai', **kwargs):
         """
         Create a host in that property. By default Akamai host. 
@@ -901,8 +1063,9 @@ class Property:
             data = host['data']
         except:
             data = host
-        return data
+        return self.indexes['hosts'].add(data)
 
+    @traced
     def createLibrary(self, name: str, return_class: bool = True)->object:
         """
         Create a library with the name provided. Returns an instance of the Library class or the response from the API (object).
@@ -922,7 +1085,7 @@ class Property:
         }
         lib = self.connector.postData(self._Libraries, data=obj)
         try:
-            data = lib['data']
+            data = self.indexes['libraries'].add(lib['data'])
             if return_class:
                 new_instance = Library(data)
                 return new_instance
@@ -931,6 +1094,7 @@ class Property:
         except:
             return lib
 
+    @traced
     def reviseExtension(self, extension_id, attr_dict: dict, **kwargs)-> object:
         """
         update the extension with the information provided in the argument.
@@ -953,6 +1117,7 @@ class Property:
         data = extensions['data']
         return data
 
+    @traced
     def reviseRule(self, rule_id: str)->object:
         """
         Update the rule.
@@ -976,6 +1141,7 @@ class Property:
         data = rules
         return data
     
+    @traced
     def getRuleRevision(self,rule_id:str)->dict:
         """
         Retrieve the revisions of the specified Rule.
@@ -988,6 +1154,7 @@ class Property:
         revisions = self.connector.getData(self.endpoint+path)
         return revisions
 
+    @traced
     def getRevisions(self,element:dict=None)->list:
         """
         Get the revisions of an element.
@@ -999,16 +1166,7 @@ class Property:
         revisionURL = element['relationships'].get('revisions',{}).get('links',{}).get('related','unknown')
         if revisionURL == "unknown":
             raise Exception("could not find a revision link in the element")
-        data = []
-        params = {"page[number]":0}
-        lastPage = False
-        while lastPage == False:
-            params["page[number]"] += 1
-            revision = self.getRessource(revisionURL,params=params)
-            data += revision['data']
-            metaLastPage = revision['meta'].get('pagination',{}).get('total_pages')
-            if metaLastPage == revision['meta'].get('pagination',{}).get('current_page'):
-                lastPage=True
+        data = self.paginator.getAll(revisionURL, start_page=1)
         return data
 
     def getLatestPublishedVersion(self,revisions:Union[list,dict]=None)->dict:
@@ -1033,6 +1191,7 @@ class Property:
             publishedVersion['attributes']['latest'] = False
         return publishedVersion
 
+    @traced
     def reviseDataElement(self, dataElement_id: str)->dict:
         """
         Update the data element information based on the information provided.
@@ -1055,6 +1214,7 @@ class Property:
         data = dataElements
         return data
 
+    @traced
     def getRule(self, rule_id: str=None)->dict:
         """
         Update the rule based on elements passed in attr_dict. 
@@ -1069,9 +1229,10 @@ class Property:
         rule = self.connector.getData(
             self.endpoint+path)
         if 'data' in rule.keys():
-            return rule['data']
+            return self.indexes['rules'].add(rule['data'])
         return rule
 
+    @traced
     def updateRule(self, rule_id: str, attr_dict: dict)->dict:
         """
         Update the rule based on elements passed in attr_dict. 
@@ -1096,8 +1257,9 @@ class Property:
             data = res['data']
         except:
             data = res
-        return data
+        return self.indexes['rules'].add(data)
 
+    @traced
     def updateRuleComponent(self, rc_id: str, attr_dict: dict, **kwargs)->dict:
         """
         Update the ruleComponents based on the information provided.
@@ -1118,8 +1280,9 @@ class Property:
             data = rc['data']
         except:
             data = rc
-        return data
+        return self.indexes['ruleComponents'].add(data)
     
+    @traced
     def updateCustomCode(self,rc_id:str=None,customCode:Union[str,IO]=None,encoding:str='utf-8')->dict:
         """
         Update the custom code of a component (analytics action or core action or data element).
@@ -1151,6 +1314,7 @@ class Property:
         return res
 
 
+    @traced
     def updateDataElement(self, dataElement_id: str, attr_dict: object, **kwargs)->dict:
         """
         Update the data element information based on the information provided.
@@ -1172,8 +1336,9 @@ class Property:
             data = dataElements['data']
         except:
             data = dataElements
-        return data
+        return self.indexes['dataElements'].add(data)
 
+    @traced
     def updateDataElementCode(self,dataElementId:str=None,code:str=None)->dict:
         """
         Update a data element custom code by passing the data element ID and the code as strng you want to upload.
@@ -1188,6 +1353,7 @@ class Property:
         newDE = self.updateDataElement(dataElementId,attr)
         return newDE
 
+    @traced
     def updateEnvironment(self, name: str, env_id: str, **kwargs)->dict:
         """
         Update an environment. Note :only support name change.
@@ -1211,8 +1377,9 @@ class Property:
             data = env['data']
         except:
             data = env
-        return data
+        return self.indexes['environments'].add(data)
 
+    @traced
     def updateExtension(self, extension_id, attr_dict: dict, **kwargs)-> object:
         """
         update the extension with the information provided in the argument.
@@ -1234,8 +1401,9 @@ class Property:
             data = extensions['data']
         except:
             data = extensions
-        return data
+        return self.indexes['extensions'].add(data)
 
+    @traced
     def deleteExtension(self, extension_id: str)->str:
         """
         Delete the extension that you want.  
@@ -1243,19 +1411,21 @@ class Property:
             extension_id : REQUIRED : Rule ID that needs to be deleted
         """
         data = self.connector.deleteData(
-            'https://reactor.adobe.io/extensions/'+extension_id)
-        return data
+            self.endpoint+'/extensions/'+extension_id)
+        return self._indexDeleted('extensions', extension_id, data)
 
+    @traced
     def deleteRule(self, rule_id: str)->str:
         """
         Delete the rule that you want. 
         Arguments: 
             rule_id : REQUIRED : Rule ID that needs to be deleted
         """
-        data = self.connector.deleteData('https://reactor.adobe.io/rules/' +
+        data = self.connector.deleteData(self.endpoint+'/rules/' +
                            rule_id)
-        return data
+        return self._indexDeleted('rules', rule_id, data)
 
+    @traced
     def deleteDataElement(self, dataElement_id: str)->str:
         """
         Delete a data element.  
@@ -1263,9 +1433,10 @@ class Property:
             dataElement_id : REQUIRED : Data Element ID that needs to be deleted
         """
         data = self.connector.deleteData(
-            'https://reactor.adobe.io/data_elements/'+dataElement_id)
-        return data
+            self.endpoint+'/data_elements/'+dataElement_id)
+        return self._indexDeleted('dataElements', dataElement_id, data)
 
+    @traced
     def deleteRuleComponent(self, rc_id: str)->str:
         """
         Delete the rule component that you have selected.  
@@ -1273,9 +1444,10 @@ class Property:
             rc_id : REQUIRED : Rule Component ID that needs to be deleted
         """
         data = self.connector.deleteData(
-            'https://reactor.adobe.io/rule_components/'+rc_id)
-        return data
+            self.endpoint+'/rule_components/'+rc_id)
+        return self._indexDeleted('ruleComponents', rc_id, data)
 
+    @traced
     def deleteEnvironment(self, env_id: str)->str:
         """
         Delete the environment based on the id.  
@@ -1283,9 +1455,10 @@ class Property:
             env_id : REQUIRED : Environment ID that needs to be deleted
         """
         data = self.connector.deleteData(
-            'https://reactor.adobe.io/environments/'+env_id)
-        return data
+            self.endpoint+'/environments/'+env_id)
+        return self._indexDeleted('environments', env_id, data)
 
+    @traced
     def deleteLibrary(self,library:str=None,components:bool=False)->str:
         """
         Delete a Library based on its name or ID.
@@ -1295,23 +1468,19 @@ class Property:
         """
         if library is None:
             raise ValueError("Require at least library ID")
-        libraries = self.getLibraries()
-        librariesIds = [lib['id'] for lib in libraries]
-        librariesNameId = {lib['attributes']['name']:lib['id'] for lib in libraries}
-        if library in librariesIds:
-            libraryId = library
-        else:
-            try:
-                libraryId = librariesNameId[library]
-            except KeyError:
-                raise ValueError("Library name or ID provided not found.")
+        libraries = self.indexes['libraries']
+        if library not in libraries and libraries.getId(library) is None:
+            self.getLibraries()
+        libraryId = library if library in libraries else libraries.getId(library)
+        if libraryId is None:
+            raise ValueError("Library name or ID provided not found.")
         path = f"/libraries/{libraryId}"
         if components==True:  
             myLib = self.getLibrary(libraryId)
             libClass = Library(myLib)
             rules = libClass.getRules()
             dataelements = libClass.getDataElements()
-        res = self.connector.deleteData('https://reactor.adobe.io/'+path)
+        res = self._indexDeleted('libraries', libraryId, self.connector.deleteData(self.endpoint+path))
         if components==True:
             for rule in rules:
                 self.deleteRule(rule['id'])
@@ -0,0 +1,237 @@
+import time
+import threading
+from email.utils import parsedate_to_datetime
+# Non standard libraries
+from launchpy import config
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shaping the requests of one class of endpoints.
+    The rate is adaptive: it is halved when the API throttles the requests and slowly recovers on successful responses.
+    """
+
+    def __init__(self, rate: float = 10, burst: int = 20, min_rate: float = None) -> None:
+        """
+        Arguments:
+            rate : OPTIONAL : number of requests per second allowed in the long run. Default 10.
+            burst : OPTIONAL : number of requests that can be sent at once. Default 20.
+            min_rate : OPTIONAL : the rate never goes below this value after throttling. Default rate / 10.
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate if min_rate is not None else self.max_rate / 10
+        self.burst = burst
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:  # no refill while the bucket is blocked
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Reserve a token and returns the number of seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, self._updated - now)
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def acquire(self) -> float:
+        """
+        Wait until a request can be sent. Returns the number of seconds waited.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def waitUnblocked(self) -> float:
+        """
+        Wait until the bucket is not blocked anymore, without consuming a token. Returns the number of seconds waited.
+        """
+        wait = self.blocked_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+            return wait
+        return 0.0
+
+    def block(self, delay: float, slow_down: bool = True) -> None:
+        """
+        Block every request of the bucket for some seconds.
+        Arguments:
+            delay : REQUIRED : number of seconds to wait before sending new requests.
+            slow_down : OPTIONAL : halve the rate of the bucket. Default True.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + delay)
+            self.tokens = min(self.tokens, 0.0)
+            self._updated = max(self._updated, self.blocked_until)
+            if slow_down:
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self) -> None:
+        """
+        Increase the rate by 5% of the maximum rate after a successful request.
+        """
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter shared by all the connectors of the process.
+    It holds one TokenBucket per class of endpoints ("read" for GET requests, "write" for the others).
+    The traffic shaping is opt-in (configureRateLimits), but when the API returns a 429, all the threads are paused
+    together for the time indicated by the API.
+    """
+
+    def __init__(self, limits: dict = None) -> None:
+        """
+        Arguments:
+            limits : OPTIONAL : dictionary such as config.rate_limits
+        """
+        self._lock = threading.Lock()
+        self.configure(limits or config.rate_limits)
+
+    def configure(self, limits: dict) -> None:
+        """
+        (Re)create the buckets based on the limits.
+        Arguments:
+            limits : REQUIRED : dictionary such as {"read":{"rate":10,"burst":20},"write":{"rate":5,"burst":10}}
+        """
+        with self._lock:
+            self.limits = limits
+            self.enabled = limits.get('enabled', False)
+            self.buckets = {name: TokenBucket(rate=limit['rate'], burst=limit['burst'])
+                            for name, limit in limits.items() if name in ['read', 'write']}
+            self._throttled = 0
+
+    @staticmethod
+    def getEndpointClass(method: str) -> str:
+        """
+        Returns the class of endpoint ("read" or "write") for an HTTP method.
+        """
+        if method.upper() in ['GET', 'HEAD', 'OPTIONS']:
+            return 'read'
+        return 'write'
+
+    def acquire(self, method: str = 'GET') -> float:
+        """
+        Wait until the request can be sent. Returns the number of seconds waited.
+        Arguments:
+            method : OPTIONAL : HTTP method of the request. Default GET.
+        """
+        if not self.enabled:
+            return self.buckets[self.getEndpointClass(method)].waitUnblocked()
+        return self.buckets[self.getEndpointClass(method)].acquire()
+
+    def reserve(self, method: str = 'GET') -> float:
+        """
+        Reserve the sending of a request without waiting. Returns the number of seconds to wait before sending it.
+        Used by the asynchronous connector to wait without blocking the event loop.
+        Arguments:
+            method : OPTIONAL : HTTP method of the request. Default GET.
+        """
+        bucket = self.buckets[self.getEndpointClass(method)]
+        if not self.enabled:
+            return max(0.0, bucket.blocked_until - time.monotonic())
+        return bucket.reserve()
+
+    def getRetryAfter(self, headers: dict) -> float:
+        """
+        Returns the number of seconds to wait from the rate-limit headers of a response, None if not provided.
+        Supported headers: Retry-After (seconds or HTTP date), X-RateLimit-Reset / RateLimit-Reset (seconds or epoch timestamp).
+        """
+        if headers is None:
+            return None
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        reset = headers.get('X-RateLimit-Reset', headers.get('RateLimit-Reset'))
+        if reset is not None:
+            try:
+                reset = float(reset)
+            except ValueError:
+                return None
+            if reset > 1e9:  # epoch timestamp
+                return max(0.0, reset - time.time())
+            return reset
+        return None
+
+    def throttle(self, method: str = 'GET', headers: dict = None) -> float:
+        """
+        Pause every thread after the API returned a 429 and slow down the rate of the endpoint class.
+        The delay is read from the response headers, otherwise it grows exponentially with consecutive 429.
+        Returns the delay applied.
+        Arguments:
+            method : OPTIONAL : HTTP method of the throttled request.
+            headers : OPTIONAL : headers of the 429 response.
+        """
+        delay = self.getRetryAfter(headers)
+        with self._lock:
+            self._throttled += 1
+            throttled = self._throttled
+        if delay is None:
+            delay = min(self.limits.get('max_retry_after', 120),
+                        self.limits.get('default_retry_after', 5) * 2 ** (throttled - 1))
+        endpoint_class = self.getEndpointClass(method)
+        for name, bucket in self.buckets.items():
+            bucket.block(delay, slow_down=(name == endpoint_class))
+        return delay
+
+    def update(self, method: str = 'GET', headers: dict = None) -> None:
+        """
+        Update the limiter with a successful response.
+        If the API indicates that no request is remaining, the threads are paused until the reset.
+        """
+        with self._lock:
+            self._throttled = 0
+        if not self.enabled:
+            return
+        bucket = self.buckets[self.getEndpointClass(method)]
+        if headers is not None:
+            remaining = headers.get('X-RateLimit-Remaining', headers.get('RateLimit-Remaining'))
+            if remaining is not None and str(remaining).strip() == '0':
+                delay = self.getRetryAfter(headers)
+                if delay:
+                    bucket.block(delay, slow_down=False)
+                return
+        bucket.recover()
+
+
+rateLimiter = RateLimiter()
+
+
+def configureRateLimits(read_rate: float = 10, read_burst: int = 20, write_rate: float = 5, write_burst: int = 10, enabled: bool = True) -> None:
+    """
+    Configure and enable the client-side rate limiter shared by all the connectors.
+    The traffic shaping is disabled until this method is used, only the 429 responses are handled.
+    Arguments:
+        read_rate : OPTIONAL : GET requests per second. Default 10.
+        read_burst : OPTIONAL : GET requests that can be sent at once. Default 20.
+        write_rate : OPTIONAL : POST, PATCH, PUT and DELETE requests per second. Default 5.
+        write_burst : OPTIONAL : POST, PATCH, PUT and DELETE requests that can be sent at once. Default 10.
+        enabled : OPTIONAL : set to False to disable the traffic shaping again (429 are still handled). Default True.
+    """
+    config.rate_limits['read'] = {'rate': read_rate, 'burst': read_burst}
+    config.rate_limits['write'] = {'rate': write_rate, 'burst': write_burst}
+    config.rate_limits['enabled'] = enabled
+    rateLimiter.configure(config.rate_limits)
@@ -0,0 +1,105 @@
+import random
+# Non standard libraries
+import requests
+from urllib3.exceptions import NewConnectionError
+try:
+    import httpx
+except ImportError:  # only required by the asynchronous connector
+    httpx = None
+from launchpy import config
+
+
+class RetryPolicy:
+    """
+    Retry policy used by the connectors for every HTTP method.
+    It retries the transient errors (5xx, connection resets, timeouts) with an exponential backoff and full jitter,
+    within a maximum number of retries and a maximum elapsed time.
+    Non-idempotent requests (POST, PATCH) are only retried when the server did not process them (429, 503, connection refused),
+    unless the request is flagged as idempotent.
+    """
+
+    IDEMPOTENT_METHODS = ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']
+    NOT_PROCESSED_STATUSES = [429, 503]
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 30,
+                 max_elapsed: float = 300,
+                 jitter: bool = True,
+                 retry_statuses: list = None
+                 ) -> None:
+        """
+        Arguments:
+            max_retries : OPTIONAL : maximum number of retries of a request. Default 3.
+            backoff_factor : OPTIONAL : base of the backoff in seconds, doubled at each retry. Default 0.5.
+            max_backoff : OPTIONAL : maximum time to wait between 2 retries in seconds. Default 30.
+            max_elapsed : OPTIONAL : no retry is attempted after this amount of seconds since the first try. Default 300.
+            jitter : OPTIONAL : randomize the backoff between 0 and its value (full jitter). Default True.
+            retry_statuses : OPTIONAL : list of status codes to retry. Default [500, 502, 503, 504].
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses if retry_statuses is not None else [500, 502, 503, 504]
+
+    @classmethod
+    def fromConfig(cls, **kwargs) -> 'RetryPolicy':
+        """
+        Returns a policy based on config.retry, overridden by the kwargs passed.
+        """
+        return cls(**{**config.retry, **kwargs})
+
+    def isRetryable(self, method: str, status_code: int = None, exception: Exception = None, idempotent: bool = None) -> bool:
+        """
+        Returns True if the request can be retried.
+        Arguments:
+            method : REQUIRED : HTTP method of the request
+            status_code : OPTIONAL : status code of the response, if any
+            exception : OPTIONAL : exception raised while sending the request, if any
+            idempotent : OPTIONAL : override the idempotency deduced from the method
+        """
+        if idempotent is None:
+            idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        if exception is not None:
+            if isinstance(exception, requests.exceptions.ConnectTimeout):
+                return True  # the request never reached the server
+            reason = getattr(exception.args[0], 'reason', None) if exception.args else None
+            if isinstance(reason, NewConnectionError):
+                return True  # connection refused, the request never reached the server
+            if httpx is not None and isinstance(exception, httpx.TransportError):
+                if isinstance(exception, (httpx.ConnectError, httpx.ConnectTimeout)):
+                    return True
+                return idempotent
+            if isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                return idempotent
+            return False
+        if status_code in self.NOT_PROCESSED_STATUSES:
+            return True
+        return status_code in self.retry_statuses and idempotent
+
+    def getBackoff(self, attempt: int) -> float:
+        """
+        Returns the number of seconds to wait before the retry number `attempt` (starting at 1).
+        """
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, backoff)
+        return backoff
+
+
+def configureRetryPolicy(max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30, max_elapsed: float = 300) -> None:
+    """
+    Configure the default retry policy of the connectors created afterwards.
+    Arguments:
+        max_retries : OPTIONAL : maximum number of retries of a request. Default 3.
+        backoff_factor : OPTIONAL : base of the backoff in seconds, doubled at each retry. Default 0.5.
+        max_backoff : OPTIONAL : maximum time to wait between 2 retries in seconds. Default 30.
+        max_elapsed : OPTIONAL : no retry is attempted after this amount of seconds since the first try. Default 300.
+    """
+    config.retry['max_retries'] = max_retries
+    config.retry['backoff_factor'] = backoff_factor
+    config.retry['max_backoff'] = max_backoff
+    config.retry['max_elapsed'] = max_elapsed
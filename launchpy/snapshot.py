@@ -0,0 +1,432 @@
+import json
+import gzip
+import lzma
+import pickle
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Iterator
+# Non standard libraries
+from launchpy.__version__ import __version__
+from launchpy.indexes import ElementIndex
+
+
+# collections of a snapshot, with the resource type used by the API
+COLLECTIONS = {
+    'rules': 'rules',
+    'ruleComponents': 'rule_components',
+    'dataElements': 'data_elements',
+    'extensions': 'extensions',
+    'environments': 'environments',
+    'hosts': 'hosts',
+    'libraries': 'libraries',
+}
+# collections of the library members, as named by the library endpoints
+LIBRARY_MEMBERS = {'rules': 'rules', 'dataElements': 'data_elements', 'extensions': 'extensions'}
+
+
+def getRelatedIds(element: dict, name: str) -> list:
+    """
+    Returns the ids of the resources in the relationship name of an element.
+    Arguments:
+        element : REQUIRED : resource definition
+        name : REQUIRED : name of the relationship (ex: "extension", "rules")
+    """
+    data = element.get('relationships', {}).get(name, {}).get('data', None)
+    if isinstance(data, dict):
+        return [data['id']] if data.get('id') is not None else []
+    if isinstance(data, list):
+        return [related['id'] for related in data if related.get('id') is not None]
+    return []
+
+
+def getOriginId(element: dict) -> str:
+    """
+    Returns the id of the head resource of a revision (the element id when it is not a revision).
+    Arguments:
+        element : REQUIRED : resource definition
+    """
+    origin = getRelatedIds(element, 'origin')
+    if len(origin) > 0:
+        return origin[0]
+    origin = element.get('links', {}).get('origin', element['id'])
+    return origin.split('/').pop()
+
+
+def now() -> str:
+    """
+    Returns the current date in the format of the API dates (ex: "2022-12-12T10:19:20.867Z").
+    """
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def isModified(previous: dict, element: dict) -> bool:
+    """
+    Returns True if an element has been modified since the previous version of it (updated_at or revision number changed).
+    Arguments:
+        previous : REQUIRED : previous version of the element, None if it was unknown
+        element : REQUIRED : current version of the element
+    """
+    if previous is None:
+        return True
+    for key in ['updated_at', 'revision_number']:
+        if previous.get('attributes', {}).get(key) != element.get('attributes', {}).get(key):
+            return True
+    return previous.get('meta', {}).get('latest_revision_number') != element.get('meta', {}).get('latest_revision_number')
+
+
+class PropertySnapshot:
+    """
+    In-memory model of a property: its rules, rule components, data elements, extensions, environments, hosts and libraries.
+    Each collection is an ElementIndex (elements indexed by id, name and delegate descriptor), and the relations are resolved:
+        rule -> rule components, component (rule component or data element) -> extension, library -> members.
+    The relations are maintained by the hooks of the ElementIndex, so they stay consistent when the indexes are changed directly.
+    It is returned by the snapshot method of the Property class, which then uses the indexes of the snapshot as its own indexes.
+    Attributes:
+        property : definition of the property
+        fetched_at : date (ISO format) of the fetch of the snapshot
+        indexes : dictionary of collection name to the ElementIndex of the collection
+        elements : dictionary of collection name to a dictionary of id to element (the elements of the indexes)
+    """
+
+    VERSION = 2
+
+    def __init__(self, property: dict = None, fetched_at: str = None, api: object = None) -> None:
+        """
+        Create an empty snapshot. The elements are added with the add method.
+        Arguments:
+            property : OPTIONAL : definition of the property
+            fetched_at : OPTIONAL : date (ISO format) of the fetch. Default now.
+            api : OPTIONAL : Property instance used to refresh the snapshot.
+        """
+        self.property = property or {}
+        self.id = self.property.get('id', None)
+        self.name = self.property.get('attributes', {}).get('name', None)
+        self.fetched_at = fetched_at or now()
+        self.api = api
+        self.indexes = {collection: ElementIndex(on_add=partial(self._index, collection), on_remove=partial(self._unindex, collection))
+                        for collection in COLLECTIONS}
+        self.elements = {collection: index.elements for collection, index in self.indexes.items()}
+        self._ruleComponents = {}  # rule id -> rule component ids
+        self._extensionComponents = {}  # extension id -> rule component and data element ids
+        self._libraryMembers = {}  # library id -> collection -> member ids
+        self._memberLibraries = {}  # member id -> library ids
+
+    def __getstate__(self) -> dict:
+        state = {**self.__dict__, 'version': self.VERSION}
+        state['api'] = None  # the connector is not serialized, the snapshot is refreshed with a new Property instance
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        if state.pop('version', None) != self.VERSION:
+            raise ValueError("Unsupported snapshot version, the snapshot has to be fetched again")
+        self.__dict__.update(state)
+
+    def __repr__(self) -> str:
+        counts = ', '.join(f"{collection}={len(self.elements[collection])}" for collection in COLLECTIONS)
+        return f"PropertySnapshot(name={self.name!r}, id={self.id!r}, {counts})"
+
+    def __len__(self) -> int:
+        return sum(len(elements) for elements in self.elements.values())
+
+    def __contains__(self, _id: str) -> bool:
+        return any(_id in elements for elements in self.elements.values())
+
+    @staticmethod
+    def _checkCollection(collection: str) -> None:
+        if collection not in COLLECTIONS:
+            raise KeyError(f"Unknown collection {collection}, possible values: {list(COLLECTIONS)}")
+
+    @staticmethod
+    def _getRuleIds(element: dict) -> list:
+        if element.get('rule_id', None) is not None:  # added by the fetch of the components of each rule
+            return [element['rule_id']]
+        return getRelatedIds(element, 'rules')
+
+    def _index(self, collection: str, element: dict) -> None:
+        _id = element['id']
+        if collection == 'ruleComponents':
+            for rule_id in self._getRuleIds(element):
+                self._ruleComponents.setdefault(rule_id, []).append(_id)
+        if collection in ['ruleComponents', 'dataElements']:
+            for extension_id in getRelatedIds(element, 'extension'):
+                self._extensionComponents.setdefault(extension_id, []).append(_id)
+
+    def _unindex(self, collection: str, element: dict, replaced: bool = False) -> None:
+        _id = element['id']
+        relations = []
+        if collection == 'ruleComponents':
+            relations += [(self._ruleComponents, rule_id) for rule_id in self._getRuleIds(element)]
+        if collection in ['ruleComponents', 'dataElements']:
+            relations += [(self._extensionComponents, extension_id) for extension_id in getRelatedIds(element, 'extension')]
+        for relation, key in relations:
+            if _id in relation.get(key, []):
+                relation[key].remove(_id)
+        if replaced:  # new version of the element: the members of a library and the components of a rule are kept
+            return
+        if collection == 'libraries':
+            for members in self._libraryMembers.pop(_id, {}).values():
+                for member_id in members:
+                    if _id in self._memberLibraries.get(member_id, []):
+                        self._memberLibraries[member_id].remove(_id)
+        if collection == 'rules':
+            for component_id in list(self._ruleComponents.pop(_id, [])):
+                self.indexes['ruleComponents'].remove(component_id)
+
+    def add(self, collection: str, element: dict) -> dict:
+        """
+        Add an element to a collection of the snapshot, or replace the element with the same id.
+        Returns the element.
+        Arguments:
+            collection : REQUIRED : name of the collection (rules, ruleComponents, dataElements, extensions, environments, hosts, libraries)
+            element : REQUIRED : definition of the element
+        """
+        self._checkCollection(collection)
+        return self.indexes[collection].add(element)
+
+    def remove(self, collection: str, _id: str) -> dict:
+        """
+        Remove an element from a collection of the snapshot, and the rule components of a rule. Returns the element removed, None if it was not there.
+        Arguments:
+            collection : REQUIRED : name of the collection
+            _id : REQUIRED : id of the element
+        """
+        self._checkCollection(collection)
+        return self.indexes[collection].remove(_id)
+
+    def setLibraryMembers(self, library_id: str, members: dict) -> None:
+        """
+        Set the members of a library.
+        Arguments:
+            library_id : REQUIRED : id of the library
+            members : REQUIRED : dictionary of collection (rules, dataElements, extensions) to the list of the ids of the head resources
+        """
+        for previous in self._libraryMembers.get(library_id, {}).values():
+            for member_id in previous:
+                if library_id in self._memberLibraries.get(member_id, []):
+                    self._memberLibraries[member_id].remove(library_id)
+        self._libraryMembers[library_id] = {collection: list(members.get(collection, [])) for collection in LIBRARY_MEMBERS}
+        for ids in self._libraryMembers[library_id].values():
+            for member_id in ids:
+                self._memberLibraries.setdefault(member_id, []).append(library_id)
+
+    def get(self, collection: str, key: str) -> dict:
+        """
+        Returns an element of a collection from its id or its name (the first one added when several elements share the name).
+        Returns None when there is no element matching.
+        Arguments:
+            collection : REQUIRED : name of the collection
+            key : REQUIRED : id or name of the element
+        """
+        self._checkCollection(collection)
+        return self.indexes[collection].get(key)
+
+    def getByName(self, collection: str, name: str) -> list:
+        """
+        Returns the list of the elements of a collection with that name.
+        Arguments:
+            collection : REQUIRED : name of the collection
+            name : REQUIRED : name of the elements
+        """
+        self._checkCollection(collection)
+        return self.indexes[collection].getByName(name)
+
+    def iterElements(self, collection: str) -> Iterator[dict]:
+        """
+        Yield the elements of a collection.
+        Arguments:
+            collection : REQUIRED : name of the collection
+        """
+        self._checkCollection(collection)
+        yield from self.elements[collection].values()
+
+    def getRule(self, key: str) -> dict:
+        """
+        Returns a rule from its id or its name.
+        """
+        return self.get('rules', key)
+
+    def getDataElement(self, key: str) -> dict:
+        """
+        Returns a data element from its id or its name.
+        """
+        return self.get('dataElements', key)
+
+    def getExtension(self, key: str) -> dict:
+        """
+        Returns an extension from its id or its name.
+        """
+        return self.get('extensions', key)
+
+    def getLibrary(self, key: str) -> dict:
+        """
+        Returns a library from its id or its name.
+        """
+        return self.get('libraries', key)
+
+    def getRuleComponents(self, rule: str | dict) -> list:
+        """
+        Returns the rule components of a rule.
+        Arguments:
+            rule : REQUIRED : rule definition, id or name
+        """
+        rule = self.getRule(rule['id'] if isinstance(rule, dict) else rule)
+        if rule is None:
+            return []
+        return [self.elements['ruleComponents'][_id] for _id in self._ruleComponents.get(rule['id'], [])]
+
+    def getComponentExtension(self, component: str | dict) -> dict:
+        """
+        Returns the extension of a rule component or a data element.
+        Arguments:
+            component : REQUIRED : rule component or data element definition or id
+        """
+        if isinstance(component, str):
+            component = self.elements['ruleComponents'].get(component) or self.elements['dataElements'].get(component)
+        if component is None:
+            return None
+        extension_ids = getRelatedIds(component, 'extension')
+        return self.elements['extensions'].get(extension_ids[0]) if len(extension_ids) > 0 else None
+
+    def getExtensionComponents(self, extension: str | dict) -> dict:
+        """
+        Returns the rule components and data elements using an extension, as a dictionary with ruleComponents and dataElements keys.
+        Arguments:
+            extension : REQUIRED : extension definition, id or name
+        """
+        extension = self.getExtension(extension['id'] if isinstance(extension, dict) else extension)
+        components = {'ruleComponents': [], 'dataElements': []}
+        if extension is None:
+            return components
+        for _id in self._extensionComponents.get(extension['id'], []):
+            for collection in components:
+                if _id in self.elements[collection]:
+                    components[collection].append(self.elements[collection][_id])
+        return components
+
+    def getLibraryMembers(self, library: str | dict) -> dict:
+        """
+        Returns the rules, data elements and extensions of a library, as a dictionary with rules, dataElements and extensions keys.
+        The members are the head resources of the property (not the revisions), when they are still in the snapshot.
+        Arguments:
+            library : REQUIRED : library definition, id or name
+        """
+        library = self.getLibrary(library['id'] if isinstance(library, dict) else library)
+        members = self._libraryMembers.get(library['id'], {}) if library is not None else {}
+        return {collection: [self.elements[collection][_id] for _id in members.get(collection, []) if _id in self.elements[collection]]
+                for collection in LIBRARY_MEMBERS}
+
+    def getElementLibraries(self, element: str | dict) -> list:
+        """
+        Returns the libraries containing a rule, data element or extension.
+        Arguments:
+            element : REQUIRED : element definition or id
+        """
+        _id = element['id'] if isinstance(element, dict) else element
+        return [self.elements['libraries'][library_id] for library_id in self._memberLibraries.get(_id, [])
+                if library_id in self.elements['libraries']]
+
+    def refresh(self, property: object = None, since: str = None, deletions: bool = True, verbose: bool = False) -> dict:
+        """
+        Bring the snapshot up to date, fetching only the elements updated since the last fetch (see the refreshSnapshot method of the Property class).
+        Returns the changes: a dictionary of collection to the ids added, updated and deleted.
+        Arguments:
+            property : OPTIONAL : Property instance used for the requests. Default the one that fetched the snapshot.
+            since : OPTIONAL : date (ISO format) of the last sync. Default the fetched_at attribute.
+            deletions : OPTIONAL : detect the deleted elements, with the total counts and a listing of the ids when a count changed. Default True.
+            verbose : OPTIONAL : print the changes.
+        """
+        if property is None:
+            property = self.api
+        if property is None:
+            from launchpy.property import Property
+            if len(self.property) == 0:
+                raise ValueError("The snapshot has no property definition, a Property instance is required")
+            property = Property(self.property)
+        self.api = property
+        return property.refreshSnapshot(self, since=since, deletions=deletions, verbose=verbose)
+
+    def save(self, path: str) -> Path:
+        """
+        Write the snapshot in a file, to reload it with the load method instead of fetching the property again.
+        The format depends on the extension of the path:
+            - ".pkl" or ".pickle" : pickle (protocol 5), the fastest to reload, indexes included.
+            - ".gz" : JSON lines compressed with gzip (ex: "snapshot.jsonl.gz").
+            - ".xz" or ".lzma" : JSON lines compressed with lzma, the smallest.
+            - any other extension : JSON lines.
+        The JSON lines start with a header line (version, launchpy version, property, fetched_at, counts), then one line per element and per library members.
+        Arguments:
+            path : REQUIRED : path of the file
+        """
+        path = Path(path)
+        if path.suffix in ['.pkl', '.pickle']:
+            path.write_bytes(pickle.dumps(self, protocol=5))
+            return path
+        header = {
+            'version': self.VERSION,
+            'launchpy': __version__,
+            'property': self.property,
+            'fetched_at': self.fetched_at,
+            'counts': self.getSummary(),
+        }
+        lines = [json.dumps(header)]
+        for collection in COLLECTIONS:
+            for element in self.elements[collection].values():
+                lines.append(json.dumps({'collection': collection, 'data': element}, separators=(',', ':')))
+        for library_id, members in self._libraryMembers.items():
+            lines.append(json.dumps({'libraryMembers': library_id, 'data': members}, separators=(',', ':')))
+        content = ('\n'.join(lines) + '\n').encode()
+        if path.suffix == '.gz':
+            content = gzip.compress(content, mtime=0)
+        elif path.suffix in ['.xz', '.lzma']:
+            content = lzma.compress(content)
+        path.write_bytes(content)
+        return path
+
+    @classmethod
+    def load(cls, path: str, api: object = None) -> 'PropertySnapshot':
+        """
+        Returns the snapshot written in a file by the save method. The format is deduced from the extension of the path.
+        Only load pickle files that you wrote yourself, unpickling a file can execute code.
+        Arguments:
+            path : REQUIRED : path of the file
+            api : OPTIONAL : Property instance used to refresh the snapshot.
+        """
+        path = Path(path)
+        if path.suffix in ['.pkl', '.pickle']:
+            snapshot = pickle.loads(path.read_bytes())
+            if not isinstance(snapshot, cls):
+                raise ValueError(f"{path} does not contain a PropertySnapshot")
+            snapshot.api = api
+            return snapshot
+        opener = gzip.open if path.suffix == '.gz' else lzma.open if path.suffix in ['.xz', '.lzma'] else open
+        with opener(path, 'rt') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != cls.VERSION:
+                raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+            snapshot = cls(header['property'], fetched_at=header['fetched_at'], api=api)
+            for line in f:
+                if line.strip() == '':
+                    continue
+                record = json.loads(line)
+                if 'libraryMembers' in record:
+                    snapshot.setLibraryMembers(record['libraryMembers'], record['data'])
+                else:
+                    snapshot.add(record['collection'], record['data'])
+        return snapshot
+
+    def getSummary(self) -> dict:
+        """
+        Returns the number of elements per collection.
+        """
+        return {collection: len(self.elements[collection]) for collection in COLLECTIONS}
+
+
+def loadSnapshot(path: str, api: object = None) -> PropertySnapshot:
+    """
+    Returns the PropertySnapshot written in a file by its save method.
+    Arguments:
+        path : REQUIRED : path of the file (".pkl", ".jsonl.gz", ".jsonl.xz" or ".jsonl")
+        api : OPTIONAL : Property instance used to refresh the snapshot.
+    """
+    return PropertySnapshot.load(path, api=api)
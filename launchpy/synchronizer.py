@@ -2,7 +2,9 @@ import re,json
 # Non standard libraries
 from .admin import Admin
 from .property import Property
+from .snapshot import PropertySnapshot, loadSnapshot
 from .library import Library
+from .tracing import traced
 from .launchpy import Translator, copySettings
 from collections import defaultdict
 from copy import deepcopy
@@ -21,6 +23,7 @@ class Synchronizer:
     It requires that you have imported a configuration file.
     """
 
+    @traced
     def __init__(self,base:str | Property = None,targets:list=None,**kwargs)->None:
         """
         Instantiating the Synchronizer taking 2 parameters, base property name, target property list.
@@ -31,14 +34,21 @@ class Synchronizer:
         possible kwargs:
             dynamicRuleComponent: A data element name that contains rule for synchronization on the property.
             mapping_extensions : A dictionary of {"target-extension-name" : "base-extension-name"} when in different IMS org and 2 private extensions are name differently for the same purpose.
+            snapshots : A dictionary of {"property-name" : PropertySnapshot or path of a saved snapshot}, to start from the snapshots instead of listing the rules, data elements and extensions.
+            refresh_snapshots : Boolean. Refresh the snapshots (incrementally) before using them. Default False, the snapshots must be up to date.
+                If a refresh fails, the synchronizer is not created, so that nothing is synchronized from incomplete components.
         """
         tmp_admin = Admin()
         cid = tmp_admin.getCompanyId()
         properties = tmp_admin.getProperties(cid)
         mapping_extensions = kwargs.get('mapping_extensions',None)
+        self.snapshots = {}
+        for name, snapshot in (kwargs.get('snapshots',None) or {}).items():
+            self.snapshots[name] = snapshot if isinstance(snapshot,PropertySnapshot) else loadSnapshot(snapshot)
+        self.refresh_snapshots = kwargs.get('refresh_snapshots',False)
         self.base = {}
         if type(base) == str:
-            base_property = [prop for prop in properties if prop['attributes']['name'] == base]
+            base_property = tmp_admin.indexes['properties'].getByName(base)
             if len(base_property) ==0:
                 raise KeyError("The base property name has not been found in your account")
             self.base["name"] = base
@@ -46,9 +56,7 @@ class Synchronizer:
         elif type(base) == Property:
             self.base["name"] = base.name
             self.base["api"]:Property = base
-        self.base['rules'] = self.base['api'].getRules()
-        self.base['dataElements'] = self.base['api'].getDataElements()
-        self.base['extensions'] = self.base['api'].getExtensions()
+        self.base.update(self._getComponents(self.base['api']))
         self.translator = Translator(mapping_extensions=mapping_extensions)
         self.translator.setBaseExtensions(self.base['extensions'],self.base['name'])
         self.translator.setBaseRules(self.base['rules'],self.base['name'])
@@ -56,16 +64,14 @@ class Synchronizer:
         self.target_configs = {}
         for target in targets:
             if isinstance(target,str):
-                tmp_target = [prop for prop in properties if prop['attributes']['name'] == target]
+                tmp_target = tmp_admin.indexes['properties'].getByName(target)
                 if len(tmp_target) == 0:
                     raise KeyError(f"The target property : {target} cannot be found. Please, fix it")
                 self.targets[target] = {'api' : Property(tmp_target[0]),'name':target}
             elif isinstance(target,Property):
                 self.targets[target.name] = {'api' : deepcopy(target),'name':target.name}
                 target = target.name
-            self.targets[target]['rules'] = self.targets[target]['api'].getRules()
-            self.targets[target]['extensions'] = self.targets[target]['api'].getExtensions()
-            self.targets[target]['dataElements'] = self.targets[target]['api'].getDataElements()
+            self.targets[target].update(self._getComponents(self.targets[target]['api']))
             self.targets[target]['libraryStack'] = {'dataElements':[],'rules':[],"extensions":[]}
             self.translator.extendExtensions(self.targets[target]['extensions'],target)
             if len(self.targets[target]['rules']) > 0:
@@ -73,7 +79,7 @@ class Synchronizer:
             else:
                 self.translator.rules[target] = None
         if kwargs.get("dynamicRuleComponent",None) is not None:
-            configRules = [de for de in self.base['dataElements'] if de['attributes']['name'] == kwargs.get("dynamicRuleComponent",None)]
+            configRules = self.base['api'].indexes['dataElements'].getByName(kwargs.get("dynamicRuleComponent",None))
             if len(configRules)==1:
                 configRules = configRules[0]
             else:
@@ -81,6 +87,55 @@ class Synchronizer:
             codeConfig:list = json.loads(json.loads(configRules['attributes']['settings'])['source'])## list expected from the code
             self.dynamicFiltering(codeConfig)
 
+    def _getComponents(self,api:Property)->dict:
+        """
+        Returns the rules, data elements and extensions of a property, from its snapshot when one has been passed, from the API otherwise.
+        Arguments:
+            api : REQUIRED : Property instance
+        """
+        snapshot = self.snapshots.get(api.name,None)
+        if snapshot is None:
+            return {
+                'rules' : api.getRules(),
+                'dataElements' : api.getDataElements(),
+                'extensions' : api.getExtensions()
+            }
+        if snapshot.id is not None and snapshot.id != api.id:
+            raise ValueError(f"The snapshot passed for {api.name} is the snapshot of another property ({snapshot.id})")
+        snapshot.api = api
+        if self.refresh_snapshots:
+            try:
+                snapshot.refresh(api)
+            except Exception as e:
+                raise Exception(f"The snapshot of {api.name} could not be refreshed completely, the synchronization is aborted: {e}") from e
+        api.useSnapshot(snapshot)
+        for rule in snapshot.iterElements('rules'):
+            api.ruleComponents[rule['id']] = {'name': rule['attributes']['name'],'url': rule['links']['rule_components']}
+        return {
+            'rules' : list(snapshot.iterElements('rules')),
+            'dataElements' : list(snapshot.iterElements('dataElements')),
+            'extensions' : list(snapshot.iterElements('extensions'))
+        }
+
+    def __refreshElement__(self,api:Property,collection:str,element:dict,newElement:dict)->dict:
+        """
+        Replace the content of an element of the lists (rules, dataElements, extensions) by its new version, in place,
+        so that the lists and the indexes of the Property share the same element. Returns the element.
+        When the new version is not an element (ex: an error returned by the API), it is returned as is.
+        Arguments:
+            api : REQUIRED : Property instance holding the indexes
+            collection : REQUIRED : name of the collection (rules, dataElements, extensions)
+            element : REQUIRED : element from the list to update
+            newElement : REQUIRED : new version of the element
+        """
+        if not isinstance(newElement,dict) or newElement.get('id',None) is None:
+            return newElement
+        if newElement is not element:
+            element.clear()
+            element.update(newElement)
+        return api.indexes[collection].add(element)
+
+    @traced
     def dynamicFiltering(self,dynamicFilterJSON:dict,override:bool=True)->None:
         """
         Building the dynamic rule filtering for each of the target properties.
@@ -135,34 +190,19 @@ class Synchronizer:
             publishedVersion : OPTIONAL : if you want to take the version that has been published
         """
         cmp_base=None
+        indexes = self.base['api'].indexes
         if componentId is not None:
-            if componentId.startswith('DE'): ## if data element
-                componentBase = [de for de in self.base['dataElements'] if de['id'] == componentId]
-                if len(componentBase)==0:
-                    raise KeyError("Component ID cannot be found")
-                cmp_base = componentBase[0]
-            elif componentId.startswith('RL'): ## if a rule
-                componentBase = [de for de in self.base['rules'] if de['id'] == componentId]
-                if len(componentBase)==0:
+            collections = {'DE':'dataElements','RL':'rules','EX':'extensions'}
+            if componentId[:2] in collections.keys():
+                cmp_base = indexes[collections[componentId[:2]]].elements.get(componentId,None)
+                if cmp_base is None:
                     raise KeyError("Component ID cannot be found")
-                cmp_base = componentBase[0]
-            elif componentId.startswith('EX'): ## if an extension
-                componentBase = [ext for ext in self.base['extensions'] if ext['id'] == componentId]
-                if len(componentBase)==0:
-                    raise KeyError("Component ID cannot be found")
-                cmp_base = componentBase[0]
         if componentId is None and componentName is not None: ## If only componentName
-            for rule in self.base['rules']:
-                if componentName == rule['attributes']['name']:
-                    cmp_base = rule
-            if cmp_base is None:
-                for de in self.base['dataElements']:
-                    if componentName == de['attributes']['name']:
-                        cmp_base = de
-            if cmp_base is None:
-                for ext in self.base['extensions']:
-                    if componentName == ext['attributes']['name']:
-                        cmp_base = ext
+            for collection in ['rules','dataElements','extensions']:
+                matches = indexes[collection].getByName(componentName)
+                if len(matches)>0:
+                    cmp_base = matches[-1] ## last match, as when the lists are scanned
+                    break
         ## In case we do not find any match
         if cmp_base is None:
             raise KeyError("The component ID or component Name cannot be matched in your template property")
@@ -180,7 +220,7 @@ class Synchronizer:
                     ruleName=publishedVersion['attributes']['name'],
                     ruleId=publishedVersion['id'],
                     property_name=self.base["name"])
-                    self.base['rules'].append(publishedVersion)
+                    self.base['rules'].append(publishedVersion) ## the revision is not indexed, the indexes only hold the head resources
                 if cmp_baseDict['component']['type'] == 'data_elements':
                     self.base['dataElements'].append(publishedVersion)
             cmp_baseDict['id'] = publishedVersion['id']
@@ -189,6 +229,7 @@ class Synchronizer:
             cmp_baseDict['copy'] = copySettings(publishedVersion)
         return cmp_baseDict
 
+    @traced
     def syncComponent(self,componentName:str=None,componentId:str=None,publishedVersion:bool=False,forceCreation:bool=True,**kwargs)->None:
         """
         Synchronize a component from the base property to the different target properties.
@@ -221,8 +262,9 @@ class Synchronizer:
                 ## if there is no allow list for that property, or no match in the list of target properties, or component was allow
                 if len(self.target_configs.get(target,{}).get('inclComponents',[]))==0 or flagAllowList:
                     translatedComponent = self.translator.translate(target,data_element=cmp_baseDict['copy'])
+                    old_component = self.targets[target]['api'].indexes['dataElements'].getByName(cmp_baseDict['name'])
                     ## if it does not exist
-                    if cmp_baseDict['name'] not in [de.get('attributes',{}).get('name') for de in self.targets[target]['dataElements']]:
+                    if len(old_component)==0:
                         if forceCreation:
                             comp = self.targets[target]['api'].createDataElement(
                                 name=cmp_baseDict['name'],
@@ -241,7 +283,7 @@ class Synchronizer:
                             self.targets[target]['libraryStack']['dataElements'].append(comp)
                             self.targets[target]['dataElements'].append(comp)
                     else:
-                        index,old_component = [(index,de) for index,de in enumerate(self.targets[target]['dataElements']) if de.get('attributes',{}).get('name') == cmp_baseDict['name']][0]
+                        old_component = old_component[0]
                         attributes = {
                             "name" : translatedComponent['name'],
                             "enabled" : translatedComponent["enabled"],
@@ -256,8 +298,7 @@ class Synchronizer:
                             dataElement_id=old_component['id'],
                             attr_dict=attributes,
                             )
-                        del self.targets[target]['dataElements'][index]
-                        self.targets[target]['dataElements'].append(comp)
+                        comp = self.__refreshElement__(self.targets[target]['api'],'dataElements',old_component,comp)
                         self.targets[target]['libraryStack']['dataElements'].append(comp)
         ## Rules part
         if cmp_baseDict['component']['type'] == 'rules':
@@ -280,8 +321,9 @@ class Synchronizer:
                         flagAllowList = True
                 ## if there is no allow list for that property, or no match in the list of target properties, or component was allow
                 if len(self.target_configs.get(target,{}).get('inclComponents',[]))==0 or flagAllowList:
+                    targetRule = self.targets[target]['api'].indexes['rules'].getByName(cmp_baseDict['name'])
                     ## if rule does not exist
-                    if cmp_baseDict['name'] not in [rule['attributes']['name'] for rule in self.targets[target]['rules']]:
+                    if len(targetRule)==0:
                         if forceCreation:## creating the rule
                             targetRule = self.targets[target]['api'].createRule(
                                 name=cmp_baseDict['name']
@@ -289,7 +331,6 @@ class Synchronizer:
                             targetRuleId = targetRule['id']
                             self.translator.extendTargetRules(ruleName=cmp_baseDict['name'],ruleId=targetRuleId,property_name=target)
                             self.targets[target]['rules'].append(targetRule)
-                            index = len(self.targets[target]['rules'])-1
                             self.targets[target]['libraryStack']['rules'].append(targetRule)
                             for rc in template_ruleComponents:
                                 try:
@@ -314,7 +355,7 @@ class Synchronizer:
                         else:
                             flagSkipCreation = True
                     else: ## if a rule exist with the same name
-                        index, targetRule = [(index,rule) for index, rule in enumerate(self.targets[target]['rules']) if rule['attributes']['name'] == cmp_baseDict['name']][0]
+                        targetRule = targetRule[0]
                         self.targets[target]['libraryStack']['rules'].append(targetRule)
                         targetRuleId = targetRule['id']
                         rcsLinkTarget = targetRule.get('relationships',{}).get('rule_components',{}).get('links',{}).get('related')
@@ -350,10 +391,10 @@ class Synchronizer:
                     if not flagSkipCreation:
                         if cmp_baseDict['component']['attributes']['enabled'] != targetRule['attributes']['enabled']:
                             baseRuleAttr = copySettings(cmp_baseDict['component'])
-                            targetRule = self.targets[target]['api'].updateRule(rule_id=targetRuleId,attr_dict=baseRuleAttr) ## keeping in a var for debug
-                            del self.targets[target]['rules'][index]
-                            self.targets[target]['rules'].append(targetRule)
+                            targetRule = self.__refreshElement__(self.targets[target]['api'],'rules',targetRule,
+                                self.targets[target]['api'].updateRule(rule_id=targetRuleId,attr_dict=baseRuleAttr)) ## keeping in a var for debug
 
+    @traced
     def syncComponents(self,componentsName:list=None,componentsId:list=None,publishedVersion:bool=False)->None:
         """
         Sync multiple components by looping through the list of name passed.
@@ -369,6 +410,7 @@ class Synchronizer:
             for component in componentsId:
                 self.syncComponent(componentId=component,publishedVersion=publishedVersion)
     
+    @traced
     def createTargetsLibrary(self,name:str="syncComponents",assignEnv:bool=False)->None:
         """
         This method will create or update a Library in all of the target properties to gather all elements changed.
@@ -390,22 +432,28 @@ class Synchronizer:
                 self.targets[target]['library'] = library
             self.targets[target]['library'].getFullLibrary()
             ## taking care of rule update
-            existingRules = [rule['id'] for rule in self.targets[target]['library'].relationships['rules'] if rule['id'] in [r['id'] for r in self.targets[target]['libraryStack']['rules']]]
-            newRules = [rule['id'] for rule in self.targets[target]['libraryStack']['rules'] if rule['id'] not in existingRules]
+            stackRules = {r['id'] for r in self.targets[target]['libraryStack']['rules']}
+            existingRules = [rule['id'] for rule in self.targets[target]['library'].relationships['rules'] if rule['id'] in stackRules]
+            existingRulesIds = set(existingRules)
+            newRules = [rule['id'] for rule in self.targets[target]['libraryStack']['rules'] if rule['id'] not in existingRulesIds]
             if len(existingRules) > 0:
                 self.targets[target]['library'].updateRules(existingRules)
             if len(newRules)>0:
                 self.targets[target]['library'].addRules(newRules)
             ## taking care of data elements
-            existingDataElements = [de['id'] for de in self.targets[target]['library'].relationships['data_elements'] if de['id'] in [d['id'] for d in self.targets[target]['libraryStack']['dataElements']]]
-            newDataElements = [de['id'] for de in self.targets[target]['libraryStack']['dataElements'] if de['id'] not in existingDataElements]
+            stackDataElements = {d['id'] for d in self.targets[target]['libraryStack']['dataElements']}
+            existingDataElements = [de['id'] for de in self.targets[target]['library'].relationships['data_elements'] if de['id'] in stackDataElements]
+            existingDataElementsIds = set(existingDataElements)
+            newDataElements = [de['id'] for de in self.targets[target]['libraryStack']['dataElements'] if de['id'] not in existingDataElementsIds]
             if len(existingDataElements) > 0:
                 self.targets[target]['library'].updateDataElements(existingDataElements)
             if len(newDataElements)>0:
                 self.targets[target]['library'].addDataElements(newDataElements)
             ## taking care of the extensions
-            existingExtensions = [ext['id'] for ext in self.targets[target]['library'].relationships['extensions'] if ext['id'] in [e['id'] for e in self.targets[target]['libraryStack']['extensions']]]
-            newExtensions = [ext['id'] for ext in self.targets[target]['libraryStack']['extensions'] if ext['id'] not in existingExtensions]
+            stackExtensions = {e['id'] for e in self.targets[target]['libraryStack']['extensions']}
+            existingExtensions = [ext['id'] for ext in self.targets[target]['library'].relationships['extensions'] if ext['id'] in stackExtensions]
+            existingExtensionsIds = set(existingExtensions)
+            newExtensions = [ext['id'] for ext in self.targets[target]['libraryStack']['extensions'] if ext['id'] not in existingExtensionsIds]
             if len(existingExtensions) > 0:
                 self.targets[target]['library'].updateExtensions(existingExtensions)
             if len(newExtensions)>0:
@@ -433,6 +481,7 @@ class Synchronizer:
         return response
 
 
+    @traced
     def upgradeTargetExtension(self,extensionName:str=None,platform:str="web")->dict:
         """
         Upgrade the name extension in the target properties.
@@ -448,17 +497,19 @@ class Synchronizer:
                 extensionUpdate = target['api'].checkExtensionUpdate(extensionName)
                 for extName, extUpdateDict in extensionUpdate.items():
                     if extUpdateDict["update"]:
+                        old_extensions = target['api'].indexes['extensions'].getByName(extName)
                         res = target['api'].upgradeExtension(extUpdateDict['internal_id'],extUpdateDict["package_id"])
+                        if len(old_extensions)>0:
+                            res = self.__refreshElement__(target['api'],'extensions',old_extensions[0],res)
+                        else:
+                            target['extensions'].append(res)
                         target['libraryStack']['extensions'].append(res)
-                        if len([index for index, ext in enumerate(target['extensions']) if ext['attributes']['name'] == extName])>0:
-                            index = [index for index, ext in enumerate(target['extensions']) if ext['attributes']['name'] == extName][0]
-                            del target['extensions'][index]
-                        target['extensions'].append(res)
                         
             except:
                 raise ValueError(f"Could not find an extension name: {extensionName}")
 
 
+    @traced
     def renameComponent(self,old_name:str=None,new_name:str=None)->None:
         """
         Passing the old and new name of a component, it will rename the component in the different target properties.
@@ -472,8 +523,9 @@ class Synchronizer:
         if new_name is None:
             raise ValueError("Require the new name to be passed")        
         for target in self.targets:
-            if old_name in [de['attributes']['name'] for de in self.targets[target]['dataElements']]:
-                component = [de for de in self.targets[target]['dataElements'] if de['attributes']['name']== old_name][0]
+            components = self.targets[target]['api'].indexes['dataElements'].getByName(old_name)
+            if len(components)>0:
+                component = components[0]
                 copy = copySettings(component)
                 attributes = {
                     "name" : new_name,
@@ -489,17 +541,20 @@ class Synchronizer:
                     dataElement_id=component['id'],
                     attr_dict=attributes,
                     )
+                comp = self.__refreshElement__(self.targets[target]['api'],'dataElements',component,comp)
                 self.targets[target]['libraryStack']['dataElements'].append(comp)
-            if old_name in [rule['attributes']['name'] for rule in self.targets[target]['rules']]:
-                component = [rule for rule in self.targets[target]['rules'] if rule['attributes']['name']== old_name][0]
+            components = self.targets[target]['api'].indexes['rules'].getByName(old_name)
+            if len(components)>0:
+                component = components[0]
                 copy = copySettings(component)
                 copy['name'] = new_name
                 comp = self.targets[target]['api'].updateRule(rule_id=component['id'],attr_dict=copy)
+                comp = self.__refreshElement__(self.targets[target]['api'],'rules',component,comp)
                 self.targets[target]['libraryStack']['rules'].append(comp)
-                self.targets[target]['rules'].append(comp)
                 self.translator.extendTargetRules(ruleName=new_name,ruleId=comp['id'],property_name=target) 
 
 
+    @traced
     def checkComponentSync(self,componentName:str=None,componentId:str=None,publishedVersion:bool=False,excludeSimilar:bool=False,**kwargs)->bool:
         """
         Check if the component,from the base property, is synced to the different target properties.
@@ -535,11 +590,12 @@ class Synchronizer:
                 dict_result['base-state'] = "Edited"
         if cmp_baseDict['component']['type'] == 'data_elements':
             for target in list(self.targets.keys()):
+                target_de = self.targets[target]['api'].indexes['dataElements'].getByName(cmp_baseDict['name'])
                 ## if it does not exist
-                if cmp_baseDict['name'] not in [de.get('attributes',{}).get('name') for de in self.targets[target]['dataElements']]:
+                if len(target_de)==0:
                     dict_result[target] = f'Data Element "{cmp_baseDict["name"]}" does not exist in Target'
                 else:
-                    index,target_de = [(index,de) for index,de in enumerate(self.targets[target]['dataElements']) if de['attributes']['name'] == cmp_baseDict['name']][0]
+                    target_de = target_de[0]
                     issue_pub = ""
                     if publishedVersion:
                         try:
@@ -564,11 +620,12 @@ class Synchronizer:
                 rc['rule_name'] = cmp_baseDict['name']
                 rc['rule_id'] = cmp_baseDict['id']
             for target in list(self.targets.keys()):
+                targetRule = self.targets[target]['api'].indexes['rules'].getByName(cmp_baseDict['name'])
                 ## if rule does not exist
-                if cmp_baseDict['name'] not in [rule['attributes']['name'] for rule in self.targets[target]['rules']]:
+                if len(targetRule)==0:
                     dict_result[target] = "Rule does not exist in Target"
                 else:
-                    index, targetRule = [(index,rule) for index, rule in enumerate(self.targets[target]['rules']) if rule['attributes']['name'] == cmp_baseDict['name']][0]
+                    targetRule = targetRule[0]
                     issue_pub = ""
                     componentsDifferences = [] ## list of differences for rule components for rule to check difference
                     if publishedVersion:
@@ -652,10 +709,11 @@ class Synchronizer:
                             dict_result[target] = 'Similar' + issue_pub
         if cmp_baseDict['component']['type'] == 'extensions':
             for target in list(self.targets.keys()):
-                if cmp_baseDict['name'] not in [ext['attributes']['name'] for ext in self.targets[target]['extensions']]:
+                extensionTarget = self.targets[target]['api'].indexes['extensions'].getByName(cmp_baseDict['name'])
+                if len(extensionTarget)==0:
                     dict_result[target] = f'Extension "{cmp_baseDict['name']}" is not present'
                 else:
-                    index, extensionTarget = [(index,ext) for index, ext in enumerate(self.targets[target]['extensions']) if ext['attributes']['name'] == cmp_baseDict['name']][0]
+                    extensionTarget = extensionTarget[0]
                     issue_pub = ""
                     if publishedVersion:
                         try:
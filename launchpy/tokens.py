@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Dict
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+
+class TokenStore:
+    """
+    Process-wide store of the access tokens, keyed by IMS org, client id and scopes.
+    All the connectors created with the same credentials share the same token.
+    Only one thread at a time can refresh the token of a given key, the other threads wait and reuse the new token.
+    The tokens can also be persisted on disk (opt-in) so that a new process does not need to request a token to IMS.
+    """
+
+    def __init__(self) -> None:
+        self._tokens = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.persist = False
+        self.path = None
+
+    def enablePersistence(self, path: str = None) -> None:
+        """
+        Persist the tokens on disk, one file per org / client id, readable only by the current user.
+        Arguments:
+            path : OPTIONAL : folder where the tokens are stored. Default "~/.launchpy/tokens"
+        """
+        if path is None:
+            path = Path.home() / '.launchpy' / 'tokens'
+        self.path = Path(path)
+        self.path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.persist = True
+
+    def disablePersistence(self, clear: bool = False) -> None:
+        """
+        Stop persisting the tokens on disk.
+        Arguments:
+            clear : OPTIONAL : delete the tokens already saved on disk. Default False.
+        """
+        if clear and self.path is not None:
+            for token_file in self.path.glob('*.json'):
+                token_file.unlink()
+        self.persist = False
+
+    def _getFilePath(self, key: tuple) -> Path:
+        name = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        return self.path / f"{name}.json"
+
+    def _readFile(self, key: tuple) -> Dict[str, str]:
+        """
+        Read the token saved on disk for that key. Files readable by other users are ignored.
+        """
+        file_path = self._getFilePath(key)
+        if not file_path.exists():
+            return None
+        if os.name == 'posix':
+            file_stat = file_path.stat()
+            if file_stat.st_uid != os.getuid() or file_stat.st_mode & 0o077:
+                return None
+        try:
+            with open(file_path, 'r') as f:
+                token_info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() < token_info.get('date_limit', 0):
+            return {'token': token_info['token'], 'date_limit': token_info['date_limit']}
+        return None
+
+    def _writeFile(self, key: tuple, token_info: dict) -> None:
+        """
+        Write the token on disk with permission restricted to the current user (0600), atomically.
+        """
+        file_path = self._getFilePath(key)
+        tmp_path = file_path.with_suffix(f'.{os.getpid()}.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'org_id': key[0], 'client_id': key[1], **token_info}, f)
+        os.replace(tmp_path, file_path)
+
+    def _fileLock(self, key: tuple):
+        """
+        Returns an open lock file, locked exclusively, so that only one process refreshes the token. None if not supported.
+        """
+        if fcntl is None:
+            return None
+        lock_file = open(self._getFilePath(key).with_suffix('.lock'), 'w')
+        os.chmod(lock_file.name, 0o600)
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    @staticmethod
+    def getKey(config: dict) -> tuple:
+        """
+        Returns the key used to store the token of a configuration.
+        Arguments:
+            config : REQUIRED : Configuration object.
+        """
+        return (config.get('org_id'), config.get('client_id'), config.get('scopes'))
+
+    def _getLock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def get(self, config: dict) -> Dict[str, str]:
+        """
+        Returns the stored token information ({'token','date_limit'}) if still valid, None otherwise.
+        Arguments:
+            config : REQUIRED : Configuration object.
+        """
+        token_info = self._tokens.get(self.getKey(config))
+        if token_info is not None and time.time() < token_info['date_limit']:
+            return token_info
+        return None
+
+    def set(self, config: dict, token: str, date_limit: float) -> Dict[str, str]:
+        """
+        Store a token for a configuration.
+        Arguments:
+            config : REQUIRED : Configuration object.
+            token : REQUIRED : The access token.
+            date_limit : REQUIRED : timestamp after which the token needs to be refreshed.
+        """
+        token_info = {'token': token, 'date_limit': date_limit}
+        self._tokens[self.getKey(config)] = token_info
+        return token_info
+
+    def getToken(self, config: dict, fetch: Callable[[], dict], margin: int = 500) -> Dict[str, str]:
+        """
+        Returns a valid token for the configuration, fetching a new one only when required.
+        Arguments:
+            config : REQUIRED : Configuration object.
+            fetch : REQUIRED : function returning a dictionary with 'token' and 'expiry' (in seconds).
+            margin : OPTIONAL : Number of seconds before the expiry when the token is considered expired. Default 500.
+        """
+        token_info = self.get(config)
+        if token_info is not None:
+            return token_info
+        key = self.getKey(config)
+        with self._getLock(key):
+            token_info = self.get(config)  # another thread may have refreshed it while waiting
+            if token_info is not None:
+                return token_info
+            if not self.persist:
+                return self._fetchToken(config, fetch, margin)
+            lock_file = self._fileLock(key)
+            try:
+                token_info = self._readFile(key)  # another process may have saved it
+                if token_info is not None:
+                    return self.set(config, token_info['token'], token_info['date_limit'])
+                token_info = self._fetchToken(config, fetch, margin)
+                self._writeFile(key, token_info)
+                return token_info
+            finally:
+                if lock_file is not None:
+                    lock_file.close()
+
+    def _fetchToken(self, config: dict, fetch: Callable[[], dict], margin: int) -> Dict[str, str]:
+        token_and_expiry = fetch()
+        if type(token_and_expiry) != dict or 'token' not in token_and_expiry.keys():
+            raise Exception(f"Could not retrieve a token: {token_and_expiry}")
+        date_limit = time.time() + token_and_expiry['expiry'] - margin
+        return self.set(config, token_and_expiry['token'], date_limit)
+
+    def invalidate(self, config: dict = None, token: str = None) -> None:
+        """
+        Remove the token of a configuration, or all the tokens if no configuration is passed.
+        Arguments:
+            config : OPTIONAL : Configuration object.
+            token : OPTIONAL : only remove the token of the configuration if it is still this one,
+                so that a token already renewed by another connector is kept.
+        """
+        if config is not None and token is not None:
+            key = self.getKey(config)
+            with self._getLock(key):
+                token_info = self._tokens.get(key)
+                if token_info is not None and token_info['token'] != token:
+                    return
+                self._tokens.pop(key, None)
+                if self.persist:
+                    saved_info = self._readFile(key)
+                    if saved_info is not None and saved_info['token'] == token:
+                        self._getFilePath(key).unlink()
+            return
+        if config is None:
+            self._tokens.clear()
+            if self.persist:
+                for token_file in self.path.glob('*.json'):
+                    token_file.unlink()
+        else:
+            self._tokens.pop(self.getKey(config), None)
+            if self.persist and self._getFilePath(self.getKey(config)).exists():
+                self._getFilePath(self.getKey(config)).unlink()
+
+
+tokenStore = TokenStore()
+
+
+def enableTokenCache(path: str = None) -> None:
+    """
+    Persist the access tokens on disk so that new processes (scripts, CLI sessions) reuse a valid token instead of requesting one to IMS.
+    Arguments:
+        path : OPTIONAL : folder where the tokens are stored. Default "~/.launchpy/tokens"
+    """
+    tokenStore.enablePersistence(path)
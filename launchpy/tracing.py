@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import asyncio
+import inspect
+import threading
+import contextvars
+from functools import wraps
+from itertools import count
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+# Non standard libraries
+from launchpy import config, metrics
+
+_currentSpan = contextvars.ContextVar('launchpy_span', default=None)
+
+
+class Span:
+    """
+    A timed operation, child of the span active when it started.
+    """
+    __slots__ = ('id', 'parent_id', 'name', 'category', 'attributes', 'start', 'end', 'thread')
+
+    def __init__(self, id: int, parent_id: int, name: str, category: str, attributes: dict, thread: int) -> None:
+        self.id = id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.thread = thread
+        self.start = time.monotonic()
+        self.end = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.monotonic()) - self.start
+
+    def toDict(self) -> dict:
+        return {'id': self.id, 'parent_id': self.parent_id, 'name': self.name, 'category': self.category,
+                'start': self.start, 'end': self.end, 'duration': self.duration, 'attributes': self.attributes}
+
+
+class Tracer:
+    """
+    In-process tracer recording nested spans.
+    The active span is kept in a context variable, so spans opened in the thread pools of the paginator
+    and in the asyncio tasks are attached to the span that started them.
+    The spans can be written as a Chrome trace (chrome://tracing, https://ui.perfetto.dev, speedscope).
+    """
+
+    def __init__(self, max_spans: int = 100000) -> None:
+        """
+        Arguments:
+            max_spans : OPTIONAL : maximum number of spans kept, the next ones are dropped. Default 100000.
+        """
+        self.enabled = config.tracing['enabled']
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self.origin = time.monotonic()
+        self._ids = count(1)
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def _getThread(self) -> int:
+        """
+        Returns a small identifier of the current thread, or of the current asyncio task,
+        so that the concurrent spans are displayed on separate lines.
+        """
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:  # no running event loop
+            key = threading.get_ident()
+        with self._lock:
+            return self._threads.setdefault(key, len(self._threads) + 1)
+
+    def _addSpan(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def startSpan(self, name: str, category: str = 'launchpy', **attributes) -> tuple:
+        """
+        Open a span as a child of the active span and make it the active span.
+        Returns the span and the token to pass to endSpan.
+        """
+        parent = _currentSpan.get()
+        span = Span(next(self._ids), parent.id if parent is not None else None, name, category, attributes, self._getThread())
+        return span, _currentSpan.set(span)
+
+    def endSpan(self, span: Span, token: contextvars.Token) -> None:
+        """
+        Close a span opened with startSpan and restore the previous active span.
+        """
+        span.end = time.monotonic()
+        _currentSpan.reset(token)
+        self._addSpan(span)
+
+    @contextmanager
+    def span(self, name: str, category: str = 'launchpy', **attributes) -> Iterator[Span]:
+        """
+        Context manager opening a span. Yields the span (None if the tracer is disabled), attributes can be added to it.
+        Arguments:
+            name : REQUIRED : name of the span
+            category : OPTIONAL : category of the span. Default "launchpy"
+            attributes : OPTIONAL : attributes of the span, as keyword arguments
+        """
+        if not self.enabled:
+            yield None
+            return
+        span, token = self.startSpan(name, category, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes['error'] = type(e).__name__
+            raise
+        finally:
+            self.endSpan(span, token)
+
+    def recordSpan(self, name: str, start: float, end: float = None, category: str = 'launchpy', **attributes) -> None:
+        """
+        Record a span that already ended, as a child of the active span (used by the connectors for the requests).
+        Arguments:
+            name : REQUIRED : name of the span
+            start : REQUIRED : time.monotonic() when the operation started
+            end : OPTIONAL : time.monotonic() when the operation ended. Default now.
+            category : OPTIONAL : category of the span.
+            attributes : OPTIONAL : attributes of the span, as keyword arguments
+        """
+        if not self.enabled:
+            return
+        parent = _currentSpan.get()
+        span = Span(next(self._ids), parent.id if parent is not None else None, name, category, attributes, self._getThread())
+        span.start = start
+        span.end = end or time.monotonic()
+        self._addSpan(span)
+
+    def getSpans(self) -> list:
+        """
+        Returns the finished spans as a list of dictionaries.
+        """
+        with self._lock:
+            return [span.toDict() for span in self.spans]
+
+    def toChromeTrace(self) -> dict:
+        """
+        Returns the spans in the Chrome trace event format.
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [{
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': round((span.start - self.origin) * 1e6, 3),
+            'dur': round((span.end - span.start) * 1e6, 3),
+            'pid': pid,
+            'tid': span.thread,
+            'args': {'id': span.id, 'parent_id': span.parent_id, **span.attributes}
+        } for span in sorted(spans, key=lambda span: span.start)]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'dropped_spans': self.dropped}}
+
+    def dump(self, path: str = None) -> str:
+        """
+        Returns the Chrome trace as a JSON string, and write it in a file if a path is provided.
+        Arguments:
+            path : OPTIONAL : path of the JSON file to write, that can be opened in chrome://tracing or https://ui.perfetto.dev
+        """
+        content = json.dumps(self.toChromeTrace(), default=str)
+        if path is not None:
+            Path(path).write_text(content)
+        return content
+
+    def reset(self) -> None:
+        """
+        Remove the recorded spans.
+        """
+        with self._lock:
+            self.spans = []
+            self.dropped = 0
+            self._threads = {}
+        self.origin = time.monotonic()
+
+
+tracer = Tracer(max_spans=config.tracing['max_spans'])
+
+
+def _getAttributes(signature: inspect.Signature, args: tuple, kwargs: dict) -> dict:
+    """
+    Returns the simple arguments of a call (strings, numbers, booleans) and the name of the instance, as span attributes.
+    """
+    attributes = {}
+    try:
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        return attributes
+    for name, value in arguments.items():
+        if name == 'self':
+            if isinstance(getattr(value, 'name', None), str):
+                attributes['instance'] = value.name
+        elif isinstance(value, (str, int, float, bool)):
+            attributes[name] = value if not isinstance(value, str) else value[:200]
+    return attributes
+
+
+@contextmanager
+def _operation(name: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> Iterator[None]:
+    """
+    Open a span for a call of a decorated function, and record its duration in the metrics registry.
+    """
+    start = time.monotonic()
+    status = 'success'
+    try:
+        if tracer.enabled:
+            with tracer.span(name, **_getAttributes(signature, args, kwargs)):
+                yield
+        else:
+            yield
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        metrics.registry.recordOperation(name, time.monotonic() - start, status)
+
+
+def traced(func: Callable = None, name: str = None) -> Callable:
+    """
+    Decorator opening a span around a function or a coroutine.
+    The simple arguments of the call and the name of the instance are added as attributes of the span.
+    The duration of the call is also recorded in the metrics registry (launchpy_operation_duration_seconds).
+    Arguments:
+        func : REQUIRED : function to decorate
+        name : OPTIONAL : name of the span. Default the qualified name of the function, ex: "Property.getRules"
+    """
+    if func is None:
+        return lambda func: traced(func, name=name)
+    span_name = name or func.__qualname__
+    signature = inspect.signature(func)
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def asyncWrapper(*args, **kwargs):
+            if not tracer.enabled and not metrics.registry.enabled:
+                return await func(*args, **kwargs)
+            with _operation(span_name, signature, args, kwargs):
+                return await func(*args, **kwargs)
+        return asyncWrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not tracer.enabled and not metrics.registry.enabled:
+            return func(*args, **kwargs)
+        with _operation(span_name, signature, args, kwargs):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Returns a function running func in the context of the caller (active span), to be submitted to a thread pool.
+    Arguments:
+        func : REQUIRED : function executed in the other threads
+    """
+    context = contextvars.copy_context()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)  # a context cannot be entered by two threads at once
+    return wrapper
+
+
+def enableTracing(max_spans: int = 100000) -> Tracer:
+    """
+    Record the spans of the high-level operations (Property, Library, Synchronizer, extractProperty) and of the requests.
+    Arguments:
+        max_spans : OPTIONAL : maximum number of spans kept. Default 100000.
+    """
+    config.tracing.update({'enabled': True, 'max_spans': max_spans})
+    tracer.max_spans = max_spans
+    tracer.enabled = True
+    return tracer
+
+
+def disableTracing() -> None:
+    """
+    Stop recording the spans. The spans already recorded are kept.
+    """
+    config.tracing['enabled'] = False
+    tracer.enabled = False
+
+
+def dumpTrace(path: str = None) -> str:
+    """
+    Returns the recorded spans as a Chrome trace JSON string, and write it in a file if a path is provided.
+    The file can be opened in chrome://tracing, https://ui.perfetto.dev or speedscope.
+    Arguments:
+        path : OPTIONAL : path of the JSON file to write.
+    """
+    return tracer.dump(path)
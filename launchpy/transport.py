@@ -0,0 +1,358 @@
+import json
+import gzip
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.client import responses as REASONS
+from pathlib import Path
+from typing import Iterator
+# Non standard libraries
+import requests
+from requests.structures import CaseInsensitiveDict
+from launchpy.__version__ import __version__
+
+# values removed from the recorded interactions
+REDACTED_FIELDS = ('client_secret', 'access_token', 'refresh_token')
+
+
+def buildResponse(method: str, url: str, status: int, headers: dict = None, content: bytes | str | dict = None) -> requests.Response:
+    """
+    Returns a requests.Response built from its parts, as returned by the HTTP transport.
+    Arguments:
+        method : REQUIRED : HTTP method of the request
+        url : REQUIRED : url of the request
+        status : REQUIRED : status code
+        headers : OPTIONAL : headers of the response
+        content : OPTIONAL : body of the response, JSON encoded if it is a dictionary or a list.
+    """
+    if content is None:
+        content = b''
+    elif isinstance(content, (dict, list)):
+        content = json.dumps(content).encode()
+    elif isinstance(content, str):
+        content = content.encode()
+    res = requests.Response()
+    res.status_code = status
+    res.reason = REASONS.get(status, '')
+    res.headers = CaseInsensitiveDict(headers or {})
+    res._content = content
+    res.encoding = 'utf-8'
+    res.url = url
+    res.request = requests.Request(method, url).prepare()
+    return res
+
+
+class Transport:
+    """
+    Sends the requests of the connectors and returns the responses.
+    The connectors use the HTTP transport by default, another transport can be set with setTransport
+    (ex: InMemoryTransport to run without network, RecordReplayTransport to record and replay the responses).
+    """
+
+    def request(self, method: str, url: str, headers: dict = None, params: dict = None, data: object = None) -> requests.Response:
+        """
+        Send a request and returns the response.
+        Raises a requests.exceptions.RequestException when no response is received.
+        Arguments:
+            method : REQUIRED : HTTP method
+            url : REQUIRED : url of the request
+            headers : OPTIONAL : headers of the request
+            params : OPTIONAL : query parameters
+            data : OPTIONAL : body of the request (string, or dictionary sent form encoded)
+        """
+        raise NotImplementedError
+
+    async def arequest(self, method: str, url: str, headers: dict = None, params: dict = None, data: object = None) -> requests.Response:
+        """
+        Send a request from the asynchronous connector, in a thread to not block the event loop.
+        """
+        return await asyncio.to_thread(self.request, method, url, headers=headers, params=params, data=data)
+
+    def close(self) -> None:
+        """
+        Release the resources of the transport.
+        """
+
+
+class HTTPTransport(Transport):
+    """
+    Sends the requests over HTTP, with the pooled session shared by the connectors (see connector.getSession).
+    """
+
+    def __init__(self, session: requests.Session = None) -> None:
+        """
+        Arguments:
+            session : OPTIONAL : requests session to use. Default the session shared by the connectors.
+        """
+        self._session = session
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is not None:
+            return self._session
+        from launchpy.connector import getSession
+        return getSession()
+
+    def request(self, method: str, url: str, headers: dict = None, params: dict = None, data: object = None) -> requests.Response:
+        return self.session.request(method, url, headers=headers, params=params, data=data)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+class InMemoryTransport(Transport):
+    """
+    Answers the requests in the process, without sockets, with a handler such as a MockReactor.
+    It isolates the CPU cost of the parsing, pagination, translation and synchronization from the network cost.
+    ex:
+        setTransport(InMemoryTransport(MockReactor("fixture.json")))
+    """
+
+    def __init__(self, handler: object) -> None:
+        """
+        Arguments:
+            handler : REQUIRED : object with a handle method, or function, receiving (method, url, params, body, headers)
+                and returning a tuple (status code, headers, JSON body), ex: a launchpy.mockserver.MockReactor.
+                A ConnectionError raised by the handler is received by the connectors as a dropped connection.
+        """
+        self.handler = getattr(handler, 'handle', handler)
+
+    def request(self, method: str, url: str, headers: dict = None, params: dict = None, data: object = None) -> requests.Response:
+        try:
+            status, res_headers, body = self.handler(method, url, params=params, body=data, headers=headers)
+        except ConnectionError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        return buildResponse(method, url, status, res_headers, body)
+
+
+class RecordReplayTransport(Transport):
+    """
+    Records the traffic of a session in a cassette, and replays it later without network,
+    at the recorded speed, faster, or without waiting.
+    Replaying the same cassette before and after a change shows if the number of requests or the throughput changed.
+    The responses are matched on the method, url, query parameters and body of the requests,
+    identical requests are answered in the order they were recorded.
+    The secrets (client secret, access tokens) are not recorded.
+    The cassette is a JSON lines file, compressed with gzip if its name ends with ".gz":
+    a header line (version, date, number of interactions) followed by one line per interaction,
+    with its start time and duration in seconds.
+    ex:
+        with useCassette("sync.jsonl.gz", mode="record"):
+            ...
+        with useCassette("sync.jsonl.gz", speed=10) as cassette:
+            ...
+        print(cassette.getStats())
+    """
+    VERSION = 1
+    # response headers not recorded
+    IGNORED_HEADERS = ('date', 'server', 'connection', 'keep-alive', 'content-length', 'content-encoding',
+                       'transfer-encoding', 'set-cookie')
+
+    def __init__(self, path: str = None, mode: str = 'replay', transport: Transport = None, speed: float = None) -> None:
+        """
+        Arguments:
+            path : OPTIONAL : path of the cassette, loaded in replay mode and written when closing in record mode.
+            mode : OPTIONAL : "record" or "replay". Default "replay".
+            transport : OPTIONAL : transport sending the requests in record mode. Default HTTPTransport.
+            speed : OPTIONAL : in replay mode, speed factor applied to the recorded durations of the requests:
+                1 waits as long as the recorded requests, 10 is ten times faster. Default None, no waiting.
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError("mode must be 'record' or 'replay'")
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be greater than 0")
+        self.path = path
+        self.mode = mode
+        self.transport = transport or HTTPTransport()
+        self.speed = speed
+        self.header = {}
+        self.interactions = []
+        self.stats = {'requests': 0, 'replayed': 0, 'repeated': 0, 'missing': 0}
+        self.started = time.monotonic()
+        self._queues = {}
+        self._lock = threading.Lock()
+        if mode == 'replay' and path is not None:
+            self.load(path)
+
+    @staticmethod
+    def _redact(value: object) -> object:
+        if isinstance(value, dict):
+            return {key: '***' if key in REDACTED_FIELDS else RecordReplayTransport._redact(element) for key, element in value.items()}
+        if isinstance(value, list):
+            return [RecordReplayTransport._redact(element) for element in value]
+        return value
+
+    @staticmethod
+    def _normalizeBody(data: object) -> object:
+        if isinstance(data, bytes):
+            data = data.decode()
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                return data
+        return RecordReplayTransport._redact(data)
+
+    @staticmethod
+    def getKey(method: str, url: str, params: dict = None, data: object = None) -> str:
+        """
+        Returns the key matching a request with its recorded response.
+        """
+        params = {key: str(value) for key, value in (params or {}).items()}
+        body = RecordReplayTransport._normalizeBody(data)
+        return json.dumps([method.upper(), url, sorted(params.items()), body], sort_keys=True, default=str)
+
+    def _replay(self, method: str, url: str, key: str) -> requests.Response:
+        with self._lock:
+            self.stats['requests'] += 1
+            queue = self._queues.get(key)
+            if not queue:
+                self.stats['missing'] += 1
+                raise requests.exceptions.ConnectionError(f"No recorded response for {method} {url}")
+            if len(queue) > 1 or not queue[0].get('replayed', False):
+                self.stats['replayed'] += 1
+            else:
+                self.stats['repeated'] += 1  # more identical requests than recorded
+            interaction = queue.popleft() if len(queue) > 1 else queue[0]  # the last one answers the next identical requests
+            interaction['replayed'] = True
+        if self.speed is not None:
+            time.sleep(interaction.get('duration', 0) / self.speed)
+        if 'error' in interaction:
+            raise requests.exceptions.ConnectionError(f"{interaction['error']} (recorded) for {method} {url}")
+        response = interaction['response']
+        return buildResponse(method, url, response['status'], response['headers'], response['body'])
+
+    def request(self, method: str, url: str, headers: dict = None, params: dict = None, data: object = None) -> requests.Response:
+        if self.mode == 'replay':
+            return self._replay(method, url, self.getKey(method, url, params, data))
+        interaction = {'request': {'method': method.upper(), 'url': url, 'params': params, 'body': self._normalizeBody(data)}}
+        start = time.monotonic()
+        try:
+            res = self.transport.request(method, url, headers=headers, params=params, data=data)
+        except requests.exceptions.RequestException as e:
+            interaction['error'] = type(e).__name__
+            raise
+        else:
+            try:
+                body = self._redact(res.json())
+            except ValueError:
+                body = res.text
+            res_headers = {key: value for key, value in res.headers.items() if key.lower() not in self.IGNORED_HEADERS}
+            interaction['response'] = {'status': res.status_code, 'headers': res_headers, 'body': body}
+            return res
+        finally:
+            interaction['started'] = round(start - self.started, 6)
+            interaction['duration'] = round(time.monotonic() - start, 6)
+            with self._lock:
+                self.stats['requests'] += 1
+                self.interactions.append(interaction)
+
+    def load(self, path: str) -> None:
+        """
+        Load a cassette, to replay it.
+        Arguments:
+            path : REQUIRED : path of the cassette written by save.
+        """
+        opener = gzip.open if str(path).endswith('.gz') else open
+        with opener(path, 'rt') as f:
+            self.header = json.loads(f.readline())
+            if self.header.get('version') != self.VERSION:
+                raise ValueError(f"Unsupported cassette version: {self.header.get('version')}")
+            self.interactions = [json.loads(line) for line in f if line.strip() != '']
+        self._queues = {}
+        for interaction in self.interactions:
+            request = interaction['request']
+            key = self.getKey(request['method'], request['url'], request['params'], request['body'])
+            self._queues.setdefault(key, deque()).append(interaction)
+
+    def save(self, path: str = None) -> Path:
+        """
+        Write the recorded interactions in a cassette.
+        Arguments:
+            path : OPTIONAL : path of the cassette, compressed with gzip if it ends with ".gz". Default the path given when creating the transport.
+        """
+        path = Path(path or self.path)
+        with self._lock:
+            interactions = sorted(self.interactions, key=lambda interaction: interaction['started'])
+            self.header = {
+                'version': self.VERSION,
+                'launchpy': __version__,
+                'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'interactions': len(interactions),
+                'duration': round(time.monotonic() - self.started, 6)
+            }
+        lines = [json.dumps(self.header)] + [json.dumps(interaction, separators=(',', ':')) for interaction in interactions]
+        content = ('\n'.join(lines) + '\n').encode()
+        if path.suffix == '.gz':
+            content = gzip.compress(content)
+        path.write_bytes(content)
+        return path
+
+    def getStats(self) -> dict:
+        """
+        Returns the number of requests sent through the transport.
+        In replay mode: requests answered by a recorded interaction ("replayed"), by reusing the last one of identical requests ("repeated"),
+        without recorded interaction ("missing"), and recorded interactions never replayed ("unused").
+        Also the wall time since the transport was created ("elapsed") and the duration of the recorded session ("recorded_duration").
+        """
+        with self._lock:
+            stats = {**self.stats, 'elapsed': time.monotonic() - self.started}
+            if self.mode == 'replay':
+                stats['unused'] = sum(1 for interaction in self.interactions if not interaction.get('replayed', False))
+                stats['recorded_duration'] = self.header.get('duration')
+        return stats
+
+    def close(self) -> None:
+        if self.mode == 'record' and self.path is not None:
+            self.save()
+        self.transport.close()
+
+
+_transport = HTTPTransport()
+
+
+def getTransport() -> Transport:
+    """
+    Returns the transport used by the connectors.
+    """
+    return _transport
+
+
+def setTransport(transport: Transport = None) -> Transport:
+    """
+    Set the transport used by the connectors that were not created with their own transport.
+    Arguments:
+        transport : OPTIONAL : Transport instance. Default HTTPTransport, sending the requests over HTTP.
+    """
+    global _transport
+    _transport = transport or HTTPTransport()
+    return _transport
+
+
+@contextmanager
+def useCassette(path: str, mode: str = None, speed: float = None, transport: Transport = None) -> Iterator[RecordReplayTransport]:
+    """
+    Context manager recording the requests of the connectors in a cassette, or replaying them.
+    The cassette is written when leaving the context in record mode, and the previous transport is restored.
+    Arguments:
+        path : REQUIRED : path of the cassette, ex: "sync.jsonl.gz"
+        mode : OPTIONAL : "record" or "replay". Default replay if the cassette exists, record otherwise.
+        speed : OPTIONAL : in replay mode, speed factor of the recorded durations (1 recorded speed, 10 ten times faster). Default None, no waiting.
+        transport : OPTIONAL : transport sending the requests in record mode. Default the current transport.
+    """
+    global _transport
+    if mode is None:
+        mode = 'replay' if Path(path).exists() else 'record'
+    previous = _transport
+    cassette = RecordReplayTransport(path, mode=mode, transport=transport or previous, speed=speed)
+    _transport = cassette
+    try:
+        yield cassette
+    finally:
+        _transport = previous
+        if mode == 'record':
+            cassette.save()